@@ -1,10 +1,14 @@
 from .app import (
     main, __version__, g3d, g3d_by_inchi, check_functional_group, create_graph, compound, compound_by_cid,
     compound_by_inchi, create_custom_functional_groups, count_functional_group, __author__, generate_molecule,
-    view_graph
+    view_graph, trajectory, gaussian_steps, conformers,
+    topological_descriptors, screen, fingerprints, substructure_index,
+    deduplicate
 )
 
 __all__ = ['main', '__version__', '__author__', 'g3d',
            'g3d_by_inchi', 'check_functional_group', 'create_graph', 'compound', 'compound_by_cid', 'compound_by_inchi', 
            'create_custom_functional_groups', 'count_functional_group', 
-           'generate_molecule', 'view_graph']
+           'generate_molecule', 'view_graph', 'trajectory', 'gaussian_steps',
+           'conformers', 'topological_descriptors', 'screen', 'fingerprints',
+           'substructure_index', 'deduplicate']
@@ -4,7 +4,7 @@ from pathlib import Path
 from networkx import Graph
 import pubchemquery as pcq
 import pandas as pd
-from typing import List, Dict, Union, Literal, Optional
+from typing import List, Dict, Union, Literal, Optional, Iterator, Iterable
 
 # internal
 from .config import packageName
@@ -12,7 +12,15 @@ from .config import packageShortName
 from .config import __version__
 from .config import __description__
 from .config import __author__
-from .docs import MolParser, Compound, CustomChemGraph, Utility, Molecule
+from .docs import MolParser, Compound, CustomChemGraph, Utility, Molecule, Trajectory, ConformerEnsemble
+from .docs.matchbudget import MatchBudget
+from .docs.screen import Screen, ScreenResult
+from .docs.patterncache import PatternCache
+from .docs.fingerprint import FingerprintLibrary
+from .docs.substructureindex import SubstructureIndex
+from .docs.canonical import CanonicalGraph
+from .docs.structure import Structure
+from .docs.compute import Compute
 
 
 def main():
@@ -28,7 +36,7 @@ def compound(f: Union[str, Path]) -> Compound:
     Parameters
     ----------
     f : str
-        molecule file format (sdf) or string (sdf)
+        molecule file format (sdf, json, gjf/com) or string (sdf)
 
     Returns
     -------
@@ -130,7 +138,7 @@ def compound_by_inchi(inchi: str) -> Compound:
         raise Exception(f"creating compound is failed! {e}")
 
 
-def create_graph(file: Path | str, graph_name: Optional[str] = 'Graph') -> Graph:
+def create_graph(file: Path | str, graph_name: Optional[str] = 'Graph', implicit_h: bool = False) -> Graph:
     '''
     Converts a sdf compound file to a graph
 
@@ -138,6 +146,10 @@ def create_graph(file: Path | str, graph_name: Optional[str] = 'Graph') -> Graph
     ----------
     file : str
         molecule file format (sdf)
+    graph_name : str
+        graph name (default 'Graph')
+    implicit_h : bool
+        hydrogen-suppressed graph, hydrogens are stored as h_count (default False)
 
     Returns
     -------
@@ -152,7 +164,8 @@ def create_graph(file: Path | str, graph_name: Optional[str] = 'Graph') -> Graph
             # compound
             compound = Compound(compound_info)
             # display 3d
-            graph = compound.create_graph(graph_name=graph_name)
+            graph = compound.create_graph(
+                graph_name=graph_name, implicit_h=implicit_h)
             # res
             return graph
         else:
@@ -289,7 +302,7 @@ def g3d_by_inchi(inchi: str, fig_size: List = [], bg_color: str = '#ffffff', dis
         raise Exception("inchi is not valid.")
 
 
-def check_functional_group(file: Union[str, Path], functional_groups: List[Union[str, CustomChemGraph]] = [], res_format: Literal['original', 'dataframe'] = 'original'):
+def check_functional_group(file: Union[str, Path], functional_groups: List[Union[str, CustomChemGraph]] = [], res_format: Literal['original', 'dataframe'] = 'original', implicit_h: bool = False, budget: Optional[MatchBudget] = None, workers: Optional[int] = None):
     '''
     Check a functional group exists in a compound
 
@@ -301,6 +314,14 @@ def check_functional_group(file: Union[str, Path], functional_groups: List[Union
         functional group (default ['hydroxyl']) or CustomChemGraph object
     res_format : str
         result format (default 'original')
+    implicit_h : bool
+        match on the hydrogen-suppressed graph (default False), results are the same
+    budget : MatchBudget
+        time/state limits and cancellation token (default None: no limit), each
+        result gets a status ('ok', 'timed_out' or 'cancelled')
+    workers : int
+        number of worker processes for a large compound (default None), the
+        results are the same as a single process
 
     Returns
     -------
@@ -314,7 +335,8 @@ def check_functional_group(file: Union[str, Path], functional_groups: List[Union
         comp = compound(file)
 
         # check functional group
-        res = comp.check_functional_groups(functional_groups)
+        res = comp.check_functional_groups(
+            functional_groups, implicit_h=implicit_h, budget=budget, workers=workers)
 
         # check
         if res_format == 'dataframe':
@@ -331,7 +353,7 @@ def check_functional_group(file: Union[str, Path], functional_groups: List[Union
         raise Exception(f"checking functional group is failed! {e}")
 
 
-def count_functional_group(file: Union[str, Path], functional_groups: List[Union[str, CustomChemGraph]] = [], res_format: Literal['original', 'dataframe'] = 'original'):
+def count_functional_group(file: Union[str, Path], functional_groups: List[Union[str, CustomChemGraph]] = [], res_format: Literal['original', 'dataframe'] = 'original', implicit_h: bool = False, budget: Optional[MatchBudget] = None, workers: Optional[int] = None):
     '''
     Counts the occurrences of functional groups within the structure of a compound.
 
@@ -343,6 +365,14 @@ def count_functional_group(file: Union[str, Path], functional_groups: List[Union
         functional group (default ['hydroxyl']) or CustomChemGraph object
     res_format : str
         result format (default 'original')
+    implicit_h : bool
+        match on the hydrogen-suppressed graph (default False), results are the same
+    budget : MatchBudget
+        time/state limits and cancellation token (default None: no limit), each
+        result gets a status ('ok', 'timed_out' or 'cancelled')
+    workers : int
+        number of worker processes for a large compound (default None), the
+        results are the same as a single process
 
     Returns
     -------
@@ -355,11 +385,10 @@ def count_functional_group(file: Union[str, Path], functional_groups: List[Union
         # create compound
         comp = compound(file)
 
-        # create graph
-        comp.create_graph()
         # check functional group
         res = comp.check_functional_groups(
-            functional_groups, count_functional_group=True)
+            functional_groups, count_functional_group=True, implicit_h=implicit_h,
+            budget=budget, workers=workers)
         # check
         if res_format == 'dataframe':
             # dataframe
@@ -375,6 +404,226 @@ def count_functional_group(file: Union[str, Path], functional_groups: List[Union
         raise Exception(f"counting functional group is failed! {e}")
 
 
+def topological_descriptors(files: List[Union[str, Path]], res_format: Literal['original', 'dataframe'] = 'dataframe'):
+    '''
+    Calculate topological descriptors of many compounds
+
+    Parameters
+    ----------
+    files : list[Path | str]
+        molecule files (sdf, json, gjf/com) or strings (sdf)
+    res_format : str
+        result format (default 'dataframe')
+
+    Returns
+    -------
+    res : list | pd.DataFrame
+        wiener index, eccentricity, radius, diameter and path counts of each compound
+
+    Notes
+    -----
+    - compounds and graphs are not created, the bond block is used directly
+    '''
+    try:
+        # parse
+        compoundInfoList = []
+        for f in files:
+            # check file exists
+            if os.path.exists(f):
+                MolParserC = MolParser(f)
+                compoundInfoList.append(MolParserC.read_file())
+            elif isinstance(f, str):
+                MolParserC = MolParser(None)
+                compoundInfoList.append(MolParserC.read_file(
+                    sourceContent={
+                        'content': f.strip(),
+                        'format': 'sdf'
+                    }))
+            else:
+                raise ValueError("Invalid input file path or string")
+
+        # descriptors
+        res = Compute.batch_topological_descriptors(compoundInfoList)
+
+        # check
+        if res_format == 'dataframe':
+            return pd.DataFrame(res)
+        elif res_format == 'original':
+            return res
+        else:
+            raise Exception("res_format is not valid.")
+    except Exception as e:
+        raise Exception(f"calculating topological descriptors is failed! {e}")
+
+
+def screen(source: Union[str, Path, Iterable], functional_groups: List[Union[str, CustomChemGraph]] = [],
+           workers: Optional[int] = None, chunk_size: int = 64, implicit_h: bool = False,
+           sparse: bool = False) -> ScreenResult:
+    '''
+    Count functional groups of many compounds (compound libraries)
+
+    Parameters
+    ----------
+    source : str | Path | iterable
+        multi-record sdf file, directory of molecule files or an iterable of
+        compounds, file paths or sdf strings
+    functional_groups : list[str] or CustomChemGraph object
+        functional groups (default all built-in groups)
+    workers : int
+        number of worker processes (default None: this process)
+    chunk_size : int
+        compounds sent to a worker at once (default 64)
+    implicit_h : bool
+        match on the hydrogen-suppressed graph (default False), results are the same
+    sparse : bool
+        return a scipy csr count matrix (default False: numpy array)
+
+    Returns
+    -------
+    res : ScreenResult
+        counts (compounds x functional groups), row_ids (file:record or
+        source index), groups and errors (row id -> message)
+
+    Examples
+    --------
+    ```python
+    res = mi.screen('library.sdf', ['hydroxyl', 'carbonyl'], workers=4)
+    print(res.counts, res.row_ids)
+    df = res.to_dataframe()
+    ```
+    '''
+    try:
+        # res
+        return Screen.run(source, functional_groups, workers=workers, chunk_size=chunk_size,
+                          implicit_h=implicit_h, sparse=sparse)
+    except Exception as e:
+        raise Exception(f"screening compounds is failed! {e}")
+
+
+def fingerprints(source: Union[str, Path, Iterable], n_bits: int = 2048, path_length: int = 7,
+                 radius: int = 2, implicit_h: bool = True, workers: Optional[int] = None,
+                 chunk_size: int = 64) -> FingerprintLibrary:
+    '''
+    Build path/circular fingerprints of many compounds (similarity search)
+
+    Parameters
+    ----------
+    source : str | Path | iterable
+        multi-record sdf file, directory of molecule files or an iterable of
+        compounds, file paths or sdf strings
+    n_bits : int
+        fingerprint size (default 2048, a multiple of 64)
+    path_length : int
+        maximum element/bond-order path length (default 7 bonds)
+    radius : int
+        circular neighbourhood radius (default 2 bonds)
+    implicit_h : bool
+        fingerprints of hydrogen-suppressed graphs (default True)
+    workers : int
+        number of worker processes (default None: this process)
+    chunk_size : int
+        compounds sent to a worker at once (default 64)
+
+    Returns
+    -------
+    res : FingerprintLibrary
+        packed uint64 fingerprints, row_ids (file:record or source index) and
+        errors (row id -> message)
+
+    Examples
+    --------
+    ```python
+    library = mi.fingerprints('library.sdf', workers=4)
+    # top-k tanimoto similarity
+    res = library.search(mi.compound('query.sdf'), k=10)
+    library.save('library-fp.npz')
+    ```
+    '''
+    try:
+        # res
+        return FingerprintLibrary(n_bits, path_length, radius, implicit_h).extend(
+            source, workers=workers, chunk_size=chunk_size)
+    except Exception as e:
+        raise Exception(f"building fingerprints is failed! {e}")
+
+
+def substructure_index(source: Union[str, Path, Iterable], n_bits: int = 2048, path_length: int = 5,
+                       workers: Optional[int] = None, chunk_size: int = 64) -> SubstructureIndex:
+    '''
+    Build a substructure screen index of many compounds (feature bitsets)
+
+    Parameters
+    ----------
+    source : str | Path | iterable
+        multi-record sdf file, directory of molecule files or an iterable of
+        compounds, file paths or sdf strings
+    n_bits : int
+        bitset size (default 2048, a multiple of 64)
+    path_length : int
+        maximum element/bond-order path length (default 5 bonds)
+    workers : int
+        number of worker processes (default None: this process)
+    chunk_size : int
+        compounds sent to a worker at once (default 64)
+
+    Returns
+    -------
+    res : SubstructureIndex
+        feature bitsets, row_ids (file:record or source index) and errors
+        (row id -> message)
+
+    Examples
+    --------
+    ```python
+    index = mi.substructure_index('library.sdf', workers=4)
+    index.save('library-index.npz')
+    # screen, then exact match of the candidates
+    res = index.search(['hydroxyl', 'ester'])
+    ```
+    '''
+    try:
+        # res
+        return SubstructureIndex(n_bits, path_length).extend(
+            source, workers=workers, chunk_size=chunk_size)
+    except Exception as e:
+        raise Exception(f"building substructure index is failed! {e}")
+
+
+def deduplicate(compounds: Union[str, Path, Iterable]) -> Dict:
+    '''
+    Find compounds with the same structure (any atom order) in a library
+
+    Parameters
+    ----------
+    compounds : str | Path | iterable
+        multi-record sdf file, directory of molecule files or an iterable of
+        compounds, file paths or sdf strings
+
+    Returns
+    -------
+    res : dict
+        groups (row ids of equal structures, the first one is kept), unique
+        (first row id of each group) and errors (row id -> message)
+
+    Notes
+    -----
+    - compounds are grouped by their canonical hash in a single pass, equal
+      hashes are verified by isomorphism
+
+    Examples
+    --------
+    ```python
+    res = mi.deduplicate('library.sdf')
+    print(len(res['unique']), [g for g in res['groups'] if len(g) > 1])
+    ```
+    '''
+    try:
+        # res
+        return CanonicalGraph.deduplicate(compounds)
+    except Exception as e:
+        raise Exception(f"deduplicating compounds is failed! {e}")
+
+
 def create_custom_functional_groups(functional_groups: Union[Dict[str, List[str]], List[Dict[str, List[str]]], Path, str]) -> CustomChemGraph:
     '''
     Creates custom functional groups based on the following example.
@@ -423,9 +672,8 @@ def create_custom_functional_groups(functional_groups: Union[Dict[str, List[str]
                 # set
                 custom_functional_groups = functional_groups
         elif isinstance(functional_groups, (str, Path)):
-            # check is a file yml
-            custom_functional_groups = Utility.load_custom_functional_group(
-                functional_groups)
+            # check is a file yml (compiled once, cached by content hash)
+            return PatternCache.load(functional_groups)
         else:
             raise Exception("functional_groups format is not valid.")
 
@@ -485,4 +733,156 @@ def generate_molecule(molecule_src: Union[Dict[str, List[str]], Path], molecule_
         # res
         return MoleculeC
     except Exception as e:
-        raise Exception(f'creating custom functional group is failed! {e}')
\ No newline at end of file
+        raise Exception(f'creating custom functional group is failed! {e}')
+
+
+def trajectory(f: Union[str, Path], topology: Optional[Union[str, Path, Compound]] = None,
+               start: int = 0, stop: Optional[int] = None, step: int = 1,
+               memmap: Optional[Union[str, Path]] = None) -> Trajectory:
+    '''
+    Read a multi-frame xyz file (md/optimization trajectory)
+
+    Parameters
+    ----------
+    f : str
+        xyz file path
+    topology : str | Compound
+        sdf file, sdf string or compound object which defines bonds for all frames (default None)
+    start : int
+        first frame (default 0)
+    stop : int
+        last frame (exclusive, default None: all frames)
+    step : int
+        frame stride (default 1)
+    memmap : str
+        if provided, frames are written into a memory-mapped `.npy` file (for data larger than memory)
+
+    Returns
+    -------
+    trajectory : Trajectory
+        trajectory object, coordinates are stored as a (n_frames, n_atoms, 3) array
+
+    Examples
+    --------
+    ```python
+    # every 10th frame of the first 1000 frames
+    traj = mi.trajectory('md.xyz', topology='molecule.sdf', stop=1000, step=10)
+    # coordinates
+    traj.xyz
+    # compound of the first selected frame
+    comp = traj.compound(0)
+    ```
+    '''
+    try:
+        # topology
+        topology_info = None
+        if topology is not None:
+            if isinstance(topology, Compound):
+                topology_info = topology.parse_prop
+            else:
+                topology_info = compound(topology).parse_prop
+
+        # read frames
+        traj = Trajectory.from_xyz(
+            f, topology=topology_info, start=start, stop=stop, step=step, memmap=memmap)
+        # res
+        return traj
+    except Exception as e:
+        raise Exception(f"reading trajectory is failed! {e}")
+
+
+def conformers(f: Union[str, Path]) -> ConformerEnsemble:
+    '''
+    Read conformers of a compound from a multi-record sdf file
+
+    Parameters
+    ----------
+    f : str
+        sdf file path (records separated by $$$$, the same atoms and bonds)
+
+    Returns
+    -------
+    ensemble : ConformerEnsemble
+        conformer ensemble, one topology and a (n_conf, n_atoms, 3) coordinate array
+
+    Examples
+    --------
+    ```python
+    ens = mi.conformers('conformers.sdf')
+    # distance matrices of all conformers
+    ens.distance_matrix()
+    # dihedral angle of all conformers
+    ens.d_angle_atoms(['C1','C2','C3','C4'])
+    ```
+    '''
+    try:
+        # check
+        if not os.path.exists(f):
+            raise Exception('file path is not valid.')
+
+        # read records
+        ens = ConformerEnsemble.from_sdf(f)
+        # res
+        return ens
+    except Exception as e:
+        raise Exception(f"reading conformers is failed! {e}")
+
+
+def gaussian_steps(f: Union[str, Path], topology: Optional[Union[str, Path, Compound]] = None,
+                   orientation: Literal['standard', 'input'] = 'standard') -> Iterator[Compound]:
+    '''
+    Stream the steps of a gaussian output (log/out) file as compounds
+
+    Parameters
+    ----------
+    f : str
+        gaussian output file path
+    topology : str | Compound
+        gjf, sdf file or compound object which defines bonds (default None)
+    orientation : str
+        geometry block, `standard` or `input` orientation (default standard)
+
+    Yields
+    ------
+    compound : Compound
+        compound of each step, compound_properties contain step, energy, converged and final
+
+    Notes
+    -----
+    - the log file is read in a single pass, steps are not kept in memory
+    - if topology is not provided, bonds are found from the first geometry using covalent radii
+
+    Examples
+    --------
+    ```python
+    for comp in mi.gaussian_steps('opt.log'):
+        print(comp.parse_prop['compound_properties']['energy'])
+    ```
+    '''
+    try:
+        # topology
+        bond_matrix = None
+        if topology is not None:
+            if not isinstance(topology, Compound):
+                topology = compound(topology)
+            bond_matrix = [[b['id1'], b['id2'], b['bond_type']]
+                           for b in topology.atom_bond_block_1d]
+
+        # parser
+        MolParserC = MolParser(f)
+        for step in MolParserC.gaussian_log_parser(orientation=orientation):
+            # bonds
+            if bond_matrix is None:
+                bond_matrix = Structure.perceive_bonds(
+                    step['atom_elements'], step['xyz_list'])
+            # compound properties
+            compound_properties = {
+                k: step[k] for k in ('step', 'energy', 'converged', 'final')}
+            # compound info
+            compound_info = MolParserC.build_compound_info(
+                step['atom_elements'], step['xyz_list'], bond_matrix,
+                mat_name=f"step {step['step']}", compound_properties=compound_properties)
+            # res
+            yield Compound(compound_info)
+    except Exception as e:
+        raise Exception(f"reading gaussian output is failed! {e}")
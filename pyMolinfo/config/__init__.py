@@ -1,2 +1,2 @@
 from .setting import packageName, __version__, __description__, packageShortName, __author__
-from .constants import OBS_POSITIONS, OBSERVER_PROPERTY
+from .constants import OBS_POSITIONS, OBSERVER_PROPERTY, COVALENT_RADII
@@ -4,3 +4,14 @@ from .netwrok import Network
 from .customchemgraph import CustomChemGraph
 from .utility import Utility
 from .molecule import Molecule
+from .trajectory import Trajectory
+from .conformer import ConformerEnsemble
+from .matchcache import MatchCache
+from .matchbudget import MatchBudget, MatchTimeout
+from .parallelmatch import ParallelMatcher, SharedGraph
+from .screen import Screen, ScreenResult
+from .patterncache import PatternCache
+from .compactgraph import CompactGraph
+from .fingerprint import Fingerprint, FingerprintLibrary
+from .substructureindex import SubstructureIndex
+from .canonical import CanonicalGraph
@@ -0,0 +1,362 @@
+# CANONICAL GRAPH
+# ----------------
+
+# import packages/modules
+import hashlib
+from collections import deque
+import networkx as nx
+
+
+class CanonicalGraph():
+    '''
+    Canonical hash of compound graphs (duplicate detection)
+
+    hint:
+        atoms are split into ordered cells (label, then the bond orders to each
+        cell) until the partition is equitable, remaining ties are broken by
+        individualizing each atom of the first tied cell (search tree), the
+        smallest encoding of all complete orderings is the canonical form, so
+        the same molecule gets the same hash for any atom order. Orderings
+        equal to the first or best one give automorphisms: the branch is
+        left for its common ancestor and atoms in the same orbit (kept per
+        tree node) are searched once, a cell of twins (the same bonded atoms)
+        is ordered without branches
+    '''
+    # search tree nodes (refinements) before the search is stopped
+    max_nodes = 20000
+
+    @staticmethod
+    def refine(lab, cellOf, cellSize, splitters, neighbours):
+        '''
+        Refine an ordered partition (in place) until it is equitable
+
+        Parameters
+        ----------
+        lab : list[int]
+            atoms in cell order
+        cellOf : list[int]
+            cell (start position in lab) of each atom
+        cellSize : list[int]
+            size of each cell (at its start position)
+        splitters : list[int]
+            cells to split the others with
+        neighbours : list[list[tuple]]
+            (atom, bond order) of each atom
+
+        Notes
+        -----
+        - a cell is split by the bond orders of its atoms to a splitter cell,
+          the new cells are ordered by these counts (not by atom ids)
+        - only the smaller parts of a split cell become splitters (Hopcroft)
+        '''
+        queued = [False] * len(lab)
+        for w in splitters:
+            queued[w] = True
+        queue = deque(splitters)
+        while queue:
+            w = queue.popleft()
+            queued[w] = False
+            # bond orders of the atoms bonded to the splitter
+            counts = {}
+            for u in lab[w:w + cellSize[w]]:
+                for v, o in neighbours[u]:
+                    c = counts.setdefault(v, {})
+                    c[o] = c.get(o, 0) + 1
+            touched = {}
+            for v in counts:
+                touched.setdefault(cellOf[v], []).append(v)
+            # split the touched cells (cell order)
+            for start in sorted(touched):
+                size = cellSize[start]
+                # check
+                if size == 1:
+                    continue
+                keys = {v: tuple(sorted(counts[v].items())) for v in touched[start]}
+                if len(keys) == size and len(set(keys.values())) == 1:
+                    continue
+                parts = {}
+                for v in lab[start:start + size]:
+                    parts.setdefault(keys.get(v, ()), []).append(v)
+                parts = [parts[k] for k in sorted(parts)]
+                # new cells
+                starts = []
+                i = start
+                for part in parts:
+                    starts.append(i)
+                    cellSize[i] = len(part)
+                    lab[i:i + len(part)] = part
+                    for v in part:
+                        cellOf[v] = i
+                    i += len(part)
+                # splitters
+                if queued[start]:
+                    largest = 0
+                else:
+                    largest = max(range(len(parts)), key=lambda k: len(parts[k]))
+                for k, i in enumerate(starts):
+                    if k != largest and not queued[i]:
+                        queued[i] = True
+                        queue.append(i)
+
+    @staticmethod
+    def encode(lab, labels, edges):
+        '''
+        Encoding of a complete atom ordering
+
+        Parameters
+        ----------
+        lab : list[int]
+            atoms in the new order
+        labels : list[str]
+            atom labels
+        edges : list[tuple]
+            (atom 1, atom 2, bond order)
+
+        Returns
+        -------
+        encoding : tuple
+            labels in the new order and sorted bonds of the new positions
+        '''
+        order = [0] * len(lab)
+        for i, v in enumerate(lab):
+            order[v] = i
+        bonds = sorted((min(order[i], order[j]), max(order[i], order[j]), o)
+                       for i, j, o in edges)
+        return tuple(labels[v] for v in lab), tuple(bonds)
+
+    @staticmethod
+    def canonical_form(labels, compact):
+        '''
+        Canonical form of a labelled compact graph
+
+        Parameters
+        ----------
+        labels : list[str]
+            atom labels (node order)
+        compact : CompactGraph
+            compact graph
+
+        Returns
+        -------
+        encoding : tuple
+            canonical encoding (labels and bonds)
+        order : list[int]
+            canonical position of each atom
+
+        Notes
+        -----
+        - an exception is raised if the search needs more than max_nodes
+          refinements (the result would depend on the atom order otherwise)
+        '''
+        n = len(labels)
+        indptr = compact.indptr.tolist()
+        indices = compact.indices.tolist()
+        orders = compact.bond_order.tolist()
+        neighbours = [list(zip(indices[indptr[i]:indptr[i + 1]],
+                               orders[indptr[i]:indptr[i + 1]])) for i in range(n)]
+        # bonds (node positions)
+        position = {v: i for i, v in enumerate(compact.node_ids.tolist())}
+        edges = [(position[u], position[v], o) for (u, v), o in zip(
+            compact.bond_nodes.tolist(), compact.bond_types.tolist())]
+
+        # initial partition (label cells)
+        lab = sorted(range(n), key=labels.__getitem__)
+        cellOf = [0] * n
+        cellSize = [0] * n
+        starts = []
+        for i, v in enumerate(lab):
+            if i == 0 or labels[v] != labels[lab[i - 1]]:
+                starts.append(i)
+            cellOf[v] = starts[-1]
+            cellSize[starts[-1]] += 1
+        CanonicalGraph.refine(lab, cellOf, cellSize, starts, neighbours)
+
+        # twins (the same label and bonded atoms), swapping them is an automorphism
+        twins = {}
+        for v in range(n):
+            twins.setdefault((labels[v], tuple(sorted(neighbours[v]))), []).append(v)
+        twin = [0] * n
+        for k, group in enumerate(twins.values()):
+            for v in group:
+                twin[v] = k
+
+        # first and best leaf (encoding, lab, path)
+        leaves = {}
+        # tree nodes on the search path (path, orbit parents of the cell,
+        # automorphisms fixing the path)
+        stack = []
+        nodes = [0]
+
+        def _find(parent, v):
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+
+        def _merge(parent, perm):
+            # orbits of the node cell under an automorphism fixing its path
+            for u, v in perm.items():
+                # check
+                if u not in parent:
+                    continue
+                a, b = _find(parent, u), _find(parent, v)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+
+        def _leaf(lab, path):
+            encoding = CanonicalGraph.encode(lab, labels, edges)
+            for key in ('first', 'best'):
+                # check
+                if key not in leaves or leaves[key][0] != encoding:
+                    continue
+                # automorphism (moved atoms, the leaf of the same encoding ->
+                # this leaf)
+                _lab, _path = leaves[key][1:]
+                perm = {u: v for u, v in zip(_lab, lab) if u != v}
+                fixed = 0
+                for nodePath, parent, perms in stack:
+                    # check (paths of the stack extend each other)
+                    if any(p in perm for p in nodePath[fixed:]):
+                        break
+                    fixed = len(nodePath)
+                    perms.append(perm)
+                    _merge(parent, perm)
+                # common ancestor (the branch is an image of a searched one)
+                level = 0
+                while path[level] == _path[level]:
+                    level += 1
+                return level
+            if 'first' not in leaves:
+                leaves['first'] = (encoding, lab, path)
+            if 'best' not in leaves or encoding < leaves['best'][0]:
+                leaves['best'] = (encoding, lab, path)
+            return len(path) - 1
+
+        def _search(lab, cellOf, cellSize, path, perms):
+            nodes[0] += 1
+            # check
+            if nodes[0] > CanonicalGraph.max_nodes:
+                raise Exception(
+                    f"canonical form search exceeds {CanonicalGraph.max_nodes} nodes!")
+            # first tied cell
+            start = 0
+            while start < n and cellSize[start] == 1:
+                start += 1
+            # complete ordering
+            if start == n:
+                return _leaf(lab, path)
+            cell = lab[start:start + cellSize[start]]
+            # a cell of twins (all orderings are equal, no branches)
+            if all(twin[v] == twin[cell[0]] for v in cell):
+                _lab, _cellOf, _cellSize = lab[:], cellOf[:], cellSize[:]
+                for i, v in enumerate(cell, start):
+                    _cellOf[v] = i
+                    _cellSize[i] = 1
+                CanonicalGraph.refine(_lab, _cellOf, _cellSize,
+                                      list(range(start, start + len(cell))), neighbours)
+                return _search(_lab, _cellOf, _cellSize, path + cell,
+                               [perm for perm in perms if not any(v in perm for v in cell)])
+            # orbits (twins and automorphisms fixing the path)
+            parent = {}
+            for v in cell:
+                parent[v] = next((u for u in parent if twin[u] == twin[v]), v)
+            for perm in perms:
+                _merge(parent, perm)
+            stack.append((path, parent, perms))
+            # individualize one atom of each orbit
+            searched = []
+            for v in cell:
+                # check
+                if any(_find(parent, u) == _find(parent, v) for u in searched):
+                    continue
+                searched.append(v)
+                _lab, _cellOf, _cellSize = lab[:], cellOf[:], cellSize[:]
+                i = _lab.index(v, start)
+                _lab[start], _lab[i] = v, _lab[start]
+                _cellSize[start + 1] = _cellSize[start] - 1
+                _cellSize[start] = 1
+                for u in _lab[start + 1:start + cellSize[start]]:
+                    _cellOf[u] = start + 1
+                CanonicalGraph.refine(_lab, _cellOf, _cellSize, [start], neighbours)
+                level = _search(_lab, _cellOf, _cellSize, path + [v],
+                                [perm for perm in perms if v not in perm])
+                # check (leave the branch)
+                if level < len(path):
+                    stack.pop()
+                    return level
+            stack.pop()
+            return len(path) - 1
+
+        _search(lab, cellOf, cellSize, [], [])
+
+        # res
+        encoding, lab, _ = leaves['best']
+        order = [0] * n
+        for i, v in enumerate(lab):
+            order[v] = i
+        return encoding, order
+
+    @staticmethod
+    def canonical_hash(labels, compact):
+        '''
+        Canonical hash of a labelled compact graph (sha1 hex)
+        '''
+        encoding, _ = CanonicalGraph.canonical_form(labels, compact)
+        return hashlib.sha1(repr(encoding).encode()).hexdigest()
+
+    @staticmethod
+    def same_graph(G1, G2):
+        '''
+        Verify two compound graphs are isomorphic (elements and bond orders)
+        '''
+        return nx.is_isomorphic(
+            G1, G2, node_match=lambda n1, n2: n1['symbol'] == n2['symbol'],
+            edge_match=lambda e1, e2: e1['type'] == e2['type'])
+
+    @staticmethod
+    def deduplicate(source):
+        '''
+        Group equal structures of a source (one canonical hash per compound)
+
+        Parameters
+        ----------
+        source : str | Path | iterable
+            multi-record sdf file, directory or an iterable of compounds
+            (see Screen.iter_source)
+
+        Returns
+        -------
+        res : dict
+            groups (row ids of equal structures, the first one is kept, groups
+            in source order), unique (first row id of each group) and errors
+            (row id -> message)
+        '''
+        # local
+        from .screen import Screen
+
+        # hash -> [(group index, representative compound)]
+        buckets = {}
+        groups = []
+        errors = {}
+        for rowId, item in Screen.iter_source(source):
+            try:
+                comp = Screen.load(item)
+                key = comp.canonical_hash
+            except Exception as e:
+                errors[rowId] = str(e)
+                continue
+            # equal hash (verified isomorphism)
+            bucket = buckets.setdefault(key, [])
+            group = next((k for k, rep in bucket if rep.is_same_structure(comp)), None)
+            if group is None:
+                group = len(groups)
+                groups.append([])
+                bucket.append((group, comp))
+            groups[group].append(rowId)
+
+        # res
+        return {
+            'groups': groups,
+            'unique': [g[0] for g in groups],
+            'errors': errors
+        }
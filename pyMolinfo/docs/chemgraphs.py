@@ -2,14 +2,146 @@
 # -----------------------
 
 # import packages/modules
+import weakref
+from itertools import combinations
 import networkx as nx
 
 
+# hydrogen-suppressed variants of patterns (released with the pattern)
+_HYDROGEN_SUPPRESSED = weakref.WeakKeyDictionary()
+
+
 class ChemGraphs():
 
     def __init__(self):
         pass
 
+    def annotate_pattern(self, G):
+        '''
+        Add atom environment constraints implied by a pattern (minimum values)
+
+        Parameters
+        ----------
+        G : nx.Graph
+            pattern graph
+
+        Returns
+        -------
+        G : nx.Graph
+            pattern graph, heavy atoms get degree_min, heavy_degree_min and h_count_min
+
+        Notes
+        -----
+        - only necessary conditions are added, matches are the same as before
+        '''
+        for node, symbol in G.nodes(data='symbol'):
+            # check
+            if symbol == 'H' or str(symbol).startswith('XX'):
+                continue
+            # neighbours
+            _symbols = [str(G.nodes[nbr]['symbol']) for nbr in G.adj[node]]
+            _hNo = _symbols.count('H')
+            _heavyNo = sum(
+                1 for i in _symbols if i != 'H' and not i.startswith('XX'))
+            # constraints
+            G.nodes[node]['degree_min'] = G.degree[node]
+            if _heavyNo > 0:
+                G.nodes[node]['heavy_degree_min'] = _heavyNo
+            if _hNo > 0:
+                G.nodes[node]['h_count_min'] = _hNo
+
+        # res
+        return G
+
+    def hydrogen_suppressed_patterns(self, G):
+        '''
+        Translate a pattern into heavy-atom patterns with implicit hydrogen constraints
+
+        Parameters
+        ----------
+        G : nx.Graph
+            pattern graph (explicit hydrogens)
+
+        Returns
+        -------
+        variants : list | None
+            heavy-atom patterns, nodes get `implicit_h` (hydrogens taken from the atom)
+            and `h_count_min`, None if the pattern cannot be translated
+
+        Notes
+        -----
+        - terminal hydrogens become an implicit hydrogen count of their neighbour
+        - a dummy (XX) leaf with a single bond can be a heavy atom or a hydrogen,
+          both variants are created
+        - patterns with a non-terminal hydrogen, an isolated dummy node (or only
+          hydrogens) are not translated
+        '''
+        # check
+        if G in _HYDROGEN_SUPPRESSED:
+            return _HYDROGEN_SUPPRESSED[G]
+
+        variants = None
+        # hydrogens
+        hydrogens = [n for n, symbol in G.nodes(data='symbol') if symbol == 'H']
+        requirement = {}
+        translatable = True
+        for h in hydrogens:
+            # terminal hydrogen with a single bond to a non-hydrogen atom
+            if G.degree[h] != 1:
+                translatable = False
+                break
+            parent = next(iter(G.adj[h]))
+            if G.nodes[parent]['symbol'] == 'H' or G.edges[h, parent]['type'] != 1:
+                translatable = False
+                break
+            requirement[parent] = requirement.get(parent, 0) + 1
+
+        # isolated dummy nodes can be hydrogens
+        if any(str(symbol).startswith('XX') and G.degree[n] == 0
+               for n, symbol in G.nodes(data='symbol')):
+            translatable = False
+
+        # heavy atoms
+        if translatable and len(hydrogens) < len(G):
+            heavy = G.copy()
+            heavy.remove_nodes_from(hydrogens)
+
+            # dummy leaves (heavy atom or hydrogen)
+            dummyLeaves = [n for n, symbol in heavy.nodes(data='symbol')
+                           if str(symbol).startswith('XX') and G.degree[n] == 1 and
+                           next(iter(G.adj[n])) in heavy and
+                           G.edges[n, next(iter(G.adj[n]))]['type'] == 1]
+
+            variants = []
+            for k in range(len(dummyLeaves) + 1):
+                for leaves in combinations(dummyLeaves, k):
+                    # the neighbour of a hydrogen leaf must stay a heavy atom
+                    if any(next(iter(G.adj[leaf])) in leaves for leaf in leaves):
+                        continue
+                    _variant = heavy.copy()
+                    _requirement = dict(requirement)
+                    for leaf in leaves:
+                        parent = next(iter(G.adj[leaf]))
+                        _variant.remove_node(leaf)
+                        _requirement[parent] = _requirement.get(
+                            parent, 0) + 1
+                    # implicit hydrogens
+                    for node, n in _requirement.items():
+                        _variant.nodes[node]['implicit_h'] = n
+                        _variant.nodes[node]['h_count_min'] = max(
+                            n, _variant.nodes[node].get('h_count_min', 0))
+                    # skip isomorphic variants
+                    if any(nx.is_isomorphic(_variant, v, node_match=dict.__eq__,
+                                            edge_match=lambda e1, e2: e1.get('type') == e2.get('type'))
+                           for v in variants):
+                        continue
+                    variants.append(_variant)
+
+        # save
+        _HYDROGEN_SUPPRESSED[G] = variants
+        # res
+        return variants
+
     def graph_hydroxyl(self):
         '''
         Create a graph for hydroxyl
@@ -0,0 +1,152 @@
+# COMPACT GRAPH
+# --------------
+
+# import packages/modules
+from collections import Counter
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class CompactGraph():
+    '''
+    Compound graph stored as compact arrays (csr adjacency)
+
+    hint:
+        nodes are the kept atoms in atom order (node ids are 1-based atom ids),
+        element codes refer to a small element table, every bond appears twice
+        in the adjacency (both directions) with its bond order, the arrays are
+        used directly by fingerprints, canonical hashes, invariants and
+        topological distances (substructure matching runs on networkx graphs)
+    '''
+
+    def __init__(self, atomElements, bondI, bondJ, bondOrder, keep=None):
+        '''
+        Build the csr adjacency from bond arrays
+
+        Parameters
+        ----------
+        atomElements : list
+            atom symbols
+        bondI : np.ndarray
+            first atom index (0-based)
+        bondJ : np.ndarray
+            second atom index (0-based)
+        bondOrder : np.ndarray
+            bond type
+        keep : np.ndarray
+            atoms kept as nodes (default None: all atoms)
+        '''
+        symbols = [str(s).strip() for s in atomElements]
+        atomNo = len(symbols)
+        bondI = np.asarray(bondI, dtype=np.int64)
+        bondJ = np.asarray(bondJ, dtype=np.int64)
+        bondOrder = np.asarray(bondOrder, dtype=np.int64)
+        # kept atoms
+        keep = np.ones(atomNo, dtype=bool) if keep is None else np.asarray(
+            keep, dtype=bool)
+        self.implicit_h = not bool(keep.all())
+        nodes = np.flatnonzero(keep)
+        nodeNo = len(nodes)
+        # node ids (atom id)
+        self.node_ids = (nodes + 1).astype(np.int32)
+        # node position of atoms (-1: not kept)
+        position = np.full(atomNo, -1, dtype=np.int64)
+        position[nodes] = np.arange(nodeNo)
+
+        # element codes
+        self.element_table = sorted({symbols[i] for i in nodes})
+        codes = {s: i for i, s in enumerate(self.element_table)}
+        self.elements = np.asarray(
+            [codes[symbols[i]] for i in nodes], dtype=np.int8)
+
+        # bonds between kept atoms (rows of the bond arrays)
+        mask = keep[bondI] & keep[bondJ] if len(bondI) else np.zeros(0, dtype=bool)
+        self.bond_rows = np.flatnonzero(mask).astype(np.int32)
+        u = position[bondI[mask]]
+        v = position[bondJ[mask]]
+        # bond node ids
+        self.bond_nodes = np.column_stack(
+            [self.node_ids[u], self.node_ids[v]]) if len(u) else np.zeros((0, 2), dtype=np.int32)
+
+        # csr (both directions, sorted by node)
+        rows = np.concatenate([u, v])
+        order = np.argsort(rows, kind='stable')
+        self.indices = np.concatenate([v, u])[order].astype(np.int32)
+        self.bond_order = np.concatenate(
+            [bondOrder[mask]] * 2)[order].astype(np.int8)
+        # bond order of each bond (bond array order)
+        self.bond_types = bondOrder[mask].astype(np.int8)
+        self.indptr = np.zeros(nodeNo + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=nodeNo), out=self.indptr[1:])
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def __str__(self):
+        return f"CompactGraph({len(self.node_ids)} nodes, {len(self.bond_rows)} edges)"
+
+    def number_of_edges(self):
+        '''
+        Number of bonds between nodes
+        '''
+        return len(self.bond_rows)
+
+    @property
+    def degree(self):
+        '''
+        Degree of each node (node order)
+        '''
+        return np.diff(self.indptr)
+
+    @property
+    def symbols(self):
+        '''
+        Symbol of each node (node order)
+        '''
+        return [self.element_table[c] for c in self.elements.tolist()]
+
+    def element_index(self):
+        '''
+        Build an element index (symbol -> node ids, node order)
+
+        Returns
+        -------
+        index : dict
+            symbol -> list of node ids
+        '''
+        nodeIds = self.node_ids.tolist()
+        index = {}
+        for node, code in zip(nodeIds, self.elements.tolist()):
+            index.setdefault(self.element_table[code], []).append(node)
+        # res
+        return index
+
+    def edges(self):
+        '''
+        Bonds between nodes (node id 1, node id 2), bond array order
+        '''
+        return self.bond_nodes
+
+    def adjacency(self):
+        '''
+        Adjacency matrix (scipy csr, node order)
+        '''
+        nodeNo = len(self.node_ids)
+        return csr_matrix((np.ones(len(self.indices)), self.indices, self.indptr),
+                          shape=(nodeNo, nodeNo))
+
+    def invariant_data(self):
+        '''
+        Data of graph invariants (see GraphInvariant.from_compact)
+
+        Returns
+        -------
+        symbols : list
+            symbol of each node
+        degrees : list
+            degree of each node
+        bond_orders : Counter
+            bond-order histogram
+        '''
+        bondOrders = Counter(self.bond_types.tolist())
+        return self.symbols, self.degree.tolist(), bondOrders
@@ -4,6 +4,7 @@
 # import libs
 import numpy as np
 import pandas as pd
+from scipy.sparse.csgraph import shortest_path
 from matplotlib.pyplot import xlabel
 from ..config import OBSERVER_PROPERTY
 from .utility import Utility
@@ -29,6 +30,7 @@ class Compound(graph3d, Network):
     _atom_block = []
     # distance
     _distance = []
+    _topological_distance = None
 
     # *** obs fixed ***
     _limits = {
@@ -79,6 +81,18 @@ class Compound(graph3d, Network):
         self.__update_atom_prop('xyz_center_list')
         self.__update_atom_prop('atom_block')
 
+    def check_structure(self):
+        '''
+        Compare the structure with the cached one, caches of the compound
+        (atom environment, graphs, results, topological distance) are removed
+        if it has changed
+        '''
+        res = Network.check_structure(self)
+        # check
+        if res:
+            self._topological_distance = None
+        return res
+
     def __str__(self):
         '''
         Return info about the mat
@@ -338,6 +352,54 @@ class Compound(graph3d, Network):
         else:
             return matrix
 
+    def topological_distance_matrix(self, dataframe=False):
+        '''
+        Build a matrix of atom-atom topological distance (number of bonds)
+
+        Parameters
+        ----------
+        dataframe: bool
+            return a dataframe
+
+        Returns
+        -------
+        matrix : np.ndarray
+            topological distance matrix, np.inf for disconnected atoms
+
+        Notes
+        -----
+        - the matrix is computed once (sparse shortest path on the compact
+          graph) and cached
+        '''
+        # structure changes (invalidate caches)
+        self.check_structure()
+
+        # check
+        if self._topological_distance is None:
+            # csr adjacency (all atoms, atom order)
+            self._topological_distance = shortest_path(
+                self.compact_graph.adjacency(), method='D', directed=False,
+                unweighted=True)
+
+        # res (a copy, the cached matrix is kept)
+        matrix = self._topological_distance.copy()
+        if dataframe:
+            return pd.DataFrame(matrix, columns=self.atom_elements,
+                                index=self.atom_elements)
+        else:
+            return matrix
+
+    def topological_descriptors(self):
+        '''
+        Calculate topological descriptors (wiener index, eccentricity, path counts)
+
+        Returns
+        -------
+        res : dict
+            topological descriptors
+        '''
+        return Compute.topological_descriptors(self.topological_distance_matrix())
+
     def distance_atoms(self, atoms):
         '''
         Calculate distance between two different atoms
@@ -3,8 +3,11 @@
 # ---------------
 
 # import libs
+from collections import deque
 import numpy as np
 from scipy.spatial import distance
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path
 
 
 class Compute():
@@ -202,6 +205,856 @@ class Compute():
         # res
         return angle_degrees
 
+    @staticmethod
+    def batch_atoms_distance_matrix(xyzFrames):
+        '''
+        build distance matrices of a stack of conformers/frames
+
+        Parameters
+        ----------
+        xyzFrames : np.ndarray
+            xyz list of atoms (n_frames, n_atoms, 3)
+
+        Returns
+        -------
+        atomLength : np.ndarray
+            distance matrices (n_frames, n_atoms, n_atoms)
+        '''
+        # set
+        xyzFrames = np.asarray(xyzFrames, dtype=np.float64)
+        # squared norm
+        sqNorm = np.einsum('fij,fij->fi', xyzFrames, xyzFrames)
+        # gram matrix
+        gram = np.matmul(xyzFrames, np.transpose(xyzFrames, (0, 2, 1)))
+        # squared distance
+        sqDistance = sqNorm[:, :, np.newaxis] + \
+            sqNorm[:, np.newaxis, :] - 2*gram
+        np.maximum(sqDistance, 0, out=sqDistance)
+        atomLength = np.sqrt(sqDistance)
+        # diagonal
+        atomNo = xyzFrames.shape[1]
+        atomLength[:, np.arange(atomNo), np.arange(atomNo)] = 0
+
+        # res
+        return atomLength
+
+    @staticmethod
+    def batch_atoms_distance(xyzFrames, atom_index):
+        '''
+        calculate distance between two atoms in a stack of conformers/frames
+
+        Parameters
+        ----------
+        xyzFrames : np.ndarray
+            xyz list of atoms (n_frames, n_atoms, 3)
+        atom_index : list
+            selected atom index list such as [0,1]
+
+        Returns
+        -------
+        _length : np.ndarray
+            distance of each frame (n_frames,)
+        '''
+        # check
+        if len(atom_index) != 2:
+            raise Exception('atom index list must have two elements.')
+        # set
+        p1 = xyzFrames[:, int(atom_index[0])]
+        p2 = xyzFrames[:, int(atom_index[1])]
+        # res
+        return np.linalg.norm(p1 - p2, axis=1)
+
+    @staticmethod
+    def batch_calculate_angle(xyzFrames, atom_index):
+        '''
+        Calculate angle/dihedral angle in a stack of conformers/frames
+
+        Parameters
+        ----------
+        xyzFrames : np.ndarray
+            xyz list of atoms (n_frames, n_atoms, 3)
+        atom_index : list
+            selected atom index list such as [0,1,2] or [0,1,2,3]
+
+        Returns
+        -------
+        angle_degrees : np.ndarray
+            angle of each frame in degrees (n_frames,)
+        '''
+        # check
+        atom_index_size = len(atom_index)
+
+        if atom_index_size == 3:
+            # angle between 3 points
+            p1 = xyzFrames[:, int(atom_index[0])]
+            p2 = xyzFrames[:, int(atom_index[1])]
+            p3 = xyzFrames[:, int(atom_index[2])]
+
+            # Calculate vectors
+            v1 = p2 - p1
+            v2 = p2 - p3
+
+            # Calculate angle using cosine formula
+            cos_angle = np.einsum('fi,fi->f', v1, v2) / \
+                (np.linalg.norm(v1, axis=1)*np.linalg.norm(v2, axis=1))
+            angle = np.arccos(np.clip(cos_angle, -1, 1))
+
+            # Convert to degrees
+            angle_degrees = np.degrees(angle)
+
+        elif atom_index_size == 4:
+            # dihedral angle 4 points
+            p1 = xyzFrames[:, int(atom_index[0])]
+            p2 = xyzFrames[:, int(atom_index[1])]
+            p3 = xyzFrames[:, int(atom_index[2])]
+            p4 = xyzFrames[:, int(atom_index[3])]
+
+            # Calculate vectors
+            v1 = p2 - p1
+            v2 = p3 - p2
+            v3 = p4 - p3
+
+            # Calculate normal vectors
+            n1 = np.cross(v1, v2)
+            n2 = np.cross(v2, v3)
+
+            # Normalize normal vectors
+            n1 = n1 / np.linalg.norm(n1, axis=1)[:, np.newaxis]
+            n2 = n2 / np.linalg.norm(n2, axis=1)[:, np.newaxis]
+
+            # Calculate dihedral angle
+            dihedral_angle = np.arccos(
+                np.clip(np.einsum('fi,fi->f', n1, n2), -1, 1))
+
+            # Calculate sign of dihedral angle
+            sign = np.sign(np.einsum('fi,fi->f', n1, v3))
+
+            # Convert to degrees
+            angle_degrees = np.degrees(dihedral_angle) * sign
+
+        else:
+            raise Exception(
+                'atom index list must have three or four elements.'
+            )
+
+        # res
+        return angle_degrees
+
+    @staticmethod
+    def batch_kabsch(xyzFrames, xyzRef):
+        '''
+        Kabsch superposition of a stack of conformers onto a reference (batched svd)
+
+        Parameters
+        ----------
+        xyzFrames : np.ndarray
+            xyz list of atoms (n_frames, n_atoms, 3)
+        xyzRef : np.ndarray
+            reference xyz list (n_atoms, 3) or one reference per frame (n_frames, n_atoms, 3)
+
+        Returns
+        -------
+        xyzAligned : np.ndarray
+            aligned coordinates (n_frames, n_atoms, 3), placed on the reference centroid
+        rotation : np.ndarray
+            rotation matrices (n_frames, 3, 3), aligned = (xyz - centroid) @ rotation
+        rmsd : np.ndarray
+            rmsd after alignment (n_frames,)
+        '''
+        # set
+        P = np.asarray(xyzFrames, dtype=np.float64)
+        Q = np.asarray(xyzRef, dtype=np.float64)
+        if Q.ndim == 2:
+            Q = Q[np.newaxis, :, :]
+        # centroid
+        Qc = Q.mean(axis=1, keepdims=True)
+        P = P - P.mean(axis=1, keepdims=True)
+        Q = Q - Qc
+        # covariance
+        H = np.matmul(np.transpose(P, (0, 2, 1)), Q)
+        U, S, Vt = np.linalg.svd(H)
+        # reflection
+        d = np.sign(np.linalg.det(np.matmul(U, Vt)))
+        d[d == 0] = 1
+        U[:, :, 2] *= d[:, np.newaxis]
+        # rotation
+        rotation = np.matmul(U, Vt)
+        xyzAligned = np.matmul(P, rotation)
+        # rmsd
+        rmsd = np.sqrt(np.mean(np.sum((xyzAligned - Q)**2, axis=2), axis=1))
+
+        # res
+        return xyzAligned + Qc, rotation, rmsd
+
+    @staticmethod
+    def batch_rmsd(xyzFrames, xyzRef, align=True):
+        '''
+        Rmsd of a stack of conformers against a reference
+
+        Parameters
+        ----------
+        xyzFrames : np.ndarray
+            xyz list of atoms (n_frames, n_atoms, 3)
+        xyzRef : np.ndarray
+            reference xyz list (n_atoms, 3) or one reference per frame (n_frames, n_atoms, 3)
+        align : bool
+            kabsch alignment before rmsd (default True)
+
+        Returns
+        -------
+        rmsd : np.ndarray
+            rmsd of each frame (n_frames,)
+
+        Notes
+        -----
+        - with alignment, rmsd is obtained from the singular values (no rotation is applied)
+        '''
+        # set
+        P = np.asarray(xyzFrames, dtype=np.float64)
+        Q = np.asarray(xyzRef, dtype=np.float64)
+        if Q.ndim == 2:
+            Q = Q[np.newaxis, :, :]
+
+        # check
+        if not align:
+            return np.sqrt(np.mean(np.sum((P - Q)**2, axis=2), axis=1))
+
+        # centroid
+        P = P - P.mean(axis=1, keepdims=True)
+        Q = Q - Q.mean(axis=1, keepdims=True)
+        # covariance
+        H = np.matmul(np.transpose(P, (0, 2, 1)), Q)
+        S = np.linalg.svd(H, compute_uv=False)
+        # reflection
+        d = np.sign(np.linalg.det(H))
+        d[d == 0] = 1
+        S[:, 2] *= d
+        # squared deviation
+        atomNo = P.shape[1]
+        sqDeviation = np.einsum('fij,fij->f', P, P) + \
+            np.einsum('fij,fij->f', Q, Q) - 2*S.sum(axis=1)
+        np.maximum(sqDeviation, 0, out=sqDeviation)
+
+        # res
+        return np.sqrt(sqDeviation/atomNo)
+
+    @staticmethod
+    def pairwise_rmsd(xyzFrames, align=True):
+        '''
+        All-pairs rmsd matrix of a stack of conformers
+
+        Parameters
+        ----------
+        xyzFrames : np.ndarray
+            xyz list of atoms (n_frames, n_atoms, 3)
+        align : bool
+            kabsch alignment before rmsd (default True)
+
+        Returns
+        -------
+        rmsdMatrix : np.ndarray
+            rmsd matrix (n_frames, n_frames)
+        '''
+        # set
+        xyzFrames = np.asarray(xyzFrames, dtype=np.float64)
+        frameNo = xyzFrames.shape[0]
+        rmsdMatrix = np.zeros((frameNo, frameNo))
+
+        # upper triangle, one batch per row
+        for i in range(frameNo - 1):
+            _rmsd = Compute.batch_rmsd(
+                xyzFrames[i+1:], xyzFrames[i], align=align)
+            rmsdMatrix[i, i+1:] = _rmsd
+            rmsdMatrix[i+1:, i] = _rmsd
+
+        # res
+        return rmsdMatrix
+
+    @staticmethod
+    def prune_conformers(xyzFrames, threshold, align=True):
+        '''
+        Remove conformers closer than a rmsd threshold to an already kept conformer
+
+        Parameters
+        ----------
+        xyzFrames : np.ndarray
+            xyz list of atoms (n_frames, n_atoms, 3), in the order of priority
+        threshold : float
+            rmsd threshold
+        align : bool
+            kabsch alignment before rmsd (default True)
+
+        Returns
+        -------
+        keepIndex : list
+            index of kept conformers
+        rmsdCalls : int
+            number of rmsd evaluations
+
+        Notes
+        -----
+        - conformers are compared only against kept ones (greedy)
+        - the radius of gyration gives a lower bound, rmsd >= |rg_a - rg_b|
+          (aligned or not), so pairs with a larger gap are not evaluated
+        '''
+        # set
+        xyzFrames = np.asarray(xyzFrames, dtype=np.float64)
+        frameNo = xyzFrames.shape[0]
+        # check
+        if frameNo == 0:
+            return [], 0
+
+        # radius of gyration (centroid)
+        centered = xyzFrames - xyzFrames.mean(axis=1, keepdims=True)
+        rg = np.sqrt(np.mean(np.sum(centered**2, axis=2), axis=1))
+
+        # kept conformers
+        keepIndex = [0]
+        rmsdCalls = 0
+        for i in range(1, frameNo):
+            # kept candidates within the bound
+            _keep = np.asarray(keepIndex)
+            _near = _keep[np.abs(rg[_keep] - rg[i]) < threshold]
+            # check
+            if _near.size > 0:
+                rmsdCalls += _near.size
+                _rmsd = Compute.batch_rmsd(
+                    xyzFrames[_near], xyzFrames[i], align=align)
+                if np.any(_rmsd < threshold):
+                    continue
+            # keep
+            keepIndex.append(i)
+
+        # res
+        return keepIndex, rmsdCalls
+
+
+    @staticmethod
+    def bond_arrays(bondBlock):
+        '''
+        Convert a bond block to bond arrays
+
+        Parameters
+        ----------
+        bondBlock : list
+            bond block (MolParser output), atom id and bonds (id, symbol, bond symbol, bond type)
+
+        Returns
+        -------
+        bondI : np.ndarray
+            first atom index (0-based)
+        bondJ : np.ndarray
+            second atom index (0-based)
+        bondOrder : np.ndarray
+            bond type
+        '''
+        bondI = []
+        bondJ = []
+        bondOrder = []
+        for atom in bondBlock:
+            for bond in atom['bonds']:
+                bondI.append(int(atom['id']) - 1)
+                bondJ.append(int(bond[0]) - 1)
+                bondOrder.append(int(bond[3]))
+        # res
+        return np.array(bondI, dtype=np.int64), np.array(bondJ, dtype=np.int64), \
+            np.array(bondOrder, dtype=np.int64)
+
+    @staticmethod
+    def topological_distance_matrix(atomNo, bondI, bondJ):
+        '''
+        Build the topological (shortest-path, bond count) distance matrix
+
+        Parameters
+        ----------
+        atomNo : int
+            number of atoms
+        bondI : np.ndarray
+            first atom index (0-based)
+        bondJ : np.ndarray
+            second atom index (0-based)
+
+        Returns
+        -------
+        topoDistance : np.ndarray
+            distance matrix (n_atoms, n_atoms), np.inf for disconnected atoms
+        '''
+        # adjacency (sparse)
+        adjacency = csr_matrix(
+            (np.ones(len(bondI)), (bondI, bondJ)), shape=(atomNo, atomNo))
+        # res
+        return shortest_path(adjacency, method='D', directed=False, unweighted=True)
+
+    @staticmethod
+    def topological_descriptors(topoDistance):
+        '''
+        Calculate topological descriptors from a topological distance matrix
+
+        Parameters
+        ----------
+        topoDistance : np.ndarray
+            topological distance matrix (n_atoms, n_atoms)
+
+        Returns
+        -------
+        res : dict
+            wiener index, eccentricity, radius, diameter, average distance
+            and path counts (number of atom pairs at each distance)
+
+        Notes
+        -----
+        - disconnected pairs (fragments) are ignored
+        '''
+        # set
+        atomNo = topoDistance.shape[0]
+        connected = np.isfinite(topoDistance)
+        # upper triangle
+        upper = np.triu(connected, k=1)
+        pairDistance = topoDistance[upper].astype(np.int64)
+
+        # eccentricity
+        eccentricity = np.where(connected, topoDistance, 0).max(
+            axis=1).astype(np.int64)
+        # path counts
+        pathCounts = np.bincount(pairDistance)[1:] if pairDistance.size > 0 else np.array(
+            [], dtype=np.int64)
+
+        # res
+        return {
+            'atom_numbers': atomNo,
+            'wiener_index': int(pairDistance.sum()),
+            'average_distance': float(pairDistance.mean()) if pairDistance.size > 0 else 0.0,
+            'eccentricity': eccentricity,
+            'radius': int(eccentricity.min()) if atomNo > 0 else 0,
+            'diameter': int(eccentricity.max()) if atomNo > 0 else 0,
+            'path_counts': {i+1: int(v) for i, v in enumerate(pathCounts)}
+        }
+
+    @staticmethod
+    def batch_topological_descriptors(compoundInfoList):
+        '''
+        Calculate topological descriptors of many compounds (bond arrays only)
+
+        Parameters
+        ----------
+        compoundInfoList : list
+            parsed compound properties (MolParser output)
+
+        Returns
+        -------
+        res : list
+            topological descriptors of each compound
+        '''
+        res = []
+        for compoundInfo in compoundInfoList:
+            # bonds
+            bondI, bondJ, _ = Compute.bond_arrays(compoundInfo['bond_block'])
+            # distance
+            topoDistance = Compute.topological_distance_matrix(
+                int(compoundInfo['atom_numbers']), bondI, bondJ)
+            # descriptors
+            _res = Compute.topological_descriptors(topoDistance)
+            _res['mat_name'] = compoundInfo.get('mat_name', '')
+            res.append(_res)
+        # res
+        return res
+
+
+    @staticmethod
+    def ring_bonds(atomNo, bondI, bondJ):
+        '''
+        Find ring bonds (bonds which are not bridges) with an iterative dfs
+
+        Parameters
+        ----------
+        atomNo : int
+            number of atoms
+        bondI : np.ndarray
+            first atom index (0-based)
+        bondJ : np.ndarray
+            second atom index (0-based)
+
+        Returns
+        -------
+        ringBond : np.ndarray
+            True for bonds in a ring (n_bonds,)
+        '''
+        # adjacency (atom -> (neighbour, bond index))
+        adjacency = [[] for _ in range(atomNo)]
+        for k in range(len(bondI)):
+            adjacency[bondI[k]].append((bondJ[k], k))
+            adjacency[bondJ[k]].append((bondI[k], k))
+
+        # dfs order and low link
+        order = [-1]*atomNo
+        low = [0]*atomNo
+        ringBond = np.ones(len(bondI), dtype=bool)
+        counter = 0
+
+        for root in range(atomNo):
+            # check
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            # stack: (atom, parent bond, neighbour iterator)
+            stack = [(root, -1, iter(adjacency[root]))]
+            while stack:
+                atom, parentBond, neighbours = stack[-1]
+                advanced = False
+                for nbr, k in neighbours:
+                    if k == parentBond:
+                        continue
+                    if order[nbr] == -1:
+                        order[nbr] = low[nbr] = counter
+                        counter += 1
+                        stack.append((nbr, k, iter(adjacency[nbr])))
+                        advanced = True
+                        break
+                    low[atom] = min(low[atom], order[nbr])
+                # check
+                if advanced:
+                    continue
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[atom])
+                    # bridge
+                    if low[atom] > order[parent]:
+                        ringBond[parentBond] = False
+
+        # res
+        return ringBond
+
+    @staticmethod
+    def ring_perception(atomNo, bondI, bondJ, ringBond=None):
+        '''
+        Find the smallest set of smallest rings (SSSR) from the bond arrays
+
+        Parameters
+        ----------
+        atomNo : int
+            number of atoms
+        bondI : np.ndarray
+            first atom index (0-based)
+        bondJ : np.ndarray
+            second atom index (0-based)
+        ringBond : np.ndarray
+            ring bonds (computed if not provided)
+
+        Returns
+        -------
+        rings : list
+            rings as tuples of atom index (0-based, in ring order), smallest first
+
+        Notes
+        -----
+        - candidates are the shortest cycles through each ring bond, Horton
+          cycles are added only if they do not give a full cycle basis
+        - a candidate is kept if it is independent of the kept rings (GF(2)
+          elimination of bond bit vectors)
+        '''
+        # ring bonds
+        if ringBond is None:
+            ringBond = Compute.ring_bonds(atomNo, bondI, bondJ)
+        ringEdges = [k for k in range(len(bondI)) if ringBond[k]]
+        if not ringEdges:
+            return []
+
+        # adjacency (atom -> (neighbour, bond index)) of ring bonds
+        adjacency = {}
+        for k in ringEdges:
+            adjacency.setdefault(int(bondI[k]), []).append((int(bondJ[k]), k))
+            adjacency.setdefault(int(bondJ[k]), []).append((int(bondI[k]), k))
+
+        # number of rings (cyclomatic number)
+        components = 0
+        visited = set()
+        for atom in adjacency:
+            if atom in visited:
+                continue
+            components += 1
+            visited.add(atom)
+            stack = [atom]
+            while stack:
+                a = stack.pop()
+                for nbr, _ in adjacency[a]:
+                    if nbr not in visited:
+                        visited.add(nbr)
+                        stack.append(nbr)
+        ringNo = len(ringEdges) - len(adjacency) + components
+
+        def _bfs(root, skipBond=-1):
+            # shortest path tree (atom -> (parent, bond index))
+            parents = {root: (None, -1)}
+            queue = deque([root])
+            while queue:
+                a = queue.popleft()
+                for nbr, k in adjacency[a]:
+                    if k == skipBond or nbr in parents:
+                        continue
+                    parents[nbr] = (a, k)
+                    queue.append(nbr)
+            return parents
+
+        def _path(parents, atom):
+            # atoms and bonds from the root to an atom
+            atoms, bonds = [atom], []
+            while parents[atom][0] is not None:
+                atom, k = parents[atom]
+                atoms.append(atom)
+                bonds.append(k)
+            return atoms[::-1], bonds
+
+        rings = []
+        basis = {}
+
+        def _select(candidates):
+            # independent candidates (smallest first)
+            for _, mask, atoms in sorted(candidates, key=lambda c: c[0]):
+                if len(rings) == ringNo:
+                    return
+                vec = mask
+                while vec:
+                    pivot = vec.bit_length() - 1
+                    if pivot not in basis:
+                        basis[pivot] = vec
+                        rings.append(tuple(atoms))
+                        break
+                    vec ^= basis[pivot]
+
+        # shortest cycle through each ring bond
+        candidates = {}
+        for k in ringEdges:
+            u, v = int(bondI[k]), int(bondJ[k])
+            parents = _bfs(u, skipBond=k)
+            atoms, bonds = _path(parents, v)
+            mask = 1 << k
+            for b in bonds:
+                mask |= 1 << b
+            candidates[mask] = (len(atoms), mask, atoms)
+        _select(candidates.values())
+
+        # horton cycles (rarely needed)
+        if len(rings) < ringNo:
+            candidates = {}
+            for root in adjacency:
+                parents = _bfs(root)
+                for k in ringEdges:
+                    x, y = int(bondI[k]), int(bondJ[k])
+                    if x not in parents or y not in parents:
+                        continue
+                    atomsX, bondsX = _path(parents, x)
+                    atomsY, bondsY = _path(parents, y)
+                    # check (paths meet at the root only)
+                    if k in bondsX or k in bondsY or len(set(atomsX) & set(atomsY)) != 1:
+                        continue
+                    mask = 1 << k
+                    for b in bondsX + bondsY:
+                        mask |= 1 << b
+                    if mask not in candidates:
+                        atoms = atomsX + atomsY[::-1][:-1]
+                        candidates[mask] = (len(atoms), mask, atoms)
+            _select(candidates.values())
+
+        # res
+        return sorted(rings, key=len)
+
+    @staticmethod
+    def aromaticity(atomElements, rings, bondI, bondJ, bondOrder):
+        '''
+        Find aromatic rings (Huckel 4n+2 rule on the SSSR rings)
+
+        Parameters
+        ----------
+        atomElements : list
+            atom symbols such as ['C','H','H','H','H']
+        rings : list
+            rings as tuples of atom index (0-based, in ring order)
+        bondI : np.ndarray
+            first atom index (0-based)
+        bondJ : np.ndarray
+            second atom index (0-based)
+        bondOrder : np.ndarray
+            bond type (1: single, 2: double, 3: triple, 4: aromatic)
+
+        Returns
+        -------
+        aromaticRing : list
+            True for aromatic rings
+        aromaticAtom : np.ndarray
+            True for atoms in an aromatic ring (n_atoms,)
+        aromaticBond : np.ndarray
+            True for bonds in an aromatic ring (n_bonds,)
+
+        Notes
+        -----
+        - pi electrons: 1 for an atom with a double bond in the ring (or in a
+          fused aromatic ring), 0 for an exocyclic double bond to O, N or S, 2 for
+          a N, O, S or P atom without a double bond (lone pair)
+        - rings of aromatic bonds (type 4) are aromatic
+        - fused rings are checked again until no ring changes (Kekule variants)
+        '''
+        atomElements = [str(i).strip() for i in atomElements]
+        atomNo = len(atomElements)
+
+        # bonds (atom pair -> bond index)
+        bondIndex = {}
+        atomBonds = [[] for _ in range(atomNo)]
+        for k in range(len(bondI)):
+            i, j = int(bondI[k]), int(bondJ[k])
+            bondIndex[(i, j)] = bondIndex[(j, i)] = k
+            atomBonds[i].append((j, k))
+            atomBonds[j].append((i, k))
+
+        # ring bonds of each ring
+        ringBondSets = [{bondIndex[(ring[n], ring[(n + 1) % len(ring)])]
+                         for n in range(len(ring))} for ring in rings]
+
+        aromaticRing = [False]*len(rings)
+        aromaticBond = np.zeros(len(bondI), dtype=bool)
+
+        def _electrons(atom, ringBonds):
+            # pi electrons of a ring atom (None: not aromatic)
+            multiple = [(nbr, k) for nbr, k in atomBonds[atom]
+                        if bondOrder[k] in (2, 3)]
+            # check
+            if any(bondOrder[k] == 3 for _, k in multiple) or len(multiple) > 1:
+                return None
+            if multiple:
+                nbr, k = multiple[0]
+                if k in ringBonds or aromaticBond[k]:
+                    return 1
+                if atomElements[nbr] in ('O', 'N', 'S'):
+                    return 0
+                return None
+            if atomElements[atom] in ('N', 'O', 'S', 'P'):
+                return 2
+            return None
+
+        # check rings until no ring changes
+        changed = True
+        while changed:
+            changed = False
+            for r, ring in enumerate(rings):
+                if aromaticRing[r]:
+                    continue
+                ringBonds = ringBondSets[r]
+                # aromatic bonds
+                if all(bondOrder[k] == 4 for k in ringBonds):
+                    aromatic = True
+                else:
+                    electrons = 0
+                    for atom in ring:
+                        _n = _electrons(atom, ringBonds)
+                        if _n is None:
+                            electrons = None
+                            break
+                        electrons += _n
+                    aromatic = electrons is not None and electrons >= 2 and (
+                        electrons - 2) % 4 == 0
+                # update
+                if aromatic:
+                    aromaticRing[r] = True
+                    aromaticBond[list(ringBonds)] = True
+                    changed = True
+
+        # atoms
+        aromaticAtom = np.zeros(atomNo, dtype=bool)
+        for r, ring in enumerate(rings):
+            if aromaticRing[r]:
+                aromaticAtom[list(ring)] = True
+
+        # res
+        return aromaticRing, aromaticAtom, aromaticBond
+
+    @staticmethod
+    def atom_environment(atomElements, bondI, bondJ, bondOrder):
+        '''
+        Annotate atoms from the bond arrays (single pass)
+
+        Parameters
+        ----------
+        atomElements : list
+            atom symbols such as ['C','H','H','H','H']
+        bondI : np.ndarray
+            first atom index (0-based)
+        bondJ : np.ndarray
+            second atom index (0-based)
+        bondOrder : np.ndarray
+            bond type (1: single, 2: double, 3: triple, 4: aromatic)
+
+        Returns
+        -------
+        res : dict
+            degree, heavy_degree, h_count, in_ring, hybridization, ring_count,
+            ring_size (smallest ring, 0: no ring) and aromatic of each atom,
+            ring_bond and aromatic_bond of each bond, rings and aromatic_rings (SSSR)
+        '''
+        # set
+        atomElements = np.array([str(i).strip() for i in atomElements])
+        atomNo = len(atomElements)
+        isH = atomElements == 'H'
+
+        # degree
+        degree = np.bincount(bondI, minlength=atomNo) + \
+            np.bincount(bondJ, minlength=atomNo)
+        # attached hydrogens
+        hCount = np.bincount(bondI, weights=isH[bondJ], minlength=atomNo) + \
+            np.bincount(bondJ, weights=isH[bondI], minlength=atomNo)
+        hCount = hCount.astype(np.int64)
+
+        # multiple bonds
+        def _bond_count(bondType):
+            _w = (bondOrder == bondType)
+            return np.bincount(bondI, weights=_w, minlength=atomNo) + \
+                np.bincount(bondJ, weights=_w, minlength=atomNo)
+        doubleNo = _bond_count(2)
+        tripleNo = _bond_count(3)
+        aromaticNo = _bond_count(4)
+
+        # hybridization
+        hybridization = np.where(
+            (tripleNo > 0) | (doubleNo > 1), 'sp',
+            np.where((doubleNo > 0) | (aromaticNo > 0), 'sp2', 'sp3'))
+        hybridization = np.where(isH, 's', hybridization)
+
+        # rings
+        ringBond = Compute.ring_bonds(atomNo, bondI, bondJ)
+        inRing = np.zeros(atomNo, dtype=bool)
+        inRing[bondI[ringBond]] = True
+        inRing[bondJ[ringBond]] = True
+
+        # smallest set of smallest rings
+        rings = Compute.ring_perception(atomNo, bondI, bondJ, ringBond=ringBond)
+        ringCount = np.zeros(atomNo, dtype=np.int64)
+        ringSize = np.zeros(atomNo, dtype=np.int64)
+        for ring in rings:
+            ringCount[list(ring)] += 1
+            # rings are sorted by size
+            _index = [i for i in ring if ringSize[i] == 0]
+            ringSize[_index] = len(ring)
+
+        # aromaticity
+        aromaticRing, aromatic, aromaticBond = Compute.aromaticity(
+            atomElements, rings, bondI, bondJ, bondOrder)
+
+        # res
+        return {
+            'degree': degree,
+            'heavy_degree': degree - hCount,
+            'h_count': hCount,
+            'in_ring': inRing,
+            'hybridization': hybridization,
+            'ring_count': ringCount,
+            'ring_size': ringSize,
+            'aromatic': aromatic,
+            'ring_bond': ringBond,
+            'aromatic_bond': aromaticBond,
+            'rings': rings,
+            'aromatic_rings': [ring for ring, a in zip(rings, aromaticRing) if a]
+        }
+
 
 # UTILITY FUNCTION
 # ------------------
@@ -0,0 +1,314 @@
+# CONFORMER ENSEMBLE
+# -------------------
+
+# import libs
+from pathlib import Path
+from typing import Union
+import numpy as np
+import pandas as pd
+# internals
+from .trajectory import Trajectory
+from .compute import Compute
+from .molparser import MolParser
+
+
+class ConformerEnsemble(Trajectory):
+    '''
+    Conformers of a compound sharing one topology
+
+    hint:
+        the topology (bond block, graph) is built once, coordinates are
+        stored as a (n_conf, n_atoms, 3) array
+    '''
+    # conformer properties
+    _conformer_properties = []
+    # topology compound
+    _compound = None
+
+    def __init__(self, atom_elements, xyz, topology, conformer_properties=None, frame_ids=None):
+        '''
+        Initialize a conformer ensemble
+
+        Parameters
+        ----------
+        atom_elements : list
+            atom symbols such as ['C','H','H','H','H']
+        xyz : np.ndarray
+            coordinates (n_conf, n_atoms, 3)
+        topology : dict
+            parsed compound properties (MolParser output) shared by all conformers
+        conformer_properties : list
+            sdf properties of each conformer
+        frame_ids : list
+            conformer index in the source file (default 0, 1, ...)
+        '''
+        # check
+        if topology is None:
+            raise Exception('conformer ensemble needs a topology.')
+
+        super().__init__(atom_elements, xyz, frame_ids=frame_ids,
+                         comments=None, topology=topology)
+
+        # properties
+        self._conformer_properties = list(conformer_properties) if conformer_properties is not None else [
+            {}]*xyz.shape[0]
+        self._compound = None
+
+    def __str__(self):
+        return f"ConformerEnsemble: {self.conformer_numbers} conformers, {self.atom_numbers} atoms"
+
+    @property
+    def conformer_numbers(self):
+        return self.frame_numbers
+
+    @property
+    def conformer_properties(self):
+        return self._conformer_properties
+
+    @property
+    def topology_compound(self):
+        '''
+        Topology compound built once (the first conformer geometry)
+        '''
+        if self._compound is None:
+            self._compound = self.compound(0)
+        return self._compound
+
+    def __atom_index(self, atoms):
+        '''
+        Convert atom ids to atom index
+
+        Parameters
+        ----------
+        atoms : list
+            atom ids such as ['C1','H2']
+
+        Returns
+        -------
+        atom_index : list
+            atom index such as [0,1]
+        '''
+        # get numbers
+        atom_index = [int(''.join([c for c in s if c.isdigit()]))-1
+                      for s in atoms]
+        # check
+        for i in atom_index:
+            if i < 0 or i >= self.atom_numbers:
+                raise Exception(f'atom index {i+1} is not valid.')
+        # res
+        return atom_index
+
+    def distance_matrix(self, dataframe=False):
+        '''
+        Build atom-atom distance matrices of all conformers
+
+        Parameters
+        ----------
+        dataframe: bool
+            return a list of dataframes
+
+        Returns
+        -------
+        matrix : np.ndarray
+            distance matrices (n_conf, n_atoms, n_atoms)
+        '''
+        # res
+        matrix = Compute.batch_atoms_distance_matrix(self.xyz)
+
+        if dataframe:
+            atomElements = self.atom_elements
+            return [pd.DataFrame(matrix[k], columns=atomElements,
+                                 index=atomElements) for k in range(matrix.shape[0])]
+        else:
+            return matrix
+
+    def distance_atoms(self, atoms):
+        '''
+        Calculate distance between two atoms in all conformers
+
+        Parameters
+        ----------
+        atoms : list
+            atom ids such as ['C1','H2']
+
+        Returns
+        -------
+        distance: np.ndarray
+            distance of each conformer (n_conf,)
+        '''
+        # check atoms
+        if len(atoms) != 2:
+            raise Exception('two atoms not provided!')
+
+        return Compute.batch_atoms_distance(self.xyz, self.__atom_index(atoms))
+
+    def angle_atoms(self, atoms):
+        '''
+        Calculate angle between points p1,p2, and p3 in all conformers
+
+        Parameters
+        ----------
+        atoms : list
+            atom ids such as ['C1','H2','O3']
+
+        Returns
+        -------
+        angle_degrees : np.ndarray
+            angle of each conformer in degrees (n_conf,)
+        '''
+        # check atoms
+        if len(atoms) != 3:
+            raise Exception('three atoms not provided!')
+
+        return Compute.batch_calculate_angle(self.xyz, self.__atom_index(atoms))
+
+    def d_angle_atoms(self, atoms):
+        '''
+        Calculate dihedral angle between points p1,p2,p3, and p4 in all conformers
+
+        Parameters
+        ----------
+        atoms : list
+            atom ids such as ['C1','H2','O3','H4']
+
+        Returns
+        -------
+        angle_degrees : np.ndarray
+            dihedral angle of each conformer in degrees (n_conf,)
+        '''
+        # check atoms
+        if len(atoms) != 4:
+            raise Exception('4 atoms not provided!')
+
+        return Compute.batch_calculate_angle(self.xyz, self.__atom_index(atoms))
+
+    def center(self):
+        '''
+        Move all conformers to the center of the origin [0,0,0]
+
+        Returns
+        -------
+        xyz_center : np.ndarray
+            centered coordinates (n_conf, n_atoms, 3)
+        '''
+        return self.center_frames()
+
+    def align(self, reference=0):
+        '''
+        Kabsch alignment of all conformers onto a reference conformer
+
+        Parameters
+        ----------
+        reference : int
+            reference conformer index (default 0)
+
+        Returns
+        -------
+        xyz_aligned : np.ndarray
+            aligned coordinates (n_conf, n_atoms, 3)
+        rmsd : np.ndarray
+            rmsd of each conformer after alignment (n_conf,)
+        '''
+        xyzAligned, _, rmsd = Compute.batch_kabsch(
+            self.xyz, self.frame(reference))
+        # res
+        return xyzAligned, rmsd
+
+    def rmsd(self, reference=0, align=True):
+        '''
+        Rmsd of all conformers against a reference conformer
+
+        Parameters
+        ----------
+        reference : int
+            reference conformer index (default 0)
+        align : bool
+            kabsch alignment before rmsd (default True)
+
+        Returns
+        -------
+        rmsd : np.ndarray
+            rmsd of each conformer (n_conf,)
+        '''
+        return Compute.batch_rmsd(self.xyz, self.frame(reference), align=align)
+
+    def rmsd_matrix(self, align=True):
+        '''
+        All-pairs rmsd matrix of conformers
+
+        Parameters
+        ----------
+        align : bool
+            kabsch alignment before rmsd (default True)
+
+        Returns
+        -------
+        rmsd_matrix : np.ndarray
+            rmsd matrix (n_conf, n_conf)
+        '''
+        return Compute.pairwise_rmsd(self.xyz, align=align)
+
+    def prune(self, threshold, align=True):
+        '''
+        Remove near-identical conformers (rmsd below a threshold)
+
+        Parameters
+        ----------
+        threshold : float
+            rmsd threshold
+        align : bool
+            kabsch alignment before rmsd (default True)
+
+        Returns
+        -------
+        ensemble : ConformerEnsemble
+            conformer ensemble of kept conformers (the first one of each similar set)
+        '''
+        keepIndex, _ = Compute.prune_conformers(
+            self.xyz, threshold, align=align)
+        # res
+        return self.subset(keepIndex)
+
+    def subset(self, index):
+        '''
+        Create a conformer ensemble from selected conformers
+
+        Parameters
+        ----------
+        index : list
+            conformer index
+
+        Returns
+        -------
+        ensemble : ConformerEnsemble
+            conformer ensemble object (the same topology)
+        '''
+        index = list(index)
+        return ConformerEnsemble(self._atom_elements, np.asarray(self.xyz[index]), self.topology,
+                                 conformer_properties=[
+                                     self._conformer_properties[i] for i in index],
+                                 frame_ids=[self.frame_ids[i] for i in index])
+
+    @classmethod
+    def from_sdf(cls, filepath: Union[str, Path]):
+        '''
+        Create a conformer ensemble from a multi-record sdf file
+
+        Parameters
+        ----------
+        filepath : str
+            sdf file path
+
+        Returns
+        -------
+        ensemble : ConformerEnsemble
+            conformer ensemble object
+        '''
+        # parse
+        MolParserC = MolParser(str(filepath))
+        topology, xyzFrames, conformerProperties = MolParserC.sdf_conformers_parser()
+        # atoms
+        atomElements = [str(i).strip() for i in topology['atom_elements']]
+        # res
+        return cls(atomElements, xyzFrames, topology,
+                   conformer_properties=conformerProperties)
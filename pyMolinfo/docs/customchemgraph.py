@@ -17,11 +17,11 @@ class CustomChemGraph():
 
     # child group
 
-    def __init__(self, functional_groups):
+    def __init__(self, functional_groups, graphs=None):
         self.functional_groups = functional_groups
 
-        # create graph
-        __functional_groups = self.create_custom_graph(
+        # create graph (precompiled graphs are used as is)
+        __functional_groups = graphs if graphs is not None else self.create_custom_graph(
             self.functional_groups)
 
         # create list
@@ -32,6 +32,52 @@ class CustomChemGraph():
     def custom_functional_groups(self):
         return self._custom_functional_groups
 
+    @staticmethod
+    def subgroup_links(custom_functional_group):
+        '''
+        Find the subgroups of each custom functional group in one pass over the bonds
+
+        Parameters
+        ----------
+        custom_functional_group : list[dict]
+            list of custom functional group
+
+        Returns
+        -------
+        g_sub_collection : dict
+            group name -> subgroup names (a bond string equal to a group name)
+
+        Notes
+        -----
+        - subgroup names are ordered by the group definition order, the same as
+          comparing every group with every bond string
+        '''
+        # group names (lower case -> definition order and name)
+        ranks = {}
+        for rank, k in enumerate(dict.fromkeys(list(fg.keys())[0] for fg in custom_functional_group)):
+            ranks.setdefault(str(k).strip().lower(), []).append(
+                (rank, str(k).strip()))
+
+        # group and subgroup collection
+        g_sub_collection = {str(list(fg.keys())[0]).strip(): []
+                            for fg in custom_functional_group}
+        links = {k: [] for k in g_sub_collection}
+
+        # looping through the bond strings (once)
+        for i, fg in enumerate(custom_functional_group):
+            # group name
+            group_name_ = str(list(fg.keys())[0]).strip()
+            for j, group_value_ in enumerate(list(fg.values())[0]):
+                for rank, name in ranks.get(str(group_value_).lower(), []):
+                    links[group_name_].append((rank, i, j, name))
+
+        # definition order
+        for k, v in links.items():
+            g_sub_collection[k] = [name for *_, name in sorted(v)]
+
+        # res
+        return g_sub_collection
+
     def create_custom_graph_V1(self, custom_functional_group):
         '''
         create custom graph
@@ -88,32 +134,8 @@ class CustomChemGraph():
         >>> {'fg3': ["-C1","C1-H2"]}
         >>>    ]
         '''
-        # group name and number of elements in the group
-        custom_group_details = {list(fg.keys())[0]: len(
-            list(fg.values())[0]) for fg in custom_functional_group}
-
-        # group and subgroup collection
-        g_sub_collection = {str(k).strip(): []
-                            for k in custom_group_details.keys()}
-
-        # looping through the custom functional group
-        for k, v in custom_group_details.items():
-            # group name
-            group_name_ = str(k).strip()
-
-            # looping through the custom functional group
-            for fg in custom_functional_group:
-                # group name
-                group_name__ = str(list(fg.keys())[0]).strip()
-
-                # group values
-                group_values__ = list(fg.values())[0]
-
-                # looping through the group values
-                for group_value___ in group_values__:
-                    # check group_name_ in group_value_
-                    if group_name_.lower() == group_value___.lower():
-                        g_sub_collection[group_name__].append(group_name_)
+        # group and subgroup collection (linear time)
+        g_sub_collection = CustomChemGraph.subgroup_links(custom_functional_group)
 
         # graph list
         G_list = []
@@ -178,6 +200,11 @@ class CustomChemGraph():
                     # save
                     G_list.append((key, G))
 
+        # graphs by name
+        G_names = {}
+        for key, G_ in G_list:
+            G_names.setdefault(key, G_)
+
         # looping through g_sub_collection
         for k, v in g_sub_collection.items():
             # check
@@ -187,10 +214,8 @@ class CustomChemGraph():
 
                 # looping through v
                 for v_ in v:
-                    # get graph
-                    G_ = [item[1] for item in G_list if item[0] == v_][0]
-                    # append
-                    graphs_.append(G_)
+                    # get graph (the first graph of the name)
+                    graphs_.append(G_names[v_])
 
                 # save graph
                 G_list.append((k, graphs_))
@@ -221,32 +246,8 @@ class CustomChemGraph():
         >>> {'molecule3': ["-C1","C1-H2"]}
         >>>    ]
         '''
-        # group name and number of elements in the group
-        custom_group_details = {list(fg.keys())[0]: len(
-            list(fg.values())[0]) for fg in custom_molecules}
-
-        # group and subgroup collection
-        g_sub_collection = {str(k).strip(): []
-                            for k in custom_group_details.keys()}
-
-        # looping through the custom functional group
-        for k, v in custom_group_details.items():
-            # group name
-            group_name_ = str(k).strip()
-
-            # looping through the custom functional group
-            for fg in custom_molecules:
-                # group name
-                group_name__ = str(list(fg.keys())[0]).strip()
-
-                # group values
-                group_values__ = list(fg.values())[0]
-
-                # looping through the group values
-                for group_value___ in group_values__:
-                    # check group_name_ in group_value_
-                    if group_name_.lower() == group_value___.lower():
-                        g_sub_collection[group_name__].append(group_name_)
+        # group and subgroup collection (linear time)
+        g_sub_collection = CustomChemGraph.subgroup_links(custom_molecules)
 
         # graph list
         G_list = []
@@ -311,6 +312,11 @@ class CustomChemGraph():
                     # save
                     G_list.append((key, G))
 
+        # graphs by name
+        G_names = {}
+        for key, G_ in G_list:
+            G_names.setdefault(key, G_)
+
         # looping through g_sub_collection
         for k, v in g_sub_collection.items():
             # check
@@ -320,10 +326,8 @@ class CustomChemGraph():
 
                 # looping through v
                 for v_ in v:
-                    # get graph
-                    G_ = [item[1] for item in G_list if item[0] == v_][0]
-                    # append
-                    graphs_.append(G_)
+                    # get graph (the first graph of the name)
+                    graphs_.append(G_names[v_])
 
                 # save graph
                 G_list.append((k, graphs_))
@@ -354,32 +358,8 @@ class CustomChemGraph():
         >>> {'molecule3': ["-C1","C1-H2"]}
         >>>    ]
         '''
-        # group name and number of elements in the group
-        custom_group_details = {list(fg.keys())[0]: len(
-            list(fg.values())[0]) for fg in custom_molecules}
-
-        # group and subgroup collection
-        g_sub_collection = {str(k).strip(): []
-                            for k in custom_group_details.keys()}
-
-        # looping through the custom functional group
-        for k, v in custom_group_details.items():
-            # group name
-            group_name_ = str(k).strip()
-
-            # looping through the custom functional group
-            for fg in custom_molecules:
-                # group name
-                group_name__ = str(list(fg.keys())[0]).strip()
-
-                # group values
-                group_values__ = list(fg.values())[0]
-
-                # looping through the group values
-                for group_value___ in group_values__:
-                    # check group_name_ in group_value_
-                    if group_name_.lower() == group_value___.lower():
-                        g_sub_collection[group_name__].append(group_name_)
+        # group and subgroup collection (linear time)
+        g_sub_collection = CustomChemGraph.subgroup_links(custom_molecules)
 
         # graph list
         G_list = []
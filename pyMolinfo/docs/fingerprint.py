@@ -0,0 +1,488 @@
+# FINGERPRINT
+# ------------
+
+# import packages/modules
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+class Fingerprint():
+    '''
+    Path and circular fingerprints of compound graphs (packed uint64 bit arrays)
+
+    hint:
+        element/bond-order paths (up to path_length bonds) and circular atom
+        neighbourhoods (up to radius bonds) are hashed into n_bits bits, the
+        hash is stable between processes, so fingerprints can be stored
+    '''
+    # fingerprint size (bits, a multiple of 64)
+    n_bits = 2048
+    # maximum path length (bonds)
+    path_length = 7
+    # circular neighbourhood radius (bonds)
+    radius = 2
+    # popcount of bytes (numpy without bitwise_count)
+    __byte_counts = np.array([bin(i).count('1')
+                             for i in range(256)], dtype=np.uint8)
+
+    @staticmethod
+    def feature_hash(label):
+        '''
+        Stable 64-bit hash of a feature label
+        '''
+        return int.from_bytes(hashlib.blake2b(
+            label.encode(), digest_size=8).digest(), 'little')
+
+    @staticmethod
+    def path_features(compact, path_length):
+        '''
+        Element/bond-order paths of a compact graph (both directions are the same path)
+
+        Parameters
+        ----------
+        compact : CompactGraph
+            compact graph
+        path_length : int
+            maximum number of bonds
+
+        Returns
+        -------
+        features : set
+            path labels such as 'C1C2O'
+        '''
+        symbols = compact.symbols
+        indptr = compact.indptr.tolist()
+        indices = compact.indices.tolist()
+        orders = compact.bond_order.tolist()
+
+        features = set()
+        for root in range(len(symbols)):
+            # dfs (simple paths from the root)
+            stack = [(root, [symbols[root]], (root,))]
+            while stack:
+                node, labels, path = stack.pop()
+                # canonical direction
+                label = ''.join(labels)
+                reverse = ''.join(reversed(labels))
+                features.add(min(label, reverse))
+                # check
+                if len(path) > path_length:
+                    continue
+                for k in range(indptr[node], indptr[node + 1]):
+                    nbr = indices[k]
+                    if nbr not in path:
+                        stack.append(
+                            (nbr, labels + [str(orders[k]), symbols[nbr]], path + (nbr,)))
+        # res
+        return features
+
+    @staticmethod
+    def circular_features(compact, radius, atom_labels=None):
+        '''
+        Circular neighbourhoods of a compact graph (atom identifiers updated
+        with the sorted bond orders and identifiers of the neighbours)
+
+        Parameters
+        ----------
+        compact : CompactGraph
+            compact graph
+        radius : int
+            number of iterations (bonds)
+        atom_labels : list
+            initial atom labels (default element and degree)
+
+        Returns
+        -------
+        features : set
+            atom identifiers of all iterations
+        '''
+        indptr = compact.indptr.tolist()
+        indices = compact.indices.tolist()
+        orders = compact.bond_order.tolist()
+        # initial identifiers
+        if atom_labels is None:
+            atom_labels = [f"{s}|{d}" for s, d in zip(
+                compact.symbols, compact.degree.tolist())]
+        ids = [Fingerprint.feature_hash(label) for label in atom_labels]
+
+        features = set(ids)
+        for r in range(radius):
+            ids = [Fingerprint.feature_hash(f"{r}|{ids[i]}|" + ','.join(
+                sorted(f"{orders[k]}:{ids[indices[k]]}" for k in range(indptr[i], indptr[i + 1]))))
+                for i in range(len(ids))]
+            features.update(ids)
+        # res
+        return features
+
+    @staticmethod
+    def generate(compact, n_bits=None, path_length=None, radius=None, atom_labels=None):
+        '''
+        Generate the fingerprint of a compact graph
+
+        Parameters
+        ----------
+        compact : CompactGraph
+            compact graph
+        n_bits : int
+            fingerprint size (default 2048, a multiple of 64)
+        path_length : int
+            maximum path length (default 7 bonds)
+        radius : int
+            circular neighbourhood radius (default 2 bonds)
+        atom_labels : list
+            initial atom labels of circular features
+
+        Returns
+        -------
+        fingerprint : np.ndarray
+            packed bits (n_bits / 64 uint64 words)
+        '''
+        # set
+        n_bits = Fingerprint.n_bits if n_bits is None else n_bits
+        path_length = Fingerprint.path_length if path_length is None else path_length
+        radius = Fingerprint.radius if radius is None else radius
+        # check
+        if n_bits < 64 or n_bits % 64 != 0:
+            raise Exception("n_bits must be a positive multiple of 64!")
+
+        # hashes
+        hashes = [Fingerprint.feature_hash(f"p|{label}") for label in
+                  Fingerprint.path_features(compact, path_length)]
+        hashes.extend(Fingerprint.circular_features(
+            compact, radius, atom_labels))
+
+        # res
+        return Fingerprint.fold(hashes, n_bits)
+
+    @staticmethod
+    def fold(hashes, n_bits):
+        '''
+        Set the bits of feature hashes (hash % n_bits)
+
+        Parameters
+        ----------
+        hashes : iterable
+            64-bit feature hashes
+        n_bits : int
+            number of bits (a multiple of 64)
+
+        Returns
+        -------
+        bits : np.ndarray
+            packed bits (n_bits / 64 uint64 words)
+        '''
+        bits = np.asarray([h % n_bits for h in hashes], dtype=np.uint64)
+        words = np.zeros(n_bits // 64, dtype=np.uint64)
+        np.bitwise_or.at(words, (bits >> np.uint64(6)).astype(np.int64),
+                         np.left_shift(np.uint64(1), bits & np.uint64(63)))
+        # res
+        return words
+
+    @staticmethod
+    def popcount(words):
+        '''
+        Number of set bits of fingerprints (last axis)
+
+        Parameters
+        ----------
+        words : np.ndarray
+            packed fingerprints (..., words)
+
+        Returns
+        -------
+        counts : np.ndarray
+            set bits of each fingerprint
+        '''
+        words = np.ascontiguousarray(words, dtype=np.uint64)
+        if hasattr(np, 'bitwise_count'):
+            return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+        # byte table
+        return Fingerprint.__byte_counts[words.view(np.uint8)].reshape(
+            words.shape[:-1] + (-1,)).sum(axis=-1, dtype=np.int64)
+
+    @staticmethod
+    def tanimoto(query, fingerprints, counts=None):
+        '''
+        Tanimoto similarity of a query against fingerprints
+
+        Parameters
+        ----------
+        query : np.ndarray
+            packed query fingerprint
+        fingerprints : np.ndarray
+            packed fingerprints (n, words)
+        counts : np.ndarray
+            set bits of the fingerprints (computed if not provided)
+
+        Returns
+        -------
+        similarity : np.ndarray
+            similarity of each fingerprint (0 if both are empty)
+        '''
+        fingerprints = np.atleast_2d(fingerprints)
+        if counts is None:
+            counts = Fingerprint.popcount(fingerprints)
+        common = Fingerprint.popcount(fingerprints & query)
+        union = counts + Fingerprint.popcount(query) - common
+        # res
+        return np.divide(common, union, out=np.zeros(len(common)), where=union > 0)
+
+
+class FingerprintLibrary():
+    '''
+    Stored fingerprints of a compound library with top-k similarity search
+
+    hint:
+        fingerprints are kept as one (n, words) uint64 matrix with the set
+        bits of each row, a query is compared chunk by chunk and only the
+        best k rows of each chunk are kept
+    '''
+    # rows compared at once
+    chunk_size = 65536
+
+    def __init__(self, n_bits=None, path_length=None, radius=None, implicit_h=True):
+        # fingerprint settings
+        self.n_bits = Fingerprint.n_bits if n_bits is None else n_bits
+        self.path_length = Fingerprint.path_length if path_length is None else path_length
+        self.radius = Fingerprint.radius if radius is None else radius
+        self.implicit_h = implicit_h
+        # row ids (file:record or source index)
+        self.row_ids = []
+        # row id -> error message
+        self.errors = {}
+        # fingerprints (appended blocks, joined on search)
+        self.__blocks = []
+        self.__fingerprints = np.zeros((0, self.n_bits // 64), dtype=np.uint64)
+        self.__counts = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def __str__(self):
+        return f"FingerprintLibrary({len(self.row_ids)} compounds, {self.n_bits} bits)"
+
+    @property
+    def settings(self):
+        '''
+        Fingerprint settings (n_bits, path_length, radius, implicit_h)
+        '''
+        return dict(n_bits=self.n_bits, path_length=self.path_length,
+                    radius=self.radius, implicit_h=self.implicit_h)
+
+    @property
+    def fingerprints(self):
+        '''
+        Packed fingerprints (rows x words)
+        '''
+        self.__join()
+        return self.__fingerprints
+
+    def __join(self):
+        '''
+        Join the appended blocks to the fingerprint matrix
+        '''
+        if self.__blocks:
+            blocks = np.vstack(self.__blocks)
+            self.__fingerprints = np.vstack([self.__fingerprints, blocks])
+            self.__counts = np.concatenate(
+                [self.__counts, Fingerprint.popcount(blocks)])
+            self.__blocks = []
+
+    def add(self, row_id, fingerprint):
+        '''
+        Add a fingerprint
+
+        Parameters
+        ----------
+        row_id : str
+            row id
+        fingerprint : np.ndarray
+            packed fingerprint (n_bits / 64 words)
+        '''
+        fingerprint = np.asarray(fingerprint, dtype=np.uint64)
+        # check
+        if fingerprint.shape != (self.n_bits // 64,):
+            raise Exception("fingerprint size does not match the library!")
+        self.row_ids.append(str(row_id))
+        self.__blocks.append(fingerprint[None, :])
+
+    def compute(self, item):
+        '''
+        Fingerprint of an item (compound, file path, sdf content or fingerprint)
+        '''
+        # local
+        from .screen import Screen
+
+        if isinstance(item, np.ndarray):
+            return np.asarray(item, dtype=np.uint64)
+        return Screen.load(item).fingerprint(**self.settings)
+
+    def extend(self, source, workers=None, chunk_size=64):
+        '''
+        Add the fingerprints of a source (see Screen.iter_source)
+
+        Parameters
+        ----------
+        source : str | Path | iterable
+            multi-record sdf file, directory or an iterable of compounds
+        workers : int
+            number of worker processes (default None: this process)
+        chunk_size : int
+            compounds per task (default 64)
+
+        Returns
+        -------
+        self : FingerprintLibrary
+            library
+        '''
+        # local
+        from .screen import Screen
+
+        # check
+        if chunk_size < 1:
+            raise Exception("chunk_size must be a positive number!")
+
+        def _collect(results):
+            for rowId, fingerprint, error in results:
+                if error is not None:
+                    self.errors[rowId] = error
+                    # empty fingerprint (stable rows)
+                    fingerprint = np.zeros(self.n_bits // 64, dtype=np.uint64)
+                self.add(rowId, fingerprint)
+
+        chunks = Screen.chunks(source, chunk_size)
+        if workers is None or workers <= 1:
+            # this process
+            for chunk in chunks:
+                _collect(_fingerprint_chunk(chunk, self.settings))
+        else:
+            # process pool (a bounded window of chunks, source order)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                window = deque()
+                for chunk in chunks:
+                    window.append(pool.submit(
+                        _fingerprint_chunk, chunk, self.settings))
+                    if len(window) >= workers * Screen.chunks_per_worker:
+                        _collect(window.popleft().result())
+                while window:
+                    _collect(window.popleft().result())
+
+        # res
+        return self
+
+    def search(self, query, k=10, threshold=0.0):
+        '''
+        Find the most similar fingerprints of a query (tanimoto similarity)
+
+        Parameters
+        ----------
+        query : Compound | str | np.ndarray
+            query compound, file path, sdf content or fingerprint
+        k : int
+            number of matches (default 10)
+        threshold : float
+            minimum similarity (default 0)
+
+        Returns
+        -------
+        res : list[dict]
+            row_id, index and similarity, most similar first (ties in row order)
+        '''
+        # check
+        if k < 1:
+            raise Exception("k must be a positive number!")
+        q = self.compute(query)
+        if q.shape != (self.n_bits // 64,):
+            raise Exception("query fingerprint size does not match the library!")
+
+        self.__join()
+        fingerprints = self.__fingerprints
+        counts = self.__counts
+
+        # best rows of each chunk
+        indices = []
+        similarities = []
+        for start in range(0, len(fingerprints), self.chunk_size):
+            _end = start + self.chunk_size
+            _sim = Fingerprint.tanimoto(
+                q, fingerprints[start:_end], counts[start:_end])
+            if len(_sim) > k:
+                # rows at or above the k-th similarity (ties kept)
+                _kth = np.partition(-_sim, k - 1)[k - 1]
+                _best = np.flatnonzero(-_sim <= _kth)
+                # similarity, then row order
+                _best = _best[np.lexsort((_best, -_sim[_best]))[:k]]
+            else:
+                _best = np.arange(len(_sim))
+            indices.append(_best + start)
+            similarities.append(_sim[_best])
+
+        # check
+        if not indices:
+            return []
+        indices = np.concatenate(indices)
+        similarities = np.concatenate(similarities)
+
+        # top-k (similarity, then row order)
+        order = np.lexsort((indices, -similarities))[:k]
+        # res
+        return [{'row_id': self.row_ids[i], 'index': int(i), 'similarity': float(s)}
+                for i, s in zip(indices[order].tolist(), similarities[order].tolist())
+                if s >= threshold]
+
+    def save(self, file_path):
+        '''
+        Save the library (npz)
+        '''
+        self.__join()
+        np.savez_compressed(
+            file_path, fingerprints=self.__fingerprints,
+            row_ids=np.asarray(self.row_ids, dtype=str),
+            error_ids=np.asarray(list(self.errors), dtype=str),
+            error_messages=np.asarray(list(self.errors.values()), dtype=str),
+            settings=np.asarray([self.n_bits, self.path_length, self.radius,
+                                 int(self.implicit_h)], dtype=np.int64))
+
+    @staticmethod
+    def load(file_path):
+        '''
+        Load a saved library (npz)
+
+        Returns
+        -------
+        library : FingerprintLibrary
+            library
+        '''
+        with np.load(file_path, allow_pickle=False) as data:
+            n_bits, path_length, radius, implicit_h = data['settings'].tolist()
+            library = FingerprintLibrary(
+                n_bits, path_length, radius, bool(implicit_h))
+            library.row_ids = data['row_ids'].tolist()
+            library.errors = dict(
+                zip(data['error_ids'].tolist(), data['error_messages'].tolist()))
+            library.__blocks = [data['fingerprints'].astype(np.uint64)]
+        # res
+        return library
+
+
+def _fingerprint_chunk(chunk, settings):
+    '''
+    Fingerprints of a chunk of compounds
+
+    Returns
+    -------
+    res : list
+        (row id, fingerprint, error message)
+    '''
+    # local
+    from .screen import Screen
+
+    res = []
+    for rowId, item in chunk:
+        try:
+            res.append((rowId, Screen.load(item).fingerprint(**settings), None))
+        except Exception as e:
+            res.append((rowId, None, str(e)))
+    return res
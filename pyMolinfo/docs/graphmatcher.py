@@ -0,0 +1,178 @@
+# GRAPH MATCHER
+# --------------
+
+# import packages/modules
+import weakref
+from networkx.algorithms import isomorphism
+# local
+from .matchbudget import MatchBudget
+
+
+class ChemGraphMatcher(isomorphism.GraphMatcher):
+    '''
+    GraphMatcher (VF2) for functional group patterns with symmetry breaking
+
+    hint:
+        the automorphism group of a pattern is computed once, ordering
+        constraints (Grochow-Kellis) then allow one mapping per automorphism
+        class, e.g. methyl gives 1 mapping instead of 3! per occurrence
+    '''
+    # dummy node pattern (matches any element)
+    dummy_node_pattern = "XX"
+    # symmetry-breaking constraints of patterns (released with the pattern)
+    __constraints = weakref.WeakKeyDictionary()
+
+    def __init__(self, G1, G2, node_match=None, edge_match=None, symmetry_breaking=True,
+                 anchor=None, node_rank=None):
+        '''
+        Initialize a matcher
+
+        Parameters
+        ----------
+        G1 : nx.Graph
+            main graph (compound)
+        G2 : nx.Graph
+            pattern graph (functional group)
+        node_match : callable
+            node match function
+        edge_match : callable
+            edge match function
+        symmetry_breaking : bool
+            enforce ordering constraints of pattern automorphisms (default True)
+        anchor : tuple
+            (main graph node, pattern node), the search starts from this pair only
+        node_rank : dict
+            main graph node order used by the constraints (default G1 node order),
+            must be shared when G1 is a part (subgraph view) of a larger graph
+
+        Notes
+        -----
+        - mappings related by a pattern automorphism share the same node set,
+          so unique node sets (counts) are the same with or without symmetry breaking
+        '''
+        super().__init__(G1, G2, node_match=node_match, edge_match=edge_match)
+
+        # anchor
+        self.anchor = anchor
+        # budget of the running call (explored states are counted)
+        self.budget = MatchBudget.active()
+
+        # constraints
+        self.constraints = {}
+        if symmetry_breaking:
+            _constraints = ChemGraphMatcher.symmetry_constraints(G2)
+            # index by pattern node
+            for a, b in _constraints:
+                self.constraints.setdefault(a, []).append((a, b))
+                self.constraints.setdefault(b, []).append((a, b))
+            # main graph node order
+            if self.constraints:
+                self.G1_node_rank = node_rank if node_rank is not None else {
+                    n: i for i, n in enumerate(G1)}
+
+    @staticmethod
+    def node_label(symbol):
+        '''
+        Exact node label of a pattern node (all dummy nodes share one label)
+        '''
+        _symbol = str(symbol)
+        return ChemGraphMatcher.dummy_node_pattern if _symbol.startswith(
+            ChemGraphMatcher.dummy_node_pattern) else _symbol
+
+    @staticmethod
+    def automorphisms(G):
+        '''
+        Enumerate label-preserving automorphisms of a pattern (element and constraints)
+
+        Parameters
+        ----------
+        G : nx.Graph
+            pattern graph
+
+        Returns
+        -------
+        res : list
+            automorphisms (dict: node -> node)
+        '''
+        matcher = isomorphism.GraphMatcher(
+            G, G,
+            node_match=lambda n1, n2: ChemGraphMatcher.node_label(
+                n1.get('symbol')) == ChemGraphMatcher.node_label(n2.get('symbol')) and
+            {k: v for k, v in n1.items() if k != 'symbol'} == {
+                k: v for k, v in n2.items() if k != 'symbol'},
+            edge_match=lambda e1, e2: e1.get('type') == e2.get('type'))
+        # res
+        return list(matcher.isomorphisms_iter())
+
+    @classmethod
+    def symmetry_constraints(cls, G):
+        '''
+        Build symmetry-breaking constraints of a pattern (computed once per pattern)
+
+        Parameters
+        ----------
+        G : nx.Graph
+            pattern graph
+
+        Returns
+        -------
+        constraints : list
+            pairs (a, b), the main graph node mapped to a comes before the one mapped to b
+        '''
+        constraints = cls.__constraints.get(G)
+        if constraints is not None:
+            return constraints
+
+        # automorphism group
+        group = ChemGraphMatcher.automorphisms(G)
+        constraints = []
+
+        # fix nodes until only the identity is left
+        while len(group) > 1:
+            # orbits
+            orbits = {v: {sigma[v] for sigma in group} for v in G}
+            # the largest orbit (first node in pattern order)
+            v = max(G, key=lambda n: len(orbits[n]))
+            # constraints
+            for u in orbits[v]:
+                if u != v:
+                    constraints.append((v, u))
+            # stabilizer of v
+            group = [sigma for sigma in group if sigma[v] == v]
+
+        # save
+        cls.__constraints[G] = constraints
+        # res
+        return constraints
+
+    def candidate_pairs_iter(self):
+        '''
+        Candidate pairs, the first pair is the anchor (if defined)
+        '''
+        # anchor
+        if self.anchor is not None and not self.core_2:
+            yield self.anchor
+            return
+
+        yield from super().candidate_pairs_iter()
+
+    def semantic_feasibility(self, G1_node, G2_node):
+        '''
+        Node/edge match and symmetry-breaking constraints of the candidate pair
+        '''
+        # budget
+        if self.budget is not None:
+            self.budget.step(self.G2)
+
+        # constraints
+        if self.constraints and G2_node in self.constraints:
+            rank = self.G1_node_rank
+            for a, b in self.constraints[G2_node]:
+                if G2_node == a:
+                    if b in self.core_2 and rank[G1_node] > rank[self.core_2[b]]:
+                        return False
+                elif a in self.core_2 and rank[self.core_2[a]] > rank[G1_node]:
+                    return False
+
+        # node/edge match
+        return super().semantic_feasibility(G1_node, G2_node)
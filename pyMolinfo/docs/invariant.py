@@ -0,0 +1,149 @@
+# GRAPH INVARIANT
+# ----------------
+
+# import packages/modules
+import weakref
+from collections import Counter
+import networkx as nx
+
+
+class GraphInvariant():
+    '''
+    Cheap graph invariants used to reject functional group patterns before VF2
+
+    hint:
+        element multiset, bond-order histogram and maximum degree per element,
+        a pattern can only be a subgraph of a compound if all of them fit
+    '''
+    # dummy node pattern (matches any element)
+    dummy_node_pattern = "XX"
+    # invariants of graphs (released with the graph)
+    __cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, G: nx.Graph):
+        # node/edge numbers
+        self.node_numbers = G.number_of_nodes()
+        self.edge_numbers = G.number_of_edges()
+        # symbols, degrees and bond-order histogram
+        self.__fill([str(symbol) for _, symbol in G.nodes(data='symbol')],
+                    [d for _, d in G.degree],
+                    Counter(t for _, _, t in G.edges(data='type')))
+
+    def __fill(self, symbols, degrees, bond_orders):
+        '''
+        Set element multiset, maximum degrees and bond-order histogram
+        '''
+        # element multiset (dummy nodes are counted separately)
+        self.elements = Counter()
+        self.dummy_numbers = 0
+        # maximum degree per element
+        self.max_degree = {}
+        # degrees of dummy nodes
+        self.dummy_max_degree = 0
+        self.all_max_degree = 0
+
+        for _symbol, _degree in zip(symbols, degrees):
+            # all
+            self.all_max_degree = max(self.all_max_degree, _degree)
+            # check
+            if _symbol.startswith(self.dummy_node_pattern):
+                self.dummy_numbers += 1
+                self.dummy_max_degree = max(self.dummy_max_degree, _degree)
+            else:
+                self.elements[_symbol] += 1
+                self.max_degree[_symbol] = max(
+                    self.max_degree.get(_symbol, 0), _degree)
+
+        # bond-order histogram
+        self.bond_orders = bond_orders
+
+    @classmethod
+    def from_compact(cls, compact):
+        '''
+        Get invariants of a compact graph (csr arrays, no networkx graph)
+
+        Parameters
+        ----------
+        compact : CompactGraph
+            compact graph
+
+        Returns
+        -------
+        invariant : GraphInvariant
+            graph invariants
+        '''
+        invariant = cls.__new__(cls)
+        invariant.node_numbers = len(compact)
+        invariant.edge_numbers = compact.number_of_edges()
+        invariant.__fill(*compact.invariant_data())
+        return invariant
+
+    @classmethod
+    def register(cls, G: nx.Graph, invariant):
+        '''
+        Set invariants of a graph computed elsewhere (such as its compact graph)
+        '''
+        cls.__cache[G] = invariant
+
+    @classmethod
+    def of(cls, G: nx.Graph):
+        '''
+        Get invariants of a graph (computed once per graph object)
+
+        Parameters
+        ----------
+        G : nx.Graph
+            graph
+
+        Returns
+        -------
+        invariant : GraphInvariant
+            graph invariants
+        '''
+        invariant = cls.__cache.get(G)
+        if invariant is None:
+            invariant = cls(G)
+            cls.__cache[G] = invariant
+        return invariant
+
+    def contains(self, pattern):
+        '''
+        Check a pattern can be a subgraph of this graph (necessary condition)
+
+        Parameters
+        ----------
+        pattern : GraphInvariant
+            pattern invariants
+
+        Returns
+        -------
+        res : bool
+            False if the pattern cannot be found
+        '''
+        # size
+        if pattern.node_numbers > self.node_numbers or pattern.edge_numbers > self.edge_numbers:
+            return False
+
+        # bond orders
+        for bondType, n in pattern.bond_orders.items():
+            if n > self.bond_orders.get(bondType, 0):
+                return False
+
+        # degrees
+        if pattern.all_max_degree > self.all_max_degree:
+            return False
+
+        # dummy nodes in the main graph match any element
+        if self.dummy_numbers > 0:
+            return True
+
+        # elements
+        for symbol, n in pattern.elements.items():
+            if n > self.elements.get(symbol, 0):
+                return False
+            # maximum degree
+            if pattern.max_degree[symbol] > self.max_degree[symbol]:
+                return False
+
+        # res
+        return True
@@ -0,0 +1,177 @@
+# MATCH BUDGET
+# -------------
+
+# import packages/modules
+import time
+import contextvars
+
+# active budget of the running check/count call
+_ACTIVE_BUDGET = contextvars.ContextVar('match_budget', default=None)
+
+
+class MatchTimeout(Exception):
+    '''
+    Raised inside a matcher when a budget is exhausted or cancelled
+
+    Parameters
+    ----------
+    scope : str
+        'pattern' (only the running pattern is stopped) or 'call' (all matching is stopped)
+    status : str
+        'timed_out' or 'cancelled'
+    '''
+
+    def __init__(self, scope, status):
+        super().__init__(f"matching {status} ({scope} budget)")
+        self.scope = scope
+        self.status = status
+
+
+class MatchBudget():
+    '''
+    Time and state budgets of functional group matching with cooperative cancellation
+
+    hint:
+        every state explored by a matcher (candidate pair) is counted, the
+        limits and the cancellation flag are checked at each state, so a
+        pathological pattern stops instead of hanging the call
+    '''
+
+    def __init__(self, time_limit=None, max_states=None, pattern_time_limit=None,
+                 pattern_max_states=None):
+        '''
+        Initialize a budget
+
+        Parameters
+        ----------
+        time_limit : float
+            wall-clock limit of a call in seconds (default None: no limit)
+        max_states : int
+            maximum number of explored states of a call (default None: no limit)
+        pattern_time_limit : float
+            matching time limit of each pattern in seconds (default None: no limit)
+        pattern_max_states : int
+            maximum number of explored states of each pattern (default None: no limit)
+        '''
+        self.time_limit = time_limit
+        self.max_states = max_states
+        self.pattern_time_limit = pattern_time_limit
+        self.pattern_max_states = pattern_max_states
+
+        # cancellation token
+        self._cancelled = False
+        # state
+        self._status = 'ok'
+        self._token = None
+        self.reset()
+
+    def reset(self):
+        '''
+        Reset counters (a new call), the cancellation flag is kept
+        '''
+        self._start = time.perf_counter()
+        self._last = self._start
+        self._last_key = None
+        self._states = 0
+        # pattern -> [states, elapsed time]
+        self._patterns = {}
+        self._status = 'cancelled' if self._cancelled else 'ok'
+
+    def __enter__(self):
+        self.reset()
+        self._token = _ACTIVE_BUDGET.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ACTIVE_BUDGET.reset(self._token)
+        self._token = None
+        return False
+
+    @staticmethod
+    def active():
+        '''
+        Budget of the running call (None if no budget is set)
+        '''
+        return _ACTIVE_BUDGET.get()
+
+    def cancel(self):
+        '''
+        Cancel matching (can be called from another thread)
+        '''
+        self._cancelled = True
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @property
+    def states(self):
+        return self._states
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    @property
+    def status(self):
+        '''
+        'ok', 'timed_out' or 'cancelled'
+        '''
+        return self._status
+
+    def exhausted(self):
+        '''
+        Check the call budget is exhausted or cancelled
+
+        Returns
+        -------
+        res : bool
+            True if matching must stop
+        '''
+        if self._cancelled:
+            self._status = 'cancelled'
+        elif (self.max_states is not None and self._states >= self.max_states) or \
+                (self.time_limit is not None and self.elapsed >= self.time_limit):
+            self._status = 'timed_out'
+        return self._status != 'ok'
+
+    def step(self, key):
+        '''
+        Count an explored state of a pattern
+
+        Parameters
+        ----------
+        key : object
+            pattern (graph)
+
+        Raises
+        ------
+        MatchTimeout
+            if a budget is exhausted or matching is cancelled
+        '''
+        now = time.perf_counter()
+        self._states += 1
+
+        # pattern counters
+        counters = self._patterns.get(key)
+        if counters is None:
+            counters = self._patterns[key] = [0, 0.0]
+        counters[0] += 1
+        if self._last_key is key:
+            counters[1] += now - self._last
+        self._last = now
+        self._last_key = key
+
+        # call
+        if self._cancelled:
+            self._status = 'cancelled'
+            raise MatchTimeout('call', 'cancelled')
+        if (self.max_states is not None and self._states > self.max_states) or \
+                (self.time_limit is not None and now - self._start > self.time_limit):
+            self._status = 'timed_out'
+            raise MatchTimeout('call', 'timed_out')
+
+        # pattern
+        if (self.pattern_max_states is not None and counters[0] > self.pattern_max_states) or \
+                (self.pattern_time_limit is not None and counters[1] > self.pattern_time_limit):
+            raise MatchTimeout('pattern', 'timed_out')
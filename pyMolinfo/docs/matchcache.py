@@ -0,0 +1,91 @@
+# MATCH CACHE
+# ------------
+
+# import packages/modules
+from collections import OrderedDict
+
+
+class MatchCache():
+    '''
+    Process-wide LRU cache of functional group results
+
+    hint:
+        results are keyed by the structure hash of a compound (elements and
+        bonds), the same structure gives the same results in every compound
+        object, the least recently used results are evicted first
+    '''
+    # maximum number of results
+    maxsize = 4096
+    # results (key -> result)
+    __cache = OrderedDict()
+    # hits/misses
+    __stats = {'hits': 0, 'misses': 0}
+
+    @classmethod
+    def get(cls, key):
+        '''
+        Get a result
+
+        Parameters
+        ----------
+        key : tuple
+            (structure hash, ...)
+
+        Returns
+        -------
+        res : object
+            cached result, None if not found
+        '''
+        res = cls.__cache.get(key)
+        # check
+        if res is None:
+            cls.__stats['misses'] += 1
+            return None
+        # recently used
+        cls.__cache.move_to_end(key)
+        cls.__stats['hits'] += 1
+        return res
+
+    @classmethod
+    def put(cls, key, value):
+        '''
+        Save a result (the least recently used results are evicted)
+
+        Parameters
+        ----------
+        key : tuple
+            (structure hash, ...)
+        value : object
+            result
+        '''
+        cls.__cache[key] = value
+        cls.__cache.move_to_end(key)
+        # evict
+        while len(cls.__cache) > max(cls.maxsize, 0):
+            cls.__cache.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        '''
+        Remove all results
+        '''
+        cls.__cache.clear()
+        cls.__stats['hits'] = 0
+        cls.__stats['misses'] = 0
+
+    @classmethod
+    def info(cls):
+        '''
+        Cache info
+
+        Returns
+        -------
+        res : dict
+            hits, misses, size and maxsize
+        '''
+        return {
+            'hits': cls.__stats['hits'],
+            'misses': cls.__stats['misses'],
+            'size': len(cls.__cache),
+            'maxsize': cls.maxsize
+        }
@@ -83,7 +83,9 @@ class MolParser():
             # method selection
             parserFun = {
                 'sdf': self.sdf_parser,
-                'json': self.json_parser
+                'json': self.json_parser,
+                'gjf': self.gjf_parser,
+                'com': self.gjf_parser
             }
 
             # parse file
@@ -320,6 +322,472 @@ class MolParser():
         # return
         return res
 
+    def sdf_conformers_parser(self, sdfSource=None):
+        '''
+        Parse a multi-record sdf file (conformers of one compound)
+
+        Parameters
+        ----------
+        sdfSource : str
+            sdf content, if None the file path is streamed (default None)
+
+        Returns
+        -------
+        topology : dict
+            parsed compound properties of the first record (the same as sdf parser)
+        xyzFrames : np.ndarray
+            coordinates of all records (n_conf, n_atoms, 3)
+        conformerProperties : list
+            sdf properties of each record
+
+        Notes
+        -----
+        - only the first record is fully parsed, for the other records the atom block is read
+        - all records must have the same atoms (one topology)
+        '''
+        # records
+        if sdfSource is None:
+            # count records (binary pass)
+            recordNo = 0
+            lastLine = b''
+            with open(self.filepath, 'rb') as f:
+                for line in f:
+                    if line.startswith(b'$$$$'):
+                        recordNo += 1
+                        lastLine = b''
+                    elif line.strip():
+                        lastLine = line
+            if lastLine:
+                recordNo += 1
+            # lines
+            sourceFile = open(self.filepath, 'r')
+            sourceLines = sourceFile
+        else:
+            sourceFile = None
+            sourceLines = sdfSource.splitlines()
+            recordNo = sum(1 for line in sourceLines if line.startswith(
+                '$$$$')) + (0 if sdfSource.strip().endswith('$$$$') else 1)
+
+        try:
+            topology = None
+            xyzFrames = None
+            conformerProperties = []
+            k = 0
+            for record in MolParser.__sdf_records(sourceLines):
+                # content
+                recordContent = '\n'.join(record)
+                # check
+                if topology is None:
+                    # the first record (topology)
+                    topology = self.sdf_parser(recordContent)
+                    atomNo = topology['atom_numbers']
+                    atomList = [str(i).strip()
+                                for i in topology['atom_elements']]
+                    # preallocate
+                    xyzFrames = np.empty((recordNo, atomNo, 3))
+                    xyzFrames[0] = topology['xyz_list']
+                    conformerProperties.append(
+                        topology['compound_properties'])
+                else:
+                    # counts line (fixed width)
+                    _atomNo = int(record[3][0:3])
+                    if _atomNo != atomNo:
+                        raise Exception(
+                            f'record {k+1} does not have {atomNo} atoms.')
+                    # atom block
+                    _frame = xyzFrames[k]
+                    for i in range(atomNo):
+                        _atomRow = record[4+i].split()
+                        # check
+                        if _atomRow[3] != atomList[i]:
+                            raise Exception(
+                                f'record {k+1} atoms do not match the first record.')
+                        _frame[i, 0] = float(_atomRow[0])
+                        _frame[i, 1] = float(_atomRow[1])
+                        _frame[i, 2] = float(_atomRow[2])
+                    # properties
+                    conformerProperties.append(MolParser.__var_analyzer(
+                        MolParser.__var_finder(recordContent)))
+                k += 1
+        finally:
+            if sourceFile is not None:
+                sourceFile.close()
+
+        # check
+        if topology is None:
+            raise Exception('sdf record is not found.')
+
+        # res
+        return topology, xyzFrames[:k], conformerProperties
+
+    @staticmethod
+    def sdf_records(filepath):
+        '''
+        Stream the records of a multi-record sdf file
+
+        Parameters
+        ----------
+        filepath : str
+            sdf file path (records separated by $$$$)
+
+        Yields
+        ------
+        record : str
+            sdf content of a record
+        '''
+        with open(filepath, 'r') as f:
+            for record in MolParser.__sdf_records(f):
+                yield '\n'.join(record)
+
+    @staticmethod
+    def __sdf_records(lines):
+        '''
+        Split sdf lines into records (separated by $$$$)
+
+        Parameters
+        ----------
+        lines : iterable
+            sdf lines
+
+        Yields
+        ------
+        record : list
+            lines of a record
+        '''
+        record = []
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if line.startswith('$$$$'):
+                yield record
+                record = []
+            else:
+                record.append(line)
+        # last record without $$$$
+        if any(line.strip() for line in record):
+            yield record
+
+    def build_compound_info(self, atomList, xyzList, bondMatrix, mat_cid=None, mat_name='',
+                            compound_properties=None):
+        '''
+        Build compound info (the same as sdf parser output) from atoms, coordinates and bonds
+
+        Parameters
+        ----------
+        atomList : list
+            atom symbols such as ['C','H','H','H','H']
+        xyzList : list
+            list of xyz points
+        bondMatrix : np.ndarray
+            bond list [atom1 id, atom2 id, bond type], ids start from 1
+        mat_cid : str
+            cid number (default None)
+        mat_name : str
+            compound name (default '')
+        compound_properties : dict
+            compound properties (default None)
+
+        Returns
+        -------
+        res : dict
+            parsed compound properties
+        '''
+        # set
+        compound_properties = {} if compound_properties is None else compound_properties
+        atomList = [str(i).strip() for i in atomList]
+        xyzList = np.array(xyzList, dtype=np.float64)
+        bondMatrix = np.array(bondMatrix, dtype='i').reshape(-1, 3)
+        # atom no
+        atomNo = len(atomList)
+        # bond no
+        bondNo = len(bondMatrix)
+
+        atoms = []
+        # atoms position
+        for i in range(atomNo):
+            # position
+            _x, _y, _z = [float(v) for v in xyzList[i]]
+            # atom info
+            atoms.append({
+                'id': i+1,
+                'symbol': atomList[i],
+                'index': i+1,
+                'x': _x,
+                'y': _y,
+                'z': _z,
+                'position': {
+                    'x': _x,
+                    'y': _y,
+                    'z': _z
+                },
+                'xyz': [_x, _y, _z]
+            })
+
+        # object base
+        objectBaseCoordinate = Structure.CenterPoints(xyzList)
+        # move to the center [0,0,0]
+        xyzCenterList, movingCoordinate = Structure.CenterObject(
+            xyzList, objectBaseCoordinate)
+
+        # create mat formula
+        matFormula = Structure.create_formula(atomList)
+
+        # bond analysis (grouped by the first atom)
+        atomBonds = {}
+        for _id1, _id2, _bondType in bondMatrix:
+            # atom 2 name
+            _nameAtom2 = atomList[_id2-1]
+            # str bond
+            _bondName = atomList[_id1-1] + _nameAtom2
+            atomBonds.setdefault(int(_id1), []).append(
+                (int(_id2), _nameAtom2, _bondName, int(_bondType)))
+
+        bondList = [
+            {
+                'id': _id,
+                'symbol': atomList[_id-1],
+                'bonds': atomBonds[_id]
+            } for _id in sorted(atomBonds.keys())
+        ]
+
+        # res
+        res = {
+            'header_block': '',
+            'counts_line': '',
+            'atom_numbers': atomNo,
+            'mat_cid': mat_cid,
+            'mat_name': mat_name,
+            'mat_formula': matFormula,
+            'mat_mass': None,
+            'atom_names': atomList,
+            'atom_elements': atomList,
+            'bond_numbers': bondNo,
+            'atom_block': atoms,
+            'bond_block': bondList,
+            'xyz_list': xyzList,
+            'xyz_center_list': xyzCenterList,
+            'compound_properties': compound_properties
+        }
+
+        # return
+        return res
+
+    def gjf_parser(self, gjfSource):
+        '''
+        Parse gaussian input file (gjf/com), cartesian coordinates
+
+        Parameters
+        ----------
+        gjfSource : str
+            gaussian input file content
+
+        Returns
+        -------
+        res : dict
+            parsed compound properties (the same as sdf parser)
+
+        Notes
+        -----
+        - bonds are taken from the connectivity section (geom=connectivity)
+        - otherwise bonds are found using covalent radii (all single bonds)
+        '''
+        # sections are separated by blank lines
+        lines = [line.strip() for line in gjfSource.splitlines()]
+        # link0 commands
+        i = 0
+        link0 = []
+        while i < len(lines) and (lines[i].startswith('%') or len(lines[i]) == 0):
+            if lines[i]:
+                link0.append(lines[i])
+            i += 1
+
+        # route section
+        route = []
+        while i < len(lines) and lines[i]:
+            route.append(lines[i])
+            i += 1
+        # check
+        if len(route) == 0 or not route[0].startswith('#'):
+            raise Exception('gaussian route section is not found.')
+        routeStr = ' '.join(route)
+        i += 1
+
+        # title section
+        title = []
+        while i < len(lines) and lines[i]:
+            title.append(lines[i])
+            i += 1
+        i += 1
+
+        # charge and multiplicity
+        chargeMultiplicity = lines[i].split()
+        charge = int(chargeMultiplicity[0])
+        multiplicity = int(chargeMultiplicity[1])
+        i += 1
+
+        # molecule specification
+        atomList = []
+        xyzList = []
+        while i < len(lines) and lines[i]:
+            _row = lines[i].replace(',', ' ').split()
+            # check
+            if len(_row) < 4:
+                raise Exception(
+                    'z-matrix input is not supported, use cartesian coordinates.')
+            # symbol such as C, C-CA, C(Fragment=1)
+            _name = re.split(r'[-(]', _row[0])[0]
+            atomList.append(_name)
+            xyzList.append([float(v) for v in _row[-3:]])
+            i += 1
+        i += 1
+
+        # connectivity
+        bondMatrix = []
+        if re.search(r'geom\s*=\s*\(?[^ ]*connectivity', routeStr, re.I):
+            while i < len(lines) and lines[i]:
+                _row = lines[i].split()
+                _id1 = int(_row[0])
+                for j in range(1, len(_row), 2):
+                    # bond order such as 1.0, 1.5 (aromatic), 2.0
+                    _order = float(_row[j+1])
+                    _bondType = 4 if _order == 1.5 else int(round(_order))
+                    bondMatrix.append([_id1, int(_row[j]), _bondType])
+                i += 1
+        else:
+            bondMatrix = Structure.perceive_bonds(atomList, xyzList)
+
+        # compound properties
+        compoundProperties = {
+            'link0': link0,
+            'route': routeStr,
+            'title': ' '.join(title),
+            'charge': charge,
+            'multiplicity': multiplicity
+        }
+
+        # res
+        return self.build_compound_info(atomList, xyzList, bondMatrix,
+                                        mat_name=' '.join(title),
+                                        compound_properties=compoundProperties)
+
+    def gaussian_log_parser(self, orientation='standard'):
+        '''
+        Stream a gaussian output (log/out) file, one step at a time
+
+        Parameters
+        ----------
+        orientation : str
+            geometry block, `standard` or `input` orientation (default standard)
+
+        Yields
+        ------
+        step : dict
+            step: step number (starts from 1)
+            atom_elements: atom symbols
+            xyz_list: coordinates
+            energy: scf energy [hartree]
+            converged: optimization completed
+            final: last geometry in the file
+
+        Notes
+        -----
+        - the file is read line by line in a single pass
+        - a step is yielded once its scf energy and the next geometry block are read
+        - if the selected orientation is not printed (nosymm), the other one is used
+        - the geometry printed again after `Optimization completed` is not a new step
+        '''
+        # check
+        if orientation not in ('standard', 'input'):
+            raise Exception('orientation must be `standard` or `input`.')
+
+        # geometry headers
+        headers = {
+            'Standard orientation:': 'standard',
+            'Input orientation:': 'input'
+        }
+
+        # element symbols
+        elementSource = Element().elementsource
+        elementSymbols = dict(
+            zip(elementSource['AtomicNumber'], elementSource['Symbol']))
+
+        # state
+        pending = None
+        current = None
+        stepNo = 0
+        converged = False
+        geometryFound = {'standard': False, 'input': False}
+
+        with open(self.filepath, 'r') as f:
+            for line in f:
+                # geometry block
+                _header = headers.get(line.strip())
+                if _header is not None:
+                    geometryFound[_header] = True
+                    # selected orientation (or the only one printed)
+                    if _header != orientation and geometryFound[orientation]:
+                        continue
+
+                    # skip table header (4 lines)
+                    for _ in range(4):
+                        next(f)
+                    # atoms
+                    atomicNumbers = []
+                    xyzList = []
+                    for row in f:
+                        if row.strip().startswith('---'):
+                            break
+                        _row = row.split()
+                        atomicNumbers.append(int(_row[1]))
+                        xyzList.append(
+                            [float(_row[3]), float(_row[4]), float(_row[5])])
+
+                    # same step (no energy yet)
+                    if current is not None and current['energy'] is None:
+                        current['xyz_list'] = np.array(xyzList)
+                        continue
+
+                    # previous step is complete
+                    if pending is not None:
+                        yield pending
+                    pending = current
+
+                    # new step
+                    stepNo += 1
+                    current = {
+                        'step': stepNo,
+                        'atom_elements': [elementSymbols[i] for i in atomicNumbers],
+                        'xyz_list': np.array(xyzList),
+                        'energy': None,
+                        'converged': converged,
+                        'final': False
+                    }
+                elif 'SCF Done:' in line:
+                    # energy
+                    if current is not None:
+                        current['energy'] = float(
+                            line.split('=')[1].split()[0])
+                elif 'Optimization completed' in line:
+                    converged = True
+                    if current is not None:
+                        current['converged'] = True
+
+        # check
+        if current is None:
+            return
+
+        # geometry printed again after the last scf
+        if current['energy'] is None and pending is not None and \
+                np.allclose(current['xyz_list'], pending['xyz_list'], atol=1e-4):
+            pending['final'] = True
+            yield pending
+            return
+
+        # last steps
+        if pending is not None:
+            yield pending
+        current['final'] = True
+        yield current
+
     def json_parser(self, jsonSource, id_sort=True):
         '''
         parse json file
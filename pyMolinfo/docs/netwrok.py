@@ -2,13 +2,26 @@
 # -------
 
 # import packages/modules
+import hashlib
+from functools import partial
+import numpy as np
 import pandas as pd
 import networkx as nx
 from networkx.algorithms import isomorphism
 from typing import Optional
 # local
 from .chemgraphs import ChemGraphs
+from .compute import Compute
 from .customchemgraph import CustomChemGraph
+from .invariant import GraphInvariant
+from .compactgraph import CompactGraph
+from .fingerprint import Fingerprint
+from .canonical import CanonicalGraph
+from .graphmatcher import ChemGraphMatcher
+from .patternlibrary import PatternLibrary
+from .matchcache import MatchCache
+from .matchbudget import MatchBudget, MatchTimeout
+from .parallelmatch import ParallelMatcher
 
 
 class Network(ChemGraphs):
@@ -19,6 +32,37 @@ class Network(ChemGraphs):
     _custom_functional_group_list = {}
     # graph
     _compound_graph = None
+    # matcher calls (invariant prefilter)
+    _matcher_stats = {}
+    # compiled functional group patterns
+    _pattern_library = None
+    # element index of the compound graph (symbol -> node ids)
+    _element_index = {}
+    # atom environment (degree, hydrogens, ring, hybridization)
+    _atom_environment = None
+    _atom_environment_keys = ('degree', 'heavy_degree',
+                              'h_count', 'in_ring', 'hybridization',
+                              'ring_count', 'ring_size', 'aromatic')
+    # compound graphs (implicit_h -> (graph, element index)), built once
+    _graph_cache = {}
+    # compact compound graphs (implicit_h -> csr arrays), built once
+    _compact_cache = {}
+    # fingerprints (settings -> packed bits)
+    _fingerprint_cache = {}
+    # canonical hash of the structure
+    _canonical_hash = None
+    # functional group results of the compound
+    _match_results = {}
+    # structure state (structure hash, coordinates hash)
+    _structure_state = None
+    # functional groups stopped by the match budget (name -> status)
+    _match_status = {}
+    # built-in functional groups compiled for hydrogen-suppressed graphs
+    _implicit_pattern_library = None
+    # built-in functional groups (name -> pattern graphs), shared by compounds
+    _builtin_function_groups = None
+    # compiled built-in functional groups (explicit/implicit), shared by compounds
+    _builtin_libraries = {}
 
     def __init__(self, atomElements, atomBonds, xyzList, xyzCenterList, atomBonds1d):
         self.atomElements = atomElements
@@ -30,63 +74,96 @@ class Network(ChemGraphs):
         # 1d vector of atom bonds
         self.atomBonds1d = atomBonds1d
 
+        # caches (graphs and results)
+        self._graph_cache = {}
+        self._compact_cache = {}
+        self._fingerprint_cache = {}
+        self._match_results = {}
+        self._structure_state = None
+
         # TODO: super
         ChemGraphs.__init__(self)
 
-        # functional group list
-        self.function_group_list = {
-            'hydroxyl': [self.graph_hydroxyl()],
-            'carbonyl': [self.graph_carbonyl()],
-            'carboxyl': [self.graph_carboxyl()],
-            'N-H': [self.graph_N_H()],
-            'C-N': [self.graph_C_N_single_bond()],
-            'N-O': [self.graph_N_O_single_bond()],
-            'C-O': [self.graph_C_O_single_bond()],
-            'C#N': [self.graph_C_N_triple_bond()],
-            'methyl-group': [self.graph_methyl()],
-            'methylene-group': [self.graph_methylene()],
-            'methine-group': [self.graph_methine()],
-            'ether': [self.graph_ether()],
-            'pst-alcohols': [self.graph_primary_alcohol(), self.graph_secondary_alcohol(),
-                             self.graph_tertiary_alcohol(), self.graph_secondary_alcohol_double_bond(),
-                             self.graph_primary_alcohol_double_bond()],
-            'primary-alcohol': [self.graph_primary_alcohol(), self.graph_primary_alcohol_double_bond()],
-            'secondary-alcohol': [self.graph_secondary_alcohol(), self.graph_secondary_alcohol_double_bond()],
-            'tertiary-alcohol': [self.graph_tertiary_alcohol()],
-            'alkane': [self.graph_alkane()],
-            'alkane CH bond (sp3)': [self.graph_alkane_CH_bond()],
-            'alkene': [self.graph_alkene()],
-            'alkene CH bond (sp2)': [self.graph_alkene_CH_bond()],
-            'aromatic CH bond (sp2)': [self.graph_aromatic_CH_bond()],
-            'aldehyde CH bond (sp2)': [self.graph_aldehyde_CH_bond()],
-            'alkyne': [self.graph_alkyne()],
-            'alkyne CH bond (sp)': [self.graph_alkyne_CH_bond()],
-            'arene': [self.graph_arene()],
-            'aldehyde': [self.graph_aldehyde()],
-            'ketone': [self.graph_ketone()],
-            'carboxylic-acid': [self.graph_carboxylic_acid()],
-            'ester': [self.graph_ester()],
-            'pst-amide': [self.graph_primary_amide(), self.graph_secondary_amide(), self.graph_tertiary_amide()],
-            'primary-amide': [self.graph_primary_amide()],
-            'secondary-amide': [self.graph_secondary_amide()],
-            'tertiary-amide': [self.graph_tertiary_amide()],
-            'pst-amine': [self.graph_primary_amine(), self.graph_secondary_amine(), self.graph_tertiary_amine()],
-            'primary-amine': [self.graph_primary_amine()],
-            'secondary-amine': [self.graph_secondary_amine()],
-            'tertiary-amine': [self.graph_tertiary_amine()],
-            'nitrile': [self.graph_nitrile()],
-            'thiol': [self.graph_thiol()],
-            'alkyl-halids': [self.graph_alkyl_halide('F'), self.graph_alkyl_halide('Cl'), self.graph_alkyl_halide('Br'),
-                             self.graph_alkyl_halide('I'),
-                             self.graph_primary_alkyl_halide(
-                                 'F'), self.graph_primary_alkyl_halide('Cl'),
-                             self.graph_primary_alkyl_halide('Br'), self.graph_primary_alkyl_halide('I')],
-            'epoxide': [self.graph_epoxide()]
+        # functional group list (built-in patterns, shared by compounds)
+        self.function_group_list = dict(Network.builtin_function_groups())
+
+        # functional groups found by ring perception (no subgraph search)
+        self.function_group_lookup = {
+            'arene': self.lookup_arene,
+            'aromatic CH bond (sp2)': self.lookup_aromatic_CH_bond
         }
 
         # update functional groups
         self.functional_groups = [i for i in self.function_group_list.keys()]
 
+    @staticmethod
+    def builtin_function_groups():
+        '''
+        Built-in functional groups (name -> annotated pattern graphs), built once
+
+        Notes
+        -----
+        - the pattern graphs are shared by all compounds (read-only)
+        '''
+        if Network._builtin_function_groups is None:
+            graphs = ChemGraphs()
+            groups = {
+                'hydroxyl': [graphs.graph_hydroxyl()],
+                'carbonyl': [graphs.graph_carbonyl()],
+                'carboxyl': [graphs.graph_carboxyl()],
+                'N-H': [graphs.graph_N_H()],
+                'C-N': [graphs.graph_C_N_single_bond()],
+                'N-O': [graphs.graph_N_O_single_bond()],
+                'C-O': [graphs.graph_C_O_single_bond()],
+                'C#N': [graphs.graph_C_N_triple_bond()],
+                'methyl-group': [graphs.graph_methyl()],
+                'methylene-group': [graphs.graph_methylene()],
+                'methine-group': [graphs.graph_methine()],
+                'ether': [graphs.graph_ether()],
+                'pst-alcohols': [graphs.graph_primary_alcohol(), graphs.graph_secondary_alcohol(),
+                                 graphs.graph_tertiary_alcohol(), graphs.graph_secondary_alcohol_double_bond(),
+                                 graphs.graph_primary_alcohol_double_bond()],
+                'primary-alcohol': [graphs.graph_primary_alcohol(), graphs.graph_primary_alcohol_double_bond()],
+                'secondary-alcohol': [graphs.graph_secondary_alcohol(), graphs.graph_secondary_alcohol_double_bond()],
+                'tertiary-alcohol': [graphs.graph_tertiary_alcohol()],
+                'alkane': [graphs.graph_alkane()],
+                'alkane CH bond (sp3)': [graphs.graph_alkane_CH_bond()],
+                'alkene': [graphs.graph_alkene()],
+                'alkene CH bond (sp2)': [graphs.graph_alkene_CH_bond()],
+                'aromatic CH bond (sp2)': [graphs.graph_aromatic_CH_bond()],
+                'aldehyde CH bond (sp2)': [graphs.graph_aldehyde_CH_bond()],
+                'alkyne': [graphs.graph_alkyne()],
+                'alkyne CH bond (sp)': [graphs.graph_alkyne_CH_bond()],
+                'arene': [graphs.graph_arene()],
+                'aldehyde': [graphs.graph_aldehyde()],
+                'ketone': [graphs.graph_ketone()],
+                'carboxylic-acid': [graphs.graph_carboxylic_acid()],
+                'ester': [graphs.graph_ester()],
+                'pst-amide': [graphs.graph_primary_amide(), graphs.graph_secondary_amide(), graphs.graph_tertiary_amide()],
+                'primary-amide': [graphs.graph_primary_amide()],
+                'secondary-amide': [graphs.graph_secondary_amide()],
+                'tertiary-amide': [graphs.graph_tertiary_amide()],
+                'pst-amine': [graphs.graph_primary_amine(), graphs.graph_secondary_amine(), graphs.graph_tertiary_amine()],
+                'primary-amine': [graphs.graph_primary_amine()],
+                'secondary-amine': [graphs.graph_secondary_amine()],
+                'tertiary-amine': [graphs.graph_tertiary_amine()],
+                'nitrile': [graphs.graph_nitrile()],
+                'thiol': [graphs.graph_thiol()],
+                'alkyl-halids': [graphs.graph_alkyl_halide('F'), graphs.graph_alkyl_halide('Cl'), graphs.graph_alkyl_halide('Br'),
+                                 graphs.graph_alkyl_halide('I'),
+                                 graphs.graph_primary_alkyl_halide(
+                                     'F'), graphs.graph_primary_alkyl_halide('Cl'),
+                                 graphs.graph_primary_alkyl_halide('Br'), graphs.graph_primary_alkyl_halide('I')],
+                'epoxide': [graphs.graph_epoxide()]
+            }
+
+            # atom environment constraints of patterns (node match pruning)
+            for _graphs in groups.values():
+                for _fn in _graphs:
+                    graphs.annotate_pattern(_fn)
+            Network._builtin_function_groups = groups
+        return Network._builtin_function_groups
+
     # property
     @property
     def functional_groups(self):
@@ -115,8 +192,56 @@ class Network(ChemGraphs):
     def custom_functional_group_list(self, value):
         self._custom_functional_group_list = value
 
+    @property
+    def matcher_stats(self):
+        return self._matcher_stats
+
+    @property
+    def element_index(self):
+        return self._element_index
+
+    @property
+    def atom_environment(self):
+        '''
+        Atom environment (computed once from the bond block)
+
+        Returns
+        -------
+        res : dict
+            degree, heavy_degree, h_count, in_ring and hybridization of each atom,
+            bond arrays (bond_i, bond_j, bond_type) and ring_bond of each bond
+        '''
+        if self._atom_environment is None:
+            # bond arrays
+            bondI, bondJ, bondOrder = Compute.bond_arrays(self.atomBonds)
+            self._atom_environment = Compute.atom_environment(
+                self.atomElements, bondI, bondJ, bondOrder)
+            self._atom_environment['bond_i'] = bondI
+            self._atom_environment['bond_j'] = bondJ
+            self._atom_environment['bond_type'] = bondOrder
+        return self._atom_environment
+
+    @property
+    def rings(self):
+        '''
+        Smallest set of smallest rings (atom ids such as (1, 2, 3, 4, 5, 6))
+        '''
+        return [tuple(int(i) + 1 for i in ring) for ring in self.atom_environment['rings']]
+
+    @property
+    def aromatic_rings(self):
+        '''
+        Aromatic rings of the smallest set of smallest rings (atom ids)
+        '''
+        return [tuple(int(i) + 1 for i in ring) for ring in self.atom_environment['aromatic_rings']]
+
     @property
     def compound_graph(self):
+        '''
+        Compound graph (networkx), built on first access
+        '''
+        if self._compound_graph is None:
+            self.create_graph()
         return self._compound_graph
 
     @compound_graph.setter
@@ -124,7 +249,9 @@ class Network(ChemGraphs):
         self._compound_graph = value
 
     def check_functional_groups(self, functional_groups=[],
-                                count_functional_group=False):
+                                count_functional_group=False, implicit_h=False,
+                                budget: Optional[MatchBudget] = None,
+                                workers: Optional[int] = None):
         '''
         Check functional groups in a compound
 
@@ -132,29 +259,228 @@ class Network(ChemGraphs):
         ----------
         functional_groups : list
             list of functional groups
+        count_functional_group : bool
+            count the occurrences (default False)
+        implicit_h : bool
+            match on the hydrogen-suppressed graph (default False), results are
+            the same as the explicit graph
+        budget : MatchBudget
+            time/state limits and cancellation token (default None: no limit),
+            each result gets a status ('ok', 'timed_out' or 'cancelled')
+        workers : int
+            number of worker processes of built-in functional groups (default
+            None: a single traversal in this process), the graph is shared once
+            and anchor atoms are split across the workers
 
         Returns
         -------
         res : dict
             a list of all count
+
+        Notes
+        -----
+        - results of stopped functional groups are lower bounds (False/partial count)
+        - a budget is checked in this process only, budgeted calls do not use workers
         '''
+        # budget (limits are checked in the matching loop)
+        if budget is not None:
+            with budget:
+                res = self.check_functional_groups(
+                    functional_groups, count_functional_group, implicit_h)
+            # status
+            for x in res:
+                x['status'] = self._match_status.get(
+                    x['function_group'], 'ok')
+            return res
+
         # check functional group
         if len(functional_groups) == 0:
             functional_groups = list(self.function_group_list.keys())
 
-        # create graph
-        G = self.create_graph()
+        # matching graph (no coordinates)
+        G = self.__matching_graph(implicit_h=implicit_h)
+        self._element_index = self._graph_cache[implicit_h][1]
+
+        # built-in functional groups (single traversal)
+        if all(isinstance(item, str) for item in functional_groups):
+            return self.match_functional_groups(G, functional_groups,
+                                                count_functional_group=count_functional_group,
+                                                workers=workers)
 
         # check
         if count_functional_group:
-            res = self.count_functional_group(G, functional_groups)
+            res = self.count_functional_group(
+                G, functional_groups, workers=workers)
         else:
             # check functional groups
-            res = self.check_functional_group(G, functional_groups)
+            res = self.check_functional_group(
+                G, functional_groups, workers=workers)
         # res
         return res
 
-    def check_functional_group(self, G, function_groups):
+    @property
+    def pattern_library(self):
+        '''
+        Built-in functional groups compiled for a single traversal (built once,
+        shared by compounds)
+        '''
+        if self._pattern_library is None:
+            # compile once
+            if Network._builtin_libraries.get('explicit') is None:
+                Network._builtin_libraries['explicit'] = PatternLibrary({
+                    name: graphs for name, graphs in self.function_group_list.items()
+                    if name not in self.function_group_lookup})
+            self._pattern_library = Network._builtin_libraries['explicit']
+        return self._pattern_library
+
+    @pattern_library.setter
+    def pattern_library(self, value):
+        # compiled built-in functional groups shared by compounds
+        self._pattern_library = value
+
+    @property
+    def implicit_pattern_library(self):
+        '''
+        Built-in functional groups compiled for hydrogen-suppressed graphs (built
+        once, shared by compounds)
+
+        Returns
+        -------
+        library : PatternLibrary
+            translated functional groups
+        explicit_groups : list
+            functional groups which cannot be translated (explicit graph)
+        '''
+        if self._implicit_pattern_library is None:
+            # compile once
+            if Network._builtin_libraries.get('implicit') is None:
+                translated = {}
+                explicitGroups = []
+                for name, graphs in self.function_group_list.items():
+                    # check
+                    if name in self.function_group_lookup:
+                        continue
+                    _variants = [self.hydrogen_suppressed_patterns(
+                        _fn) for _fn in graphs]
+                    # check
+                    if any(v is None for v in _variants):
+                        explicitGroups.append(name)
+                    else:
+                        translated[name] = [v for _v in _variants for v in _v]
+                Network._builtin_libraries['implicit'] = (
+                    PatternLibrary(translated), explicitGroups)
+            self._implicit_pattern_library = Network._builtin_libraries['implicit']
+        return self._implicit_pattern_library
+
+    @implicit_pattern_library.setter
+    def implicit_pattern_library(self, value):
+        self._implicit_pattern_library = value
+
+    def match_functional_groups(self, G, function_groups, count_functional_group=False,
+                                workers=None):
+        '''
+        Check/count built-in functional groups in a single traversal of the graph
+
+        Parameters
+        ----------
+        G : graph
+            graph
+        function_groups : list[str]
+            functional group name like hydroxyl
+        count_functional_group : bool
+            count the occurrences (default False)
+        workers : int
+            number of worker processes (default None: this process)
+
+        Returns
+        -------
+        res : dict
+            a list of all check/count (the same as check/count functional group)
+        '''
+        # reset matcher stats
+        self.__reset_matcher_stats()
+
+        # built-in groups
+        names = [
+            item for item in function_groups if item in self.function_group_list]
+
+        # cached results (compound graphs only)
+        res_cached = {}
+        useCache = self.__is_compound_graph(G)
+        if useCache:
+            for item in dict.fromkeys(names):
+                _res = self.__cached_result(
+                    ('builtin', item, count_functional_group))
+                # a count also answers a check
+                if _res is None and not count_functional_group:
+                    _res = self._match_results.get(('builtin', item, True))
+                    if _res is not None:
+                        _res = int(_res > 0)
+                        self._matcher_stats['cached'] += 1
+                if _res is not None:
+                    res_cached[item] = _res
+        _missing = [item for item in names if item not in res_cached]
+
+        # ring lookups
+        lookupNames = [
+            item for item in _missing if item in self.function_group_lookup]
+        patternNames = [
+            item for item in _missing if item not in self.function_group_lookup]
+
+        # single traversal
+        if G.graph.get('implicit_h', False):
+            # hydrogen-suppressed graph
+            library, explicitGroups = self.implicit_pattern_library
+            res_library = self.__library_match(
+                library, G, [item for item in patternNames if item not in explicitGroups],
+                count_functional_group, workers)
+            # explicit graph
+            _names = [item for item in patternNames if item in explicitGroups]
+            if _names:
+                res_library.update(self.__library_match(
+                    self.pattern_library, self.explicit_graph, _names,
+                    count_functional_group, workers))
+        else:
+            res_library = self.__library_match(
+                self.pattern_library, G, patternNames, count_functional_group, workers)
+
+        # ring lookups
+        for item in lookupNames:
+            res_library[item] = self.function_group_lookup[item](G) if count_functional_group else int(
+                self.function_group_lookup[item](G) > 0)
+
+        # save results (stopped groups are not saved)
+        if useCache:
+            for item, _res in res_library.items():
+                if item in self._match_status:
+                    continue
+                self.__save_result(
+                    ('builtin', item, count_functional_group), _res)
+        res_library.update(res_cached)
+
+        # res
+        res_match = []
+        for item in names:
+            # check
+            if count_functional_group:
+                res_match.append({
+                    'function_group': item,
+                    'result': res_library[item] > 0,
+                    'count': res_library[item]
+                })
+            else:
+                res_match.append({
+                    'function_group': item,
+                    'result': res_library[item] > 0
+                })
+
+        # update list
+        self.functional_groups = [x['function_group'] for x in res_match]
+
+        # res
+        return res_match
+
+    def check_functional_group(self, G, function_groups, workers=None):
         '''
         Check a functional group exists in a compound
 
@@ -164,6 +490,8 @@ class Network(ChemGraphs):
             graph
         function_groups : list[str]
             functional group name like hydroxyl
+        workers : int
+            number of worker processes of built-in functional groups (default None)
 
         Returns
         -------
@@ -174,14 +502,8 @@ class Network(ChemGraphs):
             '''
             Define a custom node_match function to ensure element matching
             '''
-            # Define dummy node pattern
-            dummy_node_pattern = "XX"
-
-            # Ignore dummy nodes
-            if n1['symbol'].startswith(dummy_node_pattern) or n2['symbol'].startswith(dummy_node_pattern):
-                return True
-
-            return n1['symbol'] == n2['symbol']
+            # element and atom environment
+            return self.node_match(n1, n2)
 
         def edge_match(e1, e2):
             '''
@@ -192,47 +514,18 @@ class Network(ChemGraphs):
         # res
         res_match = []
 
+        # built-in functional groups (single traversal, patterns shared by aliases)
+        res_builtin = {x['function_group']: x for x in self.match_functional_groups(
+            G, [item for item in function_groups if isinstance(item, str)],
+            count_functional_group=False, workers=workers)}
+
         # NOTE: for each functional group
         for item in function_groups:
             # * Check instance
             if isinstance(item, str):
                 # ! check functional exists in the list
-                if item in self.function_group_list:
-                    # get a list of graphs
-                    # REVIEW
-                    function_group_graphs = self.function_group_list[item]
-
-                    # flag to track if functional group is found
-                    fg_found_any = False
-
-                    # graph function list
-                    for _fn in function_group_graphs:
-                        # Create a GraphMatcher object for a functional group
-                        fg_matcher = isomorphism.GraphMatcher(
-                            G, _fn, node_match=node_match,
-                            edge_match=edge_match)
-
-                        # Check if a functional group is in the main graph
-                        fg_found = fg_matcher.subgraph_is_isomorphic()
-
-                        if fg_found:
-                            # print(f"{item} found in the molecule!")
-                            fg_found_any = True
-                            # res
-                            res_match.append({
-                                'function_group': item,
-                                'result': fg_found
-                            })
-                            # break
-                            break
-                    # check
-                    if not fg_found_any:
-                        # print(f"{item} not found in the molecule.")
-                        # res
-                        res_match.append({
-                            'function_group': item,
-                            'result': False
-                        })
+                if item in res_builtin:
+                    res_match.append(dict(res_builtin[item]))
             elif isinstance(item, CustomChemGraph):
                 # get a list of graphs
                 for custom_functional_group in item.custom_functional_groups:
@@ -244,80 +537,84 @@ class Network(ChemGraphs):
                         value = custom_functional_group[key]
                         # print(type(value))
 
-                        # ANCHOR: check value type
-                        if isinstance(value, nx.Graph):
-
-                            # update custom functional group
-                            self.update_custom_functional_group(key, value)
-
-                            # Create a GraphMatcher object for a functional group
-                            fg_matcher = isomorphism.GraphMatcher(
-                                G, value, node_match=node_match, edge_match=edge_match)
-
-                            # Check if a functional group is in the main graph (bool)
-                            fg_found = fg_matcher.subgraph_is_isomorphic()
-                            # print(f"{key} found in the molecule!")
-
-                            # res
-                            res_match.append({
-                                'function_group': key,
-                                'result': fg_found
-                            })
-
-                        elif isinstance(value, list):
-                            # SECTION: list of graphs {already created}
-
-                            # graphs set
-                            graphs_set_ = self.__look_for_group_subgroup(value)
-
-                            # NOTE: start matching
-                            if graphs_set_['group'] is not None and graphs_set_['subgroup'] is not None:
-                                # Create a GraphMatcher object for a functional group
-                                fg_matcher = isomorphism.GraphMatcher(
-                                    G, graphs_set_['group'], node_match=node_match, edge_match=edge_match)
+                        # cached result
+                        result_key = self.__custom_result_key(
+                            G, key, value, False)
+                        if self.__append_cached(res_match, result_key, key, value):
+                            continue
+                        res_no = len(res_match)
+
+                        # call budget exhausted (not matched)
+                        if self.__budget_stopped(res_match, key, False):
+                            continue
+
+                        try:
+                            # ANCHOR: check value type
+                            if isinstance(value, nx.Graph):
+
+                                # update custom functional group
+                                self.update_custom_functional_group(key, value)
+
+                                # graph and pattern variants (hydrogen-suppressed graph)
+                                _G, _variants = self.__hydrogen_suppressed(G, [
+                                                                           value])
+                                _element_index = self.__element_index_of(_G)
+
+                                fg_found = False
+                                for _fn in _variants[0]:
+                                    # check invariants (skip impossible patterns)
+                                    if self.__pattern_feasible(_G, _fn):
+                                        # Create a GraphMatcher object for a functional group
+                                        # Check if a functional group is in the main graph (bool, anchor seeded)
+                                        fg_found = next(self.__iter_matches(
+                                            _G, _fn, node_match, edge_match, _element_index), None) is not None
+                                    # check
+                                    if fg_found:
+                                        break
+                                # print(f"{key} found in the molecule!")
 
-                                # Check if a functional group is in the main graph (bool)
-                                fg_found = fg_matcher.subgraph_is_isomorphic()
+                                # res
+                                res_match.append({
+                                    'function_group': key,
+                                    'result': fg_found
+                                })
 
-                                # SECTION: group found
-                                if fg_found:
-                                    # group sections
-                                    group_sections = list(
-                                        fg_matcher.subgraph_isomorphisms_iter())
+                            elif isinstance(value, list):
+                                # SECTION: list of graphs {already created}
 
-                                    # remove duplicated group sections
-                                    group_sections_filtered = self.remove_duplicated_subgraphs(
-                                        group_sections)
+                                # graphs set
+                                graphs_set_ = self.__look_for_group_subgroup(value)
 
-                                    if len(group_sections_filtered) == 0:
-                                        raise Exception('group not found!')
+                                # NOTE: start matching
+                                if graphs_set_['group'] is not None and graphs_set_['subgroup'] is not None:
+                                    # graph and pattern variants (hydrogen-suppressed graph)
+                                    _G, (_groups, _subgroups) = self.__hydrogen_suppressed(
+                                        G, [graphs_set_['group'], graphs_set_['subgroup']])
 
                                     # counter
                                     fg_subgroups_num = 0
-                                    # looping through group sections
-                                    for gs_filtered in group_sections_filtered:
-
-                                        # create group pattern within the main graph
-                                        group_pattern = G.subgraph(
-                                            gs_filtered.keys())
-
-                                        # Create a GraphMatcher object for a functional group
-                                        fg_matcher_subgroup = isomorphism.GraphMatcher(
-                                            group_pattern, graphs_set_['subgroup'], node_match=node_match, edge_match=edge_match)
+                                    # unique group sections (streamed, anchor seeded)
+                                    for group_pattern, weight in self.__iter_group_sections(
+                                            _G, _groups, node_match, edge_match):
 
                                         # Check if a functional group is in the main graph (bool)
-                                        fg_found_subgroup = fg_matcher_subgroup.subgraph_is_isomorphic()
+                                        fg_found_subgroup = any(
+                                            ChemGraphMatcher(
+                                                group_pattern, _subgroup, node_match=node_match, edge_match=edge_match).subgraph_is_isomorphic()
+                                            for _subgroup in _subgroups)
 
                                         # check
                                         if fg_found_subgroup:
-                                            fg_subgroups_num += 1
+                                            fg_subgroups_num += weight
+                                            # the first confirmed hit (check mode)
+                                            break
 
                                     # check
                                     if fg_subgroups_num > 0:
                                         # res
                                         res_match.append({
                                             'function_group': key,
-                                            'result': fg_found_subgroup
+                                            'result': True
                                         })
                                     else:
                                         # res
@@ -325,12 +622,14 @@ class Network(ChemGraphs):
                                             'function_group': key,
                                             'result': False
                                         })
-                                else:
-                                    # res
-                                    res_match.append({
-                                        'function_group': key,
-                                        'result': False
-                                    })
+                        except MatchTimeout as e:
+                            # stopped (a lower bound is not saved)
+                            self.__append_stopped(res_match, key, False, e.status)
+                            continue
+
+                        # save result
+                        if result_key is not None and len(res_match) > res_no:
+                            self.__save_result(result_key, dict(res_match[-1]))
 
         # REVIEW
         # get a list of functional group names
@@ -341,7 +640,7 @@ class Network(ChemGraphs):
         # res
         return res_match
 
-    def count_functional_group(self, G, function_groups):
+    def count_functional_group(self, G, function_groups, workers=None):
         '''
         Count the occurrences of functional groups within the structure of a compound.
 
@@ -351,6 +650,8 @@ class Network(ChemGraphs):
             graph
         function_groups : list[str]
             functional group name like hydroxyl
+        workers : int
+            number of worker processes of built-in functional groups (default None)
 
         Returns
         -------
@@ -361,14 +662,8 @@ class Network(ChemGraphs):
             '''
             Define a custom node_match function to ensure element matching
             '''
-            # Define dummy node pattern
-            dummy_node_pattern = "XX"
-
-            # Ignore dummy nodes
-            if n1['symbol'].startswith(dummy_node_pattern) or n2['symbol'].startswith(dummy_node_pattern):
-                return True
-
-            return n1['symbol'] == n2['symbol']
+            # element and atom environment
+            return self.node_match(n1, n2)
 
         def edge_match(e1, e2):
             '''
@@ -379,59 +674,18 @@ class Network(ChemGraphs):
         # res
         res_match = []
 
+        # built-in functional groups (single traversal, patterns shared by aliases)
+        res_builtin = {x['function_group']: x for x in self.match_functional_groups(
+            G, [item for item in function_groups if isinstance(item, str)],
+            count_functional_group=True, workers=workers)}
+
         # for each functional group
         for item in function_groups:
             # * Check instance
             if isinstance(item, str):
                 # ! check functional exists in the list
-                if item in self.function_group_list:
-                    # get a list of graphs
-                    # REVIEW
-                    function_group_graphs = self.function_group_list[item]
-
-                    # flag to track if functional group is found
-                    fg_found_any = False
-                    # count of functional group
-                    fg_count = 0
-                    seen_subgraphs = set()
-
-                    # graph function list
-                    for _fn in function_group_graphs:
-                        # Create a GraphMatcher object for a functional group
-                        fg_matcher = isomorphism.GraphMatcher(
-                            G, _fn, node_match=node_match, edge_match=edge_match)
-
-                        # Check if a functional group is in the main graph
-                        # fg_found = fg_matcher.subgraph_is_isomorphic()
-
-                        # ! Check if a functional group is in the main graph
-                        for subgraph in fg_matcher.subgraph_isomorphisms_iter():
-                            # Convert the subgraph to a canonical form
-                            canonical_subgraph = tuple(
-                                sorted(subgraph.keys()))
-
-                            # Check if the subgraph has been seen before
-                            if canonical_subgraph not in seen_subgraphs:
-                                seen_subgraphs.add(canonical_subgraph)
-                                fg_found_any = True
-                                fg_count += 1
-
-                    # check
-                    if fg_found_any:
-                        # print(f"{item} found in the molecule!")
-                        res_match.append({
-                            'function_group': item,
-                            'result': True,
-                            'count': fg_count
-                        })
-                    else:
-                        # print(f"{item} not found in the molecule.")
-                        res_match.append({
-                            'function_group': item,
-                            'result': False,
-                            'count': 0
-                        })
-
+                if item in res_builtin:
+                    res_match.append(dict(res_builtin[item]))
             elif isinstance(item, CustomChemGraph):  # ! custom functional groups
                 # get a list of graphs
                 for custom_functional_group in item.custom_functional_groups:
@@ -449,101 +703,97 @@ class Network(ChemGraphs):
                         # get value (graph)
                         value = custom_functional_group[key]
 
-                        # ANCHOR: check value type
-                        # SECTION: single graph
-                        if isinstance(value, nx.Graph):
-
-                            # update custom functional group
-                            self.update_custom_functional_group(key, value)
-
-                            # Create a GraphMatcher object for a functional group
-                            fg_matcher = isomorphism.GraphMatcher(
-                                G, value, node_match=node_match, edge_match=edge_match)
-
-                            # Check if a functional group is in the main graph
-                            # fg_found = fg_matcher.subgraph_is_isomorphic()
-                            # print(f"{key} found in the molecule!")
-
-                            # ! Check if a functional group is in the main graph
-                            for subgraph in fg_matcher.subgraph_isomorphisms_iter():
-                                # Convert the subgraph to a canonical form
-                                canonical_subgraph = tuple(
-                                    sorted(subgraph.keys()))
-
-                                # Check if the subgraph has been seen before
-                                if canonical_subgraph not in seen_subgraphs:
-                                    seen_subgraphs.add(canonical_subgraph)
-                                    fg_found_any = True
-                                    fg_count += 1
-
-                            # check
-                            if fg_found_any:
-                                # print(f"{item} found in the molecule!")
-                                res_match.append({
-                                    'function_group': key,
-                                    'result': True,
-                                    'count': fg_count
-                                })
-                            else:
-                                # print(f"{item} not found in the molecule.")
-                                res_match.append({
-                                    'function_group': key,
-                                    'result': False,
-                                    'count': 0
-                                })
-                        # SECTION: list of graphs {already created}
-                        elif isinstance(value, list):
-                            # graphs set
-                            graphs_set_ = self.__look_for_group_subgroup(value)
-
-                            # NOTE: start matching
-                            if graphs_set_['group'] is not None and graphs_set_['subgroup'] is not None:
-                                # Create a GraphMatcher object for a functional group
-                                fg_matcher = isomorphism.GraphMatcher(
-                                    G, graphs_set_['group'], node_match=node_match, edge_match=edge_match)
-
-                                # Check if a functional group is in the main graph (bool)
-                                fg_found = fg_matcher.subgraph_is_isomorphic()
-
-                                # SECTION: group found
-                                if fg_found:
-                                    # group sections
-                                    group_sections = list(
-                                        fg_matcher.subgraph_isomorphisms_iter())
-
-                                    # remove duplicated group sections
-                                    group_sections_filtered = self.remove_duplicated_subgraphs(
-                                        group_sections)
+                        # cached result
+                        result_key = self.__custom_result_key(
+                            G, key, value, True)
+                        if self.__append_cached(res_match, result_key, key, value):
+                            continue
+                        res_no = len(res_match)
+
+                        # call budget exhausted (not matched)
+                        if self.__budget_stopped(res_match, key, True):
+                            continue
+
+                        try:
+                            # ANCHOR: check value type
+                            # SECTION: single graph
+                            if isinstance(value, nx.Graph):
+
+                                # update custom functional group
+                                self.update_custom_functional_group(key, value)
+
+                                # graph and pattern variants (hydrogen-suppressed graph)
+                                _G, _variants = self.__hydrogen_suppressed(G, [
+                                                                           value])
+                                _element_index = self.__element_index_of(_G)
+
+                                for _fn in _variants[0]:
+                                    # check invariants (skip impossible patterns)
+                                    if not self.__pattern_feasible(_G, _fn):
+                                        continue
+
+                                    # Create a GraphMatcher object for a functional group
+                                    # ! Check if a functional group is in the main graph (anchor seeded)
+                                    for subgraph in self.__iter_matches(
+                                            _G, _fn, node_match, edge_match, _element_index):
+                                        # Convert the subgraph to a canonical form (and its explicit occurrences)
+                                        canonical_subgraph, weight = PatternLibrary.mapping_key(
+                                            _G, subgraph, _fn)
+
+                                        # Check if the subgraph has been seen before
+                                        if canonical_subgraph not in seen_subgraphs:
+                                            seen_subgraphs.add(canonical_subgraph)
+                                            fg_found_any = True
+                                            fg_count += weight
+
+                                # check
+                                if fg_found_any:
+                                    # print(f"{item} found in the molecule!")
+                                    res_match.append({
+                                        'function_group': key,
+                                        'result': True,
+                                        'count': fg_count
+                                    })
+                                else:
+                                    # print(f"{item} not found in the molecule.")
+                                    res_match.append({
+                                        'function_group': key,
+                                        'result': False,
+                                        'count': 0
+                                    })
+                            # SECTION: list of graphs {already created}
+                            elif isinstance(value, list):
+                                # graphs set
+                                graphs_set_ = self.__look_for_group_subgroup(value)
 
-                                    if len(group_sections_filtered) == 0:
-                                        raise Exception('group not found!')
+                                # NOTE: start matching
+                                if graphs_set_['group'] is not None and graphs_set_['subgroup'] is not None:
+                                    # graph and pattern variants (hydrogen-suppressed graph)
+                                    _G, (_groups, _subgroups) = self.__hydrogen_suppressed(
+                                        G, [graphs_set_['group'], graphs_set_['subgroup']])
 
                                     # counter
                                     fg_subgroups_num = 0
-                                    # looping through group sections
-                                    for gs_filtered in group_sections_filtered:
-
-                                        # create group pattern within the main graph
-                                        group_pattern = G.subgraph(
-                                            gs_filtered.keys())
-
-                                        # Create a GraphMatcher object for a functional group
-                                        fg_matcher_subgroup = isomorphism.GraphMatcher(
-                                            group_pattern, graphs_set_['subgroup'], node_match=node_match, edge_match=edge_match)
+                                    # unique group sections (streamed, anchor seeded)
+                                    for group_pattern, weight in self.__iter_group_sections(
+                                            _G, _groups, node_match, edge_match):
 
                                         # Check if a functional group is in the main graph (bool)
-                                        fg_found_subgroup = fg_matcher_subgroup.subgraph_is_isomorphic()
+                                        fg_found_subgroup = any(
+                                            ChemGraphMatcher(
+                                                group_pattern, _subgroup, node_match=node_match, edge_match=edge_match).subgraph_is_isomorphic()
+                                            for _subgroup in _subgroups)
 
                                         # check
                                         if fg_found_subgroup:
-                                            fg_subgroups_num += 1
+                                            fg_subgroups_num += weight
 
                                     # check
                                     if fg_subgroups_num > 0:
                                         # res
                                         res_match.append({
                                             'function_group': key,
-                                            'result': fg_found_subgroup,
+                                            'result': True,
                                             'count': fg_subgroups_num
                                         })
                                     else:
@@ -552,15 +802,15 @@ class Network(ChemGraphs):
                                             'function_group': key,
                                             'result': False,
                                             'count': 0
-
                                         })
-                                else:
-                                    # res
-                                    res_match.append({
-                                        'function_group': key,
-                                        'result': False,
-                                        'count': 0
-                                    })
+                        except MatchTimeout as e:
+                            # stopped (a lower bound is not saved)
+                            self.__append_stopped(res_match, key, True, e.status)
+                            continue
+
+                        # save result
+                        if result_key is not None and len(res_match) > res_no:
+                            self.__save_result(result_key, dict(res_match[-1]))
 
         # get a list of functional group names
         function_group_names = [x['function_group'] for x in res_match]
@@ -570,90 +820,613 @@ class Network(ChemGraphs):
         # res
         return res_match
 
-    def create_graph(self, graph_name: Optional[str] = None):
+    def create_graph(self, graph_name: Optional[str] = None, implicit_h: bool = False):
         '''
-        Check functional groups in a compound
+        Create the compound graph
 
         Parameters
         ----------
-        functional_groups : list
-            list of functional groups
+        graph_name : str
+            graph name
+        implicit_h : bool
+            hydrogen-suppressed graph (default False), hydrogens are kept as the
+            h_count of their neighbour
 
         Returns
         -------
-        res : dict
-            a list of all count
+        G : nx.Graph
+            compound graph, G.graph['implicit_h'] shows the mode
+
+        Notes
+        -----
+        - hydrogens bonded to more than one atom (or to a hydrogen) cannot be
+          suppressed, an explicit graph is created then
         '''
-        # atom no
-        atomNo = len(self.xyzList)
-        # bond no
-        bondNo = len(self.atomBonds1d)
+        # matching graph (symbol, bond types and atom environment)
+        G = self.__matching_graph(implicit_h=implicit_h)
+
+        # coordinates, added once on request (not needed for matching)
+        if G.number_of_nodes() > 0 and 'xyz' not in G.nodes[next(iter(G))]:
+            xyzRows = np.asarray(self.xyzList)[np.asarray(list(G)) - 1].tolist()
+            nx.set_node_attributes(G, dict(zip(G, xyzRows)), 'xyz')
 
-        # Create a graph from atoms and bonds
-        G = nx.Graph()
-
-        # *** atom visualization
-        for i in range(atomNo):
-            # xyz
-            _atom1X = self.xyzList[i, 0]
-            _atom1Y = self.xyzList[i, 1]
-            _atom1Z = self.xyzList[i, 2]
-            _atom1XYZ = [_atom1X, _atom1Y, _atom1Z]
-
-            # color
-            # atom id
-            _atomId = int(i+1)
-            # symbol
-            _atomSymbol = str(self.atomElements[i]).strip()
-            # atom mark
-            atomMark = str(_atomSymbol) + str(_atomId)
-
-            # add node with cooridination
-            # G.add_node(_atomId, symbol=_atomSymbol,
-            #            x=_atom1X, y=_atom1Y, z=_atom1Z, xyz=_atom1XYZ)
-
-            G.add_node(_atomId, symbol=_atomSymbol, xyz=_atom1XYZ)
-
-        # *** using bond block
-        for i in range(bondNo):
-            # atom 1
-            _id1 = self.atomBonds1d[i]['id1']
-            _symbol1 = self.atomBonds1d[i]['symbol1']
-            # atom 2
-            _id2 = self.atomBonds1d[i]['id2']
-            _symbol2 = self.atomBonds1d[i]['symbol2']
-            # bond type
-            _bondType = self.atomBonds1d[i]['bond_type']
-            # bond symbol
-            _bondSymbol = self.atomBonds1d[i]['bond_symbol']
-
-            # add edge
-            G.add_edge(_id1, _id2, symbol=_bondSymbol, type=_bondType)
-            
         # add a name to the graph
         if graph_name is not None:
             G.graph['name'] = graph_name
 
         # update
         self.compound_graph = G
+        self._element_index = self._graph_cache[implicit_h][1]
+
+        # res
+        return G
+
+    def __matching_graph(self, implicit_h=False):
+        '''
+        Graph used for matching (no coordinates), built once
+
+        Parameters
+        ----------
+        implicit_h : bool
+            hydrogen-suppressed graph
+
+        Returns
+        -------
+        G : nx.Graph
+            compound graph
+        '''
+        # structure changes (invalidate caches)
+        self.check_structure()
+
+        # build once
+        if implicit_h not in self._graph_cache:
+            G = self.__build_graph(implicit_h=implicit_h)
+            # element index and invariants (anchor atoms and prefilter of
+            # functional group patterns) from the compact graph
+            compact = self.create_compact_graph(implicit_h=implicit_h)
+            GraphInvariant.register(G, GraphInvariant.from_compact(compact))
+            self._graph_cache[implicit_h] = (G, compact.element_index())
+            # explicit graph
+            if not G.graph['implicit_h']:
+                self._graph_cache[False] = self._graph_cache[implicit_h]
+
+        # res
+        return self._graph_cache[implicit_h][0]
+
+    @property
+    def explicit_graph(self):
+        '''
+        Compound graph with explicit hydrogens (the compound graph or built once)
+        '''
+        G = self.__matching_graph(implicit_h=False)
+        if 'name' not in G.graph and self._compound_graph is not None \
+                and 'name' in self._compound_graph.graph:
+            G.graph['name'] = self._compound_graph.graph['name']
+        return G
+
+    @property
+    def canonical_hash(self):
+        '''
+        Canonical hash of the structure (elements and bond orders), the same
+        for any atom order, coordinates are not included
+
+        Notes
+        -----
+        - hydrogens bonded to a single heavy atom are part of the atom labels
+        - computed once (invalidated if the structure changes)
+        - an exception is raised if the canonical search exceeds
+          CanonicalGraph.max_nodes (highly symmetric structures)
+        '''
+        # compact graph (invalidates caches on structure changes)
+        compact = self.create_compact_graph(implicit_h=True)
+
+        if self._canonical_hash is None:
+            symbols = compact.symbols
+            labels = symbols
+            # suppressed hydrogens (bond orders to hydrogens of each atom)
+            if compact.implicit_h:
+                atomEnv = self.atom_environment
+                isH = [str(i).strip() == 'H' for i in self.atomElements]
+                hydrogens = {}
+                for i, j, o in zip(atomEnv['bond_i'].tolist(), atomEnv['bond_j'].tolist(),
+                                   atomEnv['bond_type'].tolist()):
+                    if isH[j]:
+                        hydrogens.setdefault(i, []).append(o)
+                    elif isH[i]:
+                        hydrogens.setdefault(j, []).append(o)
+                labels = [f"{s}|{','.join(map(str, sorted(hydrogens.get(n - 1, []))))}"
+                          for s, n in zip(symbols, compact.node_ids.tolist())]
+            self._canonical_hash = CanonicalGraph.canonical_hash(labels, compact)
+
+        # res
+        return self._canonical_hash
+
+    def is_same_structure(self, other):
+        '''
+        Check another compound has the same structure (any atom order)
+
+        Parameters
+        ----------
+        other : Compound
+            compound
+
+        Returns
+        -------
+        res : bool
+            True if the structures are isomorphic (elements and bond orders)
+
+        Notes
+        -----
+        - different canonical hashes are rejected, equal hashes are verified
+          by isomorphism of the compound graphs
+        - without a canonical hash (search limit), isomorphism is checked only
+        '''
+        # check
+        try:
+            if self.canonical_hash != other.canonical_hash:
+                return False
+        except Exception:
+            pass
+        return CanonicalGraph.same_graph(self.explicit_graph, other.explicit_graph)
+
+    @property
+    def structure_hash(self):
+        '''
+        Hash of the structure (elements and bonds), coordinates are not included
+        '''
+        # bond arrays
+        bondI, bondJ, bondOrder = Compute.bond_arrays(self.atomBonds)
+        # hash
+        h = hashlib.sha1()
+        h.update('|'.join(str(i).strip()
+                 for i in self.atomElements).encode())
+        for arr in (bondI, bondJ, bondOrder):
+            h.update(np.ascontiguousarray(arr, dtype=np.int64).tobytes())
+        # res
+        return h.hexdigest()
+
+    def check_structure(self):
+        '''
+        Compare the structure with the cached one, caches of the compound
+        (atom environment, graphs, results) are removed if it has changed
+
+        Returns
+        -------
+        res : bool
+            True if the structure has changed
+        '''
+        # state
+        state = (self.structure_hash, hashlib.sha1(np.ascontiguousarray(
+            self.xyzList, dtype=float).tobytes()).hexdigest())
+        # check
+        if state == self._structure_state:
+            return False
+
+        # invalidate
+        self._structure_state = state
+        self._atom_environment = None
+        self._graph_cache = {}
+        self._compact_cache = {}
+        self._fingerprint_cache = {}
+        self._canonical_hash = None
+        self._match_results = {}
+        return True
+
+    def __is_compound_graph(self, G):
+        '''
+        Check a graph is a (cached) graph of the compound
+        '''
+        return self._structure_state is not None and any(
+            G is _G for _G, _ in self._graph_cache.values())
+
+    def __cached_result(self, key):
+        '''
+        Get a result of the compound (compound cache, then the process-wide cache)
+
+        Parameters
+        ----------
+        key : tuple
+            result key such as ('builtin', name, count)
+
+        Returns
+        -------
+        res : object
+            cached result, None if not found
+        '''
+        res = self._match_results.get(key)
+        if res is None:
+            res = MatchCache.get((self._structure_state[0],) + key)
+            if res is not None:
+                self._match_results[key] = res
+        # stats
+        if res is not None and self._matcher_stats:
+            self._matcher_stats['cached'] += 1
+        return res
+
+    def __save_result(self, key, value):
+        '''
+        Save a result of the compound (compound cache and the process-wide cache)
+        '''
+        self._match_results[key] = value
+        MatchCache.put((self._structure_state[0],) + key, value)
+
+    def __custom_result_key(self, G, key, value, count):
+        '''
+        Result key of a custom functional group (name, mode and pattern signatures)
+
+        Returns
+        -------
+        result_key : tuple
+            None if the graph is not a compound graph (no cache)
+        '''
+        # check
+        if not self.__is_compound_graph(G):
+            return None
+        graphs = [value] if isinstance(value, nx.Graph) else list(value)
+        return ('custom', key, count, tuple(
+            PatternLibrary.pattern_signature(graph) for graph in graphs))
+
+    def __append_cached(self, res_match, result_key, key, value):
+        '''
+        Append a cached result of a custom functional group
+
+        Returns
+        -------
+        res : bool
+            True if the result was found
+        '''
+        # check
+        if result_key is None:
+            return False
+        _res = self.__cached_result(result_key)
+        if _res is None:
+            return False
+        # update custom functional group
+        if isinstance(value, nx.Graph):
+            self.update_custom_functional_group(key, value)
+        res_match.append(dict(_res))
+        return True
+
+    def __library_match(self, library, G, names, count, workers):
+        '''
+        Match built-in functional groups (this process or worker processes)
+
+        Returns
+        -------
+        res : dict
+            functional group name -> number of unique occurrences (1/0 in check mode)
+        '''
+        # worker processes (no budget, enough atoms to split)
+        if workers is not None and workers > 1 and names and \
+                MatchBudget.active() is None and len(G) >= workers:
+            return ParallelMatcher.match(
+                library, G, names,
+                partial(Network.atom_match, keys=self._atom_environment_keys),
+                Network.edge_match, workers,
+                count=count, stats=self._matcher_stats)
+
+        # single traversal
+        return library.match(
+            G, names, self.node_match, self.edge_match,
+            count=count, stats=self._matcher_stats,
+            element_index=self.__element_index_of(G),
+            incomplete_groups=self._match_status)
+
+    def __budget_stopped(self, res_match, key, count):
+        '''
+        Append a stopped custom functional group if the call budget is exhausted
+
+        Returns
+        -------
+        res : bool
+            True if the group was not matched
+        '''
+        budget = MatchBudget.active()
+        # check
+        if budget is None or not budget.exhausted():
+            return False
+        self.__append_stopped(res_match, key, count, budget.status)
+        return True
+
+    def __append_stopped(self, res_match, key, count, status):
+        '''
+        Append a stopped custom functional group (False/0, lower bound)
+        '''
+        self._match_status[key] = status
+        res = {
+            'function_group': key,
+            'result': False
+        }
+        if count:
+            res['count'] = 0
+        res_match.append(res)
+
+    def create_compact_graph(self, implicit_h: bool = False):
+        '''
+        Create the compact compound graph (csr arrays, built once)
+
+        Parameters
+        ----------
+        implicit_h : bool
+            hydrogen-suppressed graph (default False)
+
+        Returns
+        -------
+        compact : CompactGraph
+            compact graph, compact.implicit_h shows the mode
+
+        Notes
+        -----
+        - hydrogens bonded to more than one atom (or to a hydrogen) cannot be
+          suppressed, an explicit graph is created then
+        '''
+        # structure changes (invalidate caches)
+        self.check_structure()
+
+        # build once
+        if implicit_h not in self._compact_cache:
+            # atom environment (annotation pass)
+            atomEnv = self.atom_environment
+
+            # hydrogens (suppressed if bonded to a single heavy atom)
+            keep = None
+            if implicit_h:
+                isH = np.asarray([str(i).strip() == 'H' for i in self.atomElements],
+                                 dtype=bool)
+                # a single bond to a heavy atom
+                if isH.any() and np.all((atomEnv['degree'][isH] == 1) &
+                                        (atomEnv['heavy_degree'][isH] == 1)):
+                    keep = ~isH
+
+            compact = CompactGraph(self.atomElements, atomEnv['bond_i'],
+                                   atomEnv['bond_j'], atomEnv['bond_type'], keep=keep)
+            self._compact_cache[implicit_h] = compact
+            # explicit graph
+            if not compact.implicit_h:
+                self._compact_cache[False] = compact
+
+        # res
+        return self._compact_cache[implicit_h]
+
+    @property
+    def compact_graph(self):
+        '''
+        Compact compound graph with explicit hydrogens (csr arrays)
+        '''
+        return self.create_compact_graph(implicit_h=False)
+
+    def fingerprint(self, n_bits: Optional[int] = None, path_length: Optional[int] = None,
+                    radius: Optional[int] = None, implicit_h: bool = True):
+        '''
+        Path and circular fingerprint of the compound (computed once per setting)
+
+        Parameters
+        ----------
+        n_bits : int
+            fingerprint size (default 2048, a multiple of 64)
+        path_length : int
+            maximum path length (default 7 bonds)
+        radius : int
+            circular neighbourhood radius (default 2 bonds)
+        implicit_h : bool
+            hydrogen-suppressed graph (default True), hydrogens are kept as the
+            h_count of their neighbour
+
+        Returns
+        -------
+        fingerprint : np.ndarray
+            packed bits (n_bits / 64 uint64 words)
+        '''
+        # compact graph (invalidates caches on structure changes)
+        compact = self.create_compact_graph(implicit_h=implicit_h)
+
+        key = (n_bits, path_length, radius, implicit_h)
+        if key not in self._fingerprint_cache:
+            # atom labels (element, degree, hydrogens, ring)
+            atomEnv = self.atom_environment
+            atoms = (compact.node_ids - 1).tolist()
+            atomLabels = [f"{s}|{d}|{h}|{int(r)}" for s, d, h, r in zip(
+                compact.symbols, compact.degree.tolist(),
+                atomEnv['h_count'][atoms].tolist(), atomEnv['in_ring'][atoms].tolist())]
+            self._fingerprint_cache[key] = Fingerprint.generate(
+                compact, n_bits=n_bits, path_length=path_length, radius=radius,
+                atom_labels=atomLabels)
+
+        # res
+        return self._fingerprint_cache[key].copy()
+
+    def __build_graph(self, implicit_h=False):
+        '''
+        Build a compound graph from its compact graph (bulk)
+
+        Parameters
+        ----------
+        implicit_h : bool
+            suppress hydrogens
+
+        Returns
+        -------
+        G : nx.Graph
+            compound graph
+        '''
+        # compact graph
+        compact = self.create_compact_graph(implicit_h=implicit_h)
+
+        # atom environment (annotation pass)
+        atomEnv = self.atom_environment
+
+        # Create a graph from atoms and bonds
+        G = nx.Graph(implicit_h=compact.implicit_h)
+
+        # *** nodes (atom id, symbol and atom environment), coordinates are
+        # added by create_graph
+        atoms = (compact.node_ids - 1).tolist()
+        columns = [atomEnv[k][atoms].tolist()
+                   for k in self._atom_environment_keys]
+        G.add_nodes_from(
+            (i + 1, dict(symbol=symbol,
+                         **dict(zip(self._atom_environment_keys, values))))
+            for i, symbol, *values in zip(atoms, compact.symbols, *columns))
+
+        # *** edges (bond block, ring/aromatic bonds)
+        rows = compact.bond_rows.tolist()
+        ringBond = atomEnv['ring_bond'][rows].tolist()
+        aromaticBond = atomEnv['aromatic_bond'][rows].tolist()
+        G.add_edges_from(
+            (self.atomBonds1d[k]['id1'], self.atomBonds1d[k]['id2'],
+             dict(symbol=self.atomBonds1d[k]['bond_symbol'], type=self.atomBonds1d[k]['bond_type'],
+                  in_ring=bool(r), aromatic=bool(a)))
+            for k, r, a in zip(rows, ringBond, aromaticBond))
+
+        # rings (node ids)
+        G.graph['rings'] = self.rings
+        G.graph['aromatic_rings'] = self.aromatic_rings
 
         # res
         return G
 
+    def lookup_arene(self, G):
+        '''
+        Count arenes (aromatic carbon rings) from ring perception
+
+        Parameters
+        ----------
+        G : nx.Graph
+            compound graph
+
+        Returns
+        -------
+        res : int
+            number of aromatic rings with carbon atoms only
+        '''
+        return sum(1 for ring in G.graph.get('aromatic_rings', [])
+                   if all(G.nodes[n]['symbol'] == 'C' for n in ring))
+
+    def lookup_aromatic_CH_bond(self, G):
+        '''
+        Count aromatic C-H bonds from ring perception
+
+        Parameters
+        ----------
+        G : nx.Graph
+            compound graph
+
+        Returns
+        -------
+        res : int
+            number of hydrogens bonded to aromatic carbon atoms
+        '''
+        return sum(G.nodes[n]['h_count'] for n in G
+                   if G.nodes[n]['symbol'] == 'C' and G.nodes[n].get('aromatic', False))
+
+    def __lookup_occurrences(self, G, name):
+        '''
+        Occurrences of a functional group found by ring perception (the same as the lookup count)
+
+        Yields
+        ------
+        atoms : tuple
+            atom ids
+        edges : list
+            bonds (atom id pairs)
+        '''
+        if name == 'arene':
+            for ring in G.graph.get('aromatic_rings', []):
+                if all(G.nodes[n]['symbol'] == 'C' for n in ring):
+                    yield tuple(ring), list(G.subgraph(ring).edges)
+        elif name == 'aromatic CH bond (sp2)':
+            for n in G:
+                if G.nodes[n]['symbol'] == 'C' and G.nodes[n].get('aromatic', False):
+                    for nbr in G.adj[n]:
+                        if G.nodes[nbr]['symbol'] == 'H':
+                            yield (n, nbr), [(n, nbr)]
+
+    def __iter_matches(self, G, pattern, node_match, edge_match, element_index):
+        '''
+        Enumerate the mappings of a pattern, a ring pattern (simple cycle) is
+        only searched on the ring atoms (ring perception)
+
+        Parameters
+        ----------
+        G : nx.Graph
+            compound graph
+        pattern : nx.Graph
+            pattern graph
+        node_match : callable
+            node match function
+        edge_match : callable
+            edge match function
+        element_index : dict
+            symbol -> node ids
+
+        Yields
+        ------
+        mapping : dict
+            main graph node -> pattern node
+
+        Notes
+        -----
+        - every simple cycle of the compound is made of ring atoms, but it is
+          not always a ring of the smallest set of smallest rings (bridged and
+          fused rings), so the ring atoms only restrict the search
+        '''
+        # check ring pattern
+        if 'rings' in G.graph and len(pattern) > 2 and \
+                all(d == 2 for _, d in pattern.degree) and nx.is_connected(pattern):
+            # no ring of the pattern size or smaller
+            if not any(len(ring) <= len(pattern) for ring in G.graph['rings']):
+                return
+            # ring atoms
+            H = G.subgraph([n for n, inRing in G.nodes(data='in_ring') if inRing])
+            yield from PatternLibrary.iter_matches(
+                H, pattern, node_match, edge_match)
+            return
+
+        # anchor seeded
+        yield from PatternLibrary.iter_matches(
+            G, pattern, node_match, edge_match, element_index=element_index)
+
     def node_match(self, n1, n2):
         '''
         Define a custom node_match function to ensure element matching
+
+        Notes
+        -----
+        - pattern nodes (n2) may define atom environment constraints, an exact
+          value (`h_count=3`) or a minimum (`h_count_min=3`) of degree, heavy_degree,
+          h_count, in_ring and hybridization
+        '''
+        return Network.atom_match(n1, n2, self._atom_environment_keys)
+
+    @staticmethod
+    def atom_match(n1, n2, keys):
+        '''
+        Match an atom (n1) against a pattern node (n2), element and atom environment keys
         '''
         # Define dummy node pattern
         dummy_node_pattern = "XX"
 
         # Ignore dummy nodes
-        if n1['symbol'].startswith(dummy_node_pattern) or n2['symbol'].startswith(dummy_node_pattern):
-            return True
-
-        return n1['symbol'] == n2['symbol']
-
-    def edge_match(self, e1, e2):
+        if not (n1['symbol'].startswith(dummy_node_pattern) or n2['symbol'].startswith(dummy_node_pattern)):
+            if n1['symbol'] != n2['symbol']:
+                return False
+
+        # atom environment constraints
+        if len(n2) > 1:
+            for key in keys:
+                # check
+                if key not in n1:
+                    continue
+                if key in n2 and n1[key] != n2[key]:
+                    return False
+                _min = n2.get(key + '_min')
+                if _min is not None and n1[key] < _min:
+                    return False
+
+        return True
+
+    @staticmethod
+    def edge_match(e1, e2):
         '''
         Define a custom edge_match function to ensure bond type matching
         '''
@@ -667,10 +1440,17 @@ class Network(ChemGraphs):
         ----------
         functional_group : str
             functional group
+
+        Returns
+        -------
+        res_match : list[dict]
+            matches (a new list on each call, the cached matches are not shared)
         '''
 
-        # get the graph
-        G = self.compound_graph
+        # structure changes (invalidate caches)
+        self.check_structure()
+        # get the graph (explicit hydrogens)
+        G = self.explicit_graph
         # sub graph
         sub_graphs = []
         sub_graphs_name = []
@@ -697,6 +1477,12 @@ class Network(ChemGraphs):
         if len(sub_graphs) == 0:
             raise Exception('functional group not found!')
 
+        # cached search (name, structure state and pattern signatures)
+        search_key = ('search', functional_group, self._structure_state,
+                      tuple(PatternLibrary.pattern_signature(_fn) for _fn in sub_graphs))
+        if search_key in self._match_results:
+            return [dict(x) for x in self._match_results[search_key]]
+
         # Create a GraphMatcher object for a functional group
         for _fn in sub_graphs:
             fg_matcher = isomorphism.GraphMatcher(
@@ -720,8 +1506,280 @@ class Network(ChemGraphs):
                     'subgraph_pattern': subgraph_pattern
                 })
 
+        # save (compound cache only)
+        self._match_results[search_key] = tuple(dict(x) for x in res_match)
+
         return res_match
 
+    def iter_matches(self, functional_group, unique=True, limit=None, subgraph=False):
+        '''
+        Enumerate the occurrences of a functional group on demand
+
+        Parameters
+        ----------
+        functional_group : str | nx.Graph
+            built-in/custom functional group name or a pattern graph
+        unique : bool
+            one match per atom set (default True), False gives every mapping
+        limit : int
+            maximum number of matches (default None: all)
+        subgraph : bool
+            add a subgraph view of the matched atoms (default False)
+
+        Yields
+        ------
+        match : dict
+            function_group, atoms (atom ids in pattern node order) and bonds
+            (sorted bond ids, bond block order starting from 1), subgraph if asked
+
+        Notes
+        -----
+        - matches are searched lazily, the search stops with the caller
+          (e.g. the first occurrence only)
+        - unique matches of a built-in group are the same as its count
+        '''
+        # pattern graphs
+        if isinstance(functional_group, nx.Graph):
+            sub_graphs = [functional_group]
+        elif functional_group in self.function_group_list:
+            sub_graphs = self.function_group_list[functional_group]
+        elif functional_group in self.custom_functional_group_list:
+            sub_graphs = self.custom_functional_group_list[functional_group]
+        else:
+            raise Exception('functional group not found!')
+        sub_graphs = [sub_graphs] if isinstance(
+            sub_graphs, nx.Graph) else list(sub_graphs)
+
+        # check
+        if limit is not None and limit <= 0:
+            return
+
+        # structure changes (invalidate caches)
+        self.check_structure()
+        # get the graph (explicit hydrogens)
+        G = self.explicit_graph
+        _element_index = self.__element_index_of(G)
+
+        # bond ids
+        bondIds = {}
+        for k, bond in enumerate(self.atomBonds1d):
+            bondIds[(bond['id1'], bond['id2'])] = k + 1
+            bondIds[(bond['id2'], bond['id1'])] = k + 1
+
+        # name
+        name = functional_group if isinstance(functional_group, str) else None
+
+        # functional groups found by ring perception
+        if name in self.function_group_lookup:
+            for n, (atoms, edges) in enumerate(self.__lookup_occurrences(G, name)):
+                # limit
+                if limit is not None and n >= limit:
+                    return
+                match = {
+                    'function_group': name,
+                    'atoms': atoms,
+                    'bonds': tuple(sorted(bondIds[e] for e in edges))
+                }
+                if subgraph:
+                    match['subgraph'] = G.subgraph(atoms)
+                yield match
+            return
+
+        seen = set()
+        n = 0
+        for _fn in sub_graphs:
+            # check invariants (skip impossible patterns)
+            if not self.__pattern_feasible(G, _fn):
+                continue
+
+            # mappings (symmetry breaking for unique matches)
+            if unique:
+                mappings = self.__iter_matches(
+                    G, _fn, self.node_match, self.edge_match, _element_index)
+            else:
+                mappings = ChemGraphMatcher(
+                    G, _fn, node_match=self.node_match, edge_match=self.edge_match,
+                    symmetry_breaking=False).subgraph_isomorphisms_iter()
+
+            for mapping in mappings:
+                # check
+                if unique:
+                    key = frozenset(mapping)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                # pattern node -> atom id
+                inverse = {v: k for k, v in mapping.items()}
+                match = {
+                    'function_group': name,
+                    'atoms': tuple(inverse[v] for v in _fn),
+                    'bonds': tuple(sorted(bondIds[(inverse[u], inverse[v])] for u, v in _fn.edges))
+                }
+                # subgraph view (only if asked)
+                if subgraph:
+                    match['subgraph'] = G.subgraph(mapping)
+
+                yield match
+
+                # limit
+                n += 1
+                if limit is not None and n >= limit:
+                    return
+
+    def __element_index_of(self, G):
+        '''
+        Element index of a graph (built once in create_graph for the compound graph)
+        '''
+        if G is self._compound_graph:
+            return self._element_index
+        for _G, elementIndex in self._graph_cache.values():
+            if G is _G:
+                return elementIndex
+        return PatternLibrary.element_index(G)
+
+    def __hydrogen_suppressed(self, G, patterns):
+        '''
+        Select the graph and pattern variants of a functional group
+
+        Parameters
+        ----------
+        G : nx.Graph
+            compound graph
+        patterns : list
+            pattern graphs (explicit hydrogens)
+
+        Returns
+        -------
+        G : nx.Graph
+            the compound graph, or the explicit graph if a pattern cannot be translated
+        variants : list
+            pattern variants of each pattern
+        '''
+        # explicit graph
+        if not G.graph.get('implicit_h', False):
+            return G, [[pattern] for pattern in patterns]
+
+        # hydrogen-suppressed variants
+        variants = []
+        for pattern in patterns:
+            _variants = self.hydrogen_suppressed_patterns(pattern)
+            # check
+            if _variants is None:
+                return self.explicit_graph, [[pattern] for pattern in patterns]
+            variants.append(_variants)
+
+        # res
+        return G, variants
+
+    def __iter_group_sections(self, G, group_patterns, node_match, edge_match):
+        '''
+        Unique sections of a compound matched by a group (streamed)
+
+        Parameters
+        ----------
+        G : nx.Graph
+            compound graph
+        group_patterns : list
+            group pattern variants
+        node_match : callable
+            node match function
+        edge_match : callable
+            edge match function
+
+        Yields
+        ------
+        section : nx.Graph
+            section graph, a reusable subgraph view of the compound (valid
+            until the next section)
+        weight : int
+            number of explicit sections it stands for
+
+        Notes
+        -----
+        - mappings are deduplicated on the fly by their canonical key, only the
+          keys are kept
+        '''
+        # element index (anchor atoms)
+        element_index = self.__element_index_of(G)
+        implicitH = G.graph.get('implicit_h', False)
+
+        # reusable subgraph view (the node filter is updated for each section)
+        sectionFilter = nx.filters.show_nodes([])
+        sectionView = nx.subgraph_view(G, filter_node=sectionFilter)
+
+        # unique mappings
+        seen = set()
+        for pattern in group_patterns:
+            # check invariants (skip impossible patterns)
+            if not self.__pattern_feasible(G, pattern):
+                continue
+            # group sections (anchor seeded)
+            for mapping in PatternLibrary.iter_matches(
+                    G, pattern, node_match, edge_match, element_index=element_index):
+                key, weight = PatternLibrary.mapping_key(G, mapping, pattern)
+                # check
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                nodes, hydrogens = key
+                if implicitH:
+                    # hydrogens taken by the group
+                    section = G.subgraph(nodes).copy()
+                    _hydrogens = dict(hydrogens)
+                    for node in section:
+                        section.nodes[node]['h_count'] = _hydrogens.get(
+                            node, 0)
+                else:
+                    # group pattern within the main graph
+                    sectionFilter.nodes = set(nodes)
+                    section = sectionView
+
+                yield section, weight
+
+    def __reset_matcher_stats(self):
+        '''
+        Reset the matcher stats (a new check/count call)
+        '''
+        self._matcher_stats = {
+            'patterns': 0,
+            'matcher_calls': 0,
+            'skipped': 0,
+            'cached': 0
+        }
+        self._match_status = {}
+
+    def __pattern_feasible(self, G, pattern):
+        '''
+        Compare pattern invariants with the main graph invariants before VF2
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+        pattern : nx.Graph
+            functional group graph
+
+        Returns
+        -------
+        res : bool
+            False if the pattern cannot be a subgraph of the main graph
+        '''
+        # check
+        res = GraphInvariant.of(G).contains(GraphInvariant.of(pattern))
+
+        # update stats
+        if self._matcher_stats:
+            self._matcher_stats['patterns'] += 1
+            if res:
+                self._matcher_stats['matcher_calls'] += 1
+            else:
+                self._matcher_stats['skipped'] += 1
+
+        # res
+        return res
+
     def update_custom_functional_group(self, key, value):
         '''
         Update custom functional group
@@ -0,0 +1,278 @@
+# PARALLEL MATCH
+# ---------------
+
+# import packages/modules
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import networkx as nx
+
+# worker state (compound graph and patterns, set once per worker process)
+_WORKER = {}
+
+
+class SharedGraph():
+    '''
+    Compound graph stored in shared memory as compact arrays
+
+    hint:
+        node/edge attributes are packed into one int64 block (booleans and
+        integers as values, strings as codes of a small table), worker
+        processes attach the block once and rebuild the graph in the same
+        node order (symmetry-breaking constraints use the node order)
+    '''
+    # node attributes not used by matching
+    skip_keys = ('xyz',)
+
+    def __init__(self, G: nx.Graph):
+        # arrays
+        data, self.meta = SharedGraph.encode(G)
+        # shared memory
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=max(data.nbytes, 1))
+        np.ndarray(data.shape, dtype=np.int64, buffer=self.shm.buf)[:] = data
+        self.meta['name'] = self.shm.name
+
+    def close(self):
+        '''
+        Release the shared memory block
+        '''
+        self.shm.close()
+        self.shm.unlink()
+
+    @staticmethod
+    def __columns(items, keys):
+        '''
+        Pack attributes of nodes/edges into int64 columns
+
+        Returns
+        -------
+        columns : list[np.ndarray]
+            one column per packed attribute
+        layout : list
+            (key, kind, table), kind: 'bool', 'int' or 'str'
+        extra : dict
+            attributes which cannot be packed (item index -> {key: value})
+        '''
+        columns = []
+        layout = []
+        extra = {}
+        for key in keys:
+            values = [attrs.get(key) for attrs in items]
+            # kind
+            if all(isinstance(v, (bool, np.bool_)) for v in values):
+                kind, table = 'bool', None
+                column = [int(v) for v in values]
+            elif all(isinstance(v, (int, np.integer)) and not isinstance(v, (bool, np.bool_)) for v in values):
+                kind, table = 'int', None
+                column = [int(v) for v in values]
+            elif all(isinstance(v, str) for v in values):
+                kind = 'str'
+                table = sorted(set(values))
+                codes = {v: i for i, v in enumerate(table)}
+                column = [codes[v] for v in values]
+            else:
+                # not packed (missing or mixed values)
+                for i, attrs in enumerate(items):
+                    if key in attrs:
+                        extra.setdefault(i, {})[key] = attrs[key]
+                continue
+            columns.append(np.asarray(column, dtype=np.int64))
+            layout.append((key, kind, table))
+        return columns, layout, extra
+
+    @staticmethod
+    def encode(G: nx.Graph):
+        '''
+        Encode a graph into a single int64 block
+
+        Returns
+        -------
+        data : np.ndarray
+            node rows (id and attributes), then edge rows (nodes and attributes)
+        meta : dict
+            layout of the block (small, sent to the workers)
+        '''
+        # nodes
+        nodes = list(G.nodes)
+        nodeAttrs = [G.nodes[n] for n in nodes]
+        nodeKeys = sorted({k for attrs in nodeAttrs for k in attrs
+                           if k not in SharedGraph.skip_keys})
+        nodeColumns, nodeLayout, nodeExtra = SharedGraph.__columns(
+            nodeAttrs, nodeKeys)
+
+        # edges
+        edges = list(G.edges)
+        edgeAttrs = [G.edges[e] for e in edges]
+        edgeKeys = sorted({k for attrs in edgeAttrs for k in attrs})
+        edgeColumns, edgeLayout, edgeExtra = SharedGraph.__columns(
+            edgeAttrs, edgeKeys)
+
+        # block
+        nodeBlock = np.column_stack(
+            [np.asarray(nodes, dtype=np.int64)] + nodeColumns) if nodes else np.zeros((0, 1), dtype=np.int64)
+        edgeBlock = np.column_stack(
+            [np.asarray([e[0] for e in edges], dtype=np.int64),
+             np.asarray([e[1] for e in edges], dtype=np.int64)] + edgeColumns) if edges else np.zeros((0, 2), dtype=np.int64)
+        data = np.concatenate([nodeBlock.ravel(), edgeBlock.ravel()])
+
+        # meta
+        meta = {
+            'nodes': nodeBlock.shape,
+            'edges': edgeBlock.shape,
+            'node_layout': nodeLayout,
+            'edge_layout': edgeLayout,
+            'node_extra': nodeExtra,
+            'edge_extra': edgeExtra,
+            'graph': dict(G.graph)
+        }
+        return data, meta
+
+    @staticmethod
+    def decode(data, meta):
+        '''
+        Rebuild a graph from its block (the same node order)
+
+        Returns
+        -------
+        G : nx.Graph
+            graph
+        '''
+        def _value(kind, table, v):
+            if kind == 'bool':
+                return bool(v)
+            if kind == 'str':
+                return table[v]
+            return int(v)
+
+        nodeSize = meta['nodes'][0] * meta['nodes'][1]
+        nodeBlock = data[:nodeSize].reshape(meta['nodes'])
+        edgeBlock = data[nodeSize:nodeSize +
+                         meta['edges'][0] * meta['edges'][1]].reshape(meta['edges'])
+
+        G = nx.Graph(**meta['graph'])
+        # nodes
+        for i, row in enumerate(nodeBlock.tolist()):
+            attrs = {key: _value(kind, table, v) for (key, kind, table), v in zip(
+                meta['node_layout'], row[1:])}
+            attrs.update(meta['node_extra'].get(i, {}))
+            G.add_node(row[0], **attrs)
+        # edges
+        for i, row in enumerate(edgeBlock.tolist()):
+            attrs = {key: _value(kind, table, v) for (key, kind, table), v in zip(
+                meta['edge_layout'], row[2:])}
+            attrs.update(meta['edge_extra'].get(i, {}))
+            G.add_edge(row[0], row[1], **attrs)
+        return G
+
+    @staticmethod
+    def attach(meta):
+        '''
+        Rebuild a graph from a shared memory block (worker process)
+        '''
+        shm = shared_memory.SharedMemory(name=meta['name'])
+        try:
+            size = meta['nodes'][0] * meta['nodes'][1] + \
+                meta['edges'][0] * meta['edges'][1]
+            data = np.ndarray((size,), dtype=np.int64, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+        return SharedGraph.decode(data, meta)
+
+
+def _init_worker(meta, library, node_match, edge_match):
+    '''
+    Attach the compound graph and the patterns (once per worker process)
+    '''
+    # local
+    from .patternlibrary import PatternLibrary
+
+    G = SharedGraph.attach(meta)
+    _WORKER.update(
+        graph=G, library=library, node_match=node_match, edge_match=edge_match,
+        element_index=PatternLibrary.element_index(G))
+
+
+def _match_worker(function_groups, count, partition):
+    '''
+    Match functional groups anchored at a partition of the atoms (worker process)
+    '''
+    stats = {'patterns': 0, 'matcher_calls': 0, 'skipped': 0}
+    partial = _WORKER['library'].match_partial(
+        _WORKER['graph'], function_groups, _WORKER['node_match'], _WORKER['edge_match'],
+        count=count, stats=stats, element_index=_WORKER['element_index'],
+        partition=partition)
+    partial['stats'] = stats
+    return partial
+
+
+class ParallelMatcher():
+    '''
+    Match a pattern library on a single large compound with worker processes
+
+    hint:
+        the compound graph is shared once (SharedGraph), anchor atoms are
+        split into interleaved partitions (node order % n), every partition
+        runs the whole library and the unique keys are merged in partition
+        order, so the results are the same as a single traversal
+    '''
+    # partitions per worker (load balance)
+    partitions_per_worker = 4
+
+    @staticmethod
+    def match(library, G, function_groups, node_match, edge_match, workers,
+              count=False, stats=None):
+        '''
+        Check/count functional groups with worker processes
+
+        Parameters
+        ----------
+        library : PatternLibrary
+            compiled patterns
+        G : nx.Graph
+            main graph
+        function_groups : list[str]
+            functional group names
+        node_match : callable
+            node match function (picklable)
+        edge_match : callable
+            edge match function (picklable)
+        workers : int
+            number of worker processes
+        count : bool
+            count unique occurrences (default False)
+        stats : dict
+            matcher stats to update
+
+        Returns
+        -------
+        res : dict
+            functional group name -> number of unique occurrences (1/0 in check mode)
+        '''
+        # check
+        if workers < 1:
+            raise Exception("workers must be a positive number!")
+
+        # partitions
+        n = max(1, min(len(G), workers * ParallelMatcher.partitions_per_worker))
+
+        shared = SharedGraph(G)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared.meta, library, node_match, edge_match)) as pool:
+                futures = [pool.submit(_match_worker, function_groups, count, (k, n))
+                           for k in range(n)]
+                # partition order (deterministic merge)
+                partials = [f.result() for f in futures]
+        finally:
+            shared.close()
+
+        # stats (patterns are visited once per partition)
+        if stats is not None and partials:
+            stats['patterns'] += partials[0]['stats']['patterns']
+            stats['skipped'] += partials[0]['stats']['skipped']
+            stats['matcher_calls'] += sum(p['stats']['matcher_calls']
+                                          for p in partials)
+
+        # res
+        return library.merge_partial(function_groups, partials, count=count)
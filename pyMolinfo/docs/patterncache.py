@@ -0,0 +1,131 @@
+# PATTERN CACHE
+# --------------
+
+# import packages/modules
+import os
+import hashlib
+import pickle
+# local
+from ..config import __version__
+from .utility import Utility
+from .customchemgraph import CustomChemGraph
+
+
+class PatternCache():
+    '''
+    Compiled custom functional group files (yml)
+
+    hint:
+        a file is compiled once (graphs and group/subgroup links) and kept in
+        memory by its content hash, a file is only read again if its
+        mtime/size changes, and only compiled again if its content changes,
+        artifact files are written only if cache_dir is set (opt-in), they
+        are named by the content hash and the package version
+    '''
+    # artifact directory (None: memory only)
+    cache_dir = None
+    # artifact format version
+    version = 1
+    # compiled files (path -> (mtime, size, content hash, functional groups, graphs))
+    __files = {}
+    # compiled contents (content hash -> (functional groups, graphs))
+    __contents = {}
+
+    @classmethod
+    def load(cls, file_location):
+        '''
+        Load a custom functional group file (compiled once)
+
+        Parameters
+        ----------
+        file_location : str | Path
+            yml file location
+
+        Returns
+        -------
+        custom_chem_graph : CustomChemGraph
+            custom functional groups
+        '''
+        # check
+        if not os.path.exists(file_location):
+            raise Exception("file path is not valid.")
+
+        path = os.path.abspath(file_location)
+        stat = os.stat(path)
+
+        # unchanged file
+        _file = cls.__files.get(path)
+        if _file is not None and _file[0] == stat.st_mtime_ns and _file[1] == stat.st_size:
+            return CustomChemGraph(_file[3], graphs=_file[4])
+
+        # content hash
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+
+        # compiled content (memory, then artifact)
+        compiled = cls.__contents.get(digest)
+        if compiled is None:
+            compiled = cls.__read_artifact(digest)
+        if compiled is None:
+            # compile
+            functional_groups = Utility.load_custom_functional_group(path)
+            compiled = (functional_groups,
+                        CustomChemGraph.create_graph(functional_groups))
+            cls.__write_artifact(digest, compiled)
+
+        # save
+        cls.__contents[digest] = compiled
+        cls.__files[path] = (stat.st_mtime_ns, stat.st_size,
+                             digest) + compiled
+
+        # res
+        return CustomChemGraph(compiled[0], graphs=compiled[1])
+
+    @classmethod
+    def artifact_path(cls, digest):
+        '''
+        Artifact file of a content hash (None if artifacts are disabled)
+        '''
+        if cls.cache_dir is None:
+            return None
+        return os.path.join(cls.cache_dir, f"{digest}-{__version__}-v{cls.version}.pkl")
+
+    @classmethod
+    def __read_artifact(cls, digest):
+        '''
+        Read a compiled artifact (None if not found or not readable)
+        '''
+        path = cls.artifact_path(digest)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    @classmethod
+    def __write_artifact(cls, digest, compiled):
+        '''
+        Write a compiled artifact (skipped if the directory is not writable)
+        '''
+        path = cls.artifact_path(digest)
+        if path is None:
+            return
+        try:
+            os.makedirs(cls.cache_dir, exist_ok=True)
+            # atomic write
+            _path = f"{path}.{os.getpid()}.tmp"
+            with open(_path, 'wb') as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(_path, path)
+        except Exception:
+            pass
+
+    @classmethod
+    def clear(cls):
+        '''
+        Remove compiled files from memory (artifacts are kept)
+        '''
+        cls.__files.clear()
+        cls.__contents.clear()
@@ -0,0 +1,895 @@
+# PATTERN LIBRARY
+# ----------------
+
+# import packages/modules
+import weakref
+from math import comb
+from collections import Counter, deque
+import networkx as nx
+# local
+from .invariant import GraphInvariant
+from .graphmatcher import ChemGraphMatcher
+from .matchbudget import MatchTimeout
+
+
+class PatternLibrary():
+    '''
+    Functional group patterns compiled for a single traversal of a compound graph
+
+    hint:
+        each pattern is anchored on its rarest atom, patterns are indexed by
+        the anchor element, every anchor atom is visited once and all
+        patterns anchored on its element are matched in its neighbourhood
+        (the k-hop ball for large graphs, k: pattern radius from the anchor),
+        equal patterns of different groups (aliases) are matched once
+    '''
+    # dummy node pattern (matches any element)
+    dummy_node_pattern = "XX"
+    # anchor priority (rare elements first)
+    anchor_priority = ['I', 'Br', 'Cl', 'F', 'S', 'P', 'N', 'O']
+    # common elements (last choices)
+    common_elements = ['C', 'H']
+    # graphs larger than this are searched in the k-hop ball of each anchor
+    ball_threshold = 200
+    # rooted patterns (released with the pattern)
+    __rooted = weakref.WeakKeyDictionary()
+    # implication DAG of pattern sets (pattern signatures -> contained patterns)
+    __implications = {}
+
+    def __init__(self, function_group_list):
+        '''
+        Compile functional group patterns
+
+        Parameters
+        ----------
+        function_group_list : dict
+            functional group name -> list of graphs
+        '''
+        # functional groups
+        self.function_group_list = function_group_list
+        # unique rooted patterns (shared by all functional groups using them)
+        self.patterns = []
+        # pattern index of each functional group
+        self.group_patterns = {}
+
+        # patterns by size and elements (isomorphism check within a bucket)
+        buckets = {}
+        for name, graphs in function_group_list.items():
+            self.group_patterns[name] = []
+            for i, pattern in enumerate(graphs):
+                # check an equal pattern
+                _bucket = buckets.setdefault(
+                    PatternLibrary.pattern_bucket(pattern), [])
+                index = next((k for k in _bucket if PatternLibrary.same_pattern(
+                    self.patterns[k]['pattern'], pattern)), None)
+                # new pattern
+                if index is None:
+                    index = len(self.patterns)
+                    rooted = self.compile_pattern(name, i, pattern)
+                    rooted['pattern_index'] = index
+                    rooted['function_groups'] = []
+                    self.patterns.append(rooted)
+                    _bucket.append(index)
+                # aliases
+                if name not in self.patterns[index]['function_groups']:
+                    self.patterns[index]['function_groups'].append(name)
+                if index not in self.group_patterns[name]:
+                    self.group_patterns[name].append(index)
+
+        # contained patterns of each pattern (implication DAG)
+        self.implications = PatternLibrary.pattern_implications(
+            [rooted['pattern'] for rooted in self.patterns])
+
+    @staticmethod
+    def pattern_bucket(pattern):
+        '''
+        Node/edge numbers and elements of a pattern (equal patterns share a bucket)
+        '''
+        return (pattern.number_of_nodes(), pattern.number_of_edges(),
+                tuple(sorted(str(symbol) for _, symbol in pattern.nodes(data='symbol'))))
+
+    @staticmethod
+    def same_pattern(pattern1, pattern2):
+        '''
+        Check two patterns are equal (isomorphic with equal node/edge attributes)
+        '''
+        return nx.is_isomorphic(pattern1, pattern2,
+                                node_match=dict.__eq__, edge_match=dict.__eq__)
+
+    @staticmethod
+    def pattern_signature(pattern):
+        '''
+        Exact signature of a pattern (node ids, node and edge attributes)
+        '''
+        nodes = tuple(sorted((repr(n), repr(sorted(d.items())))
+                             for n, d in pattern.nodes(data=True)))
+        edges = tuple(sorted(tuple(sorted((repr(u), repr(v)))) + (repr(sorted(d.items())),)
+                             for u, v, d in pattern.edges(data=True)))
+        return nodes, edges
+
+    @staticmethod
+    def node_implies(n1, n2):
+        '''
+        Check every atom matching a pattern node (n1) also matches another pattern node (n2)
+
+        Notes
+        -----
+        - element (XX matches any element), exact values and minimum (`_min`) constraints
+        '''
+        _symbol1 = str(n1['symbol'])
+        _symbol2 = str(n2['symbol'])
+        # element
+        if not _symbol2.startswith(PatternLibrary.dummy_node_pattern) and _symbol1 != _symbol2:
+            return False
+        # constraints
+        for key, value in n2.items():
+            if key == 'symbol':
+                continue
+            if key.endswith('_min'):
+                _value = n1.get(key[:-4], n1.get(key))
+                if _value is None or _value < value:
+                    return False
+            elif n1.get(key) != value:
+                return False
+        return True
+
+    @classmethod
+    def pattern_implications(cls, patterns):
+        '''
+        Build the implication DAG of patterns (computed once per pattern set)
+
+        Parameters
+        ----------
+        patterns : list
+            pattern graphs
+
+        Returns
+        -------
+        implications : list
+            index of the patterns contained in each pattern, a match of a pattern
+            is also a match of all patterns it contains
+
+        Notes
+        -----
+        - a pattern contains a smaller pattern if the smaller one is an induced
+          subgraph with implied nodes (node_implies) and equal bond types
+        '''
+        signatures = tuple(cls.pattern_signature(pattern)
+                           for pattern in patterns)
+        # check
+        if signatures in cls.__implications:
+            return cls.__implications[signatures]
+
+        implications = [[] for _ in patterns]
+        for i, big in enumerate(patterns):
+            for j, small in enumerate(patterns):
+                # strictly smaller patterns (no cycles)
+                if len(small) > len(big) or small.number_of_edges() > big.number_of_edges() or \
+                        (len(small), small.number_of_edges()) == (len(big), big.number_of_edges()):
+                    continue
+                matcher = nx.isomorphism.GraphMatcher(
+                    big, small, node_match=cls.node_implies,
+                    edge_match=lambda e1, e2: e1.get('type') == e2.get('type'))
+                if matcher.subgraph_is_isomorphic():
+                    implications[i].append(j)
+
+        # save
+        cls.__implications[signatures] = implications
+        # res
+        return implications
+
+    def pattern_levels(self, indexes):
+        '''
+        Group patterns by their depth in the implication DAG (contained patterns first)
+
+        Parameters
+        ----------
+        indexes : list
+            pattern index
+
+        Returns
+        -------
+        levels : list
+            lists of pattern index
+        '''
+        depth = {}
+
+        def _depth(index):
+            if index not in depth:
+                depth[index] = 1 + max((_depth(k)
+                                       for k in self.implications[index]), default=-1)
+            return depth[index]
+
+        levels = {}
+        for index in indexes:
+            levels.setdefault(_depth(index), []).append(index)
+        # res
+        return [levels[k] for k in sorted(levels)]
+
+    @staticmethod
+    def anchor_rank(symbol):
+        '''
+        Anchor rank of an element (lower is rarer)
+        '''
+        if symbol.startswith(PatternLibrary.dummy_node_pattern):
+            return len(PatternLibrary.anchor_priority) + len(PatternLibrary.common_elements) + 1
+        if symbol in PatternLibrary.anchor_priority:
+            return PatternLibrary.anchor_priority.index(symbol)
+        if symbol in PatternLibrary.common_elements:
+            return len(PatternLibrary.anchor_priority) + 1 + PatternLibrary.common_elements.index(symbol)
+        # other elements (metals, B, Si, ...)
+        return len(PatternLibrary.anchor_priority)
+
+    @classmethod
+    def compile_pattern(cls, name, index, pattern):
+        '''
+        Select the anchor atom of a pattern and its radius (rooted once per pattern)
+
+        Parameters
+        ----------
+        name : str
+            functional group name
+        index : int
+            pattern index in the functional group list
+        pattern : nx.Graph
+            pattern graph
+
+        Returns
+        -------
+        rooted : dict
+            pattern, anchor node, anchor symbol, anchor degree, anchor neighbours and radius
+        '''
+        # check
+        rooted = cls.__rooted.get(pattern)
+        if rooted is None:
+            rooted = cls.root_pattern(pattern)
+            cls.__rooted[pattern] = rooted
+
+        # res
+        return dict(rooted, pattern=pattern, function_group=name, index=index)
+
+    @classmethod
+    def root_pattern(cls, pattern):
+        '''
+        Select the anchor atom of a pattern, its neighbours and the pattern radius
+
+        Parameters
+        ----------
+        pattern : nx.Graph
+            pattern graph
+
+        Returns
+        -------
+        rooted : dict
+            anchor node, anchor symbol, anchor degree, anchor neighbours and radius
+        '''
+        # anchor: rarest element, then the highest degree
+        anchor = min(pattern.nodes, key=lambda n: (
+            PatternLibrary.anchor_rank(str(pattern.nodes[n]['symbol'])), -pattern.degree[n]))
+        anchorSymbol = str(pattern.nodes[anchor]['symbol'])
+
+        # anchor neighbours (element, bond type), dummy neighbours by bond type
+        neighbours = Counter()
+        dummyNeighbours = Counter()
+        for nbr in pattern.adj[anchor]:
+            _symbol = str(pattern.nodes[nbr]['symbol'])
+            _type = pattern.edges[anchor, nbr]['type']
+            if _symbol.startswith(cls.dummy_node_pattern):
+                dummyNeighbours[_type] += 1
+            else:
+                neighbours[(_symbol, _type)] += 1
+
+        # radius from the anchor
+        if nx.is_connected(pattern):
+            radius = max(nx.single_source_shortest_path_length(
+                pattern, anchor).values())
+        else:
+            radius = None
+
+        # res
+        return {
+            'anchor': anchor,
+            'anchor_symbol': None if anchorSymbol.startswith(cls.dummy_node_pattern) else anchorSymbol,
+            'anchor_degree': pattern.degree[anchor],
+            'neighbours': neighbours,
+            'dummy_neighbours': dummyNeighbours,
+            'radius': radius
+        }
+
+    @staticmethod
+    def neighbours_feasible(rooted, neighbours, bondTypes):
+        '''
+        Check the anchor neighbours of a pattern against the neighbours of an atom
+
+        Parameters
+        ----------
+        rooted : dict
+            rooted pattern
+        neighbours : Counter
+            (element, bond type) of the atom neighbours
+        bondTypes : Counter
+            bond types of the atom neighbours
+
+        Returns
+        -------
+        res : bool
+            False if the pattern cannot be rooted at the atom
+        '''
+        # elements
+        for key, n in rooted['neighbours'].items():
+            if n > neighbours.get(key, 0):
+                return False
+        # dummy neighbours take the remaining bonds of the same type
+        for bondType, n in rooted['dummy_neighbours'].items():
+            _used = sum(v for (_, t), v in rooted['neighbours'].items()
+                        if t == bondType)
+            if n + _used > bondTypes.get(bondType, 0):
+                return False
+        # res
+        return True
+
+    @staticmethod
+    def element_index(G):
+        '''
+        Build an element index of a graph (symbol -> node ids)
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+
+        Returns
+        -------
+        index : dict
+            symbol -> list of node ids (graph order)
+        '''
+        index = {}
+        for node, symbol in G.nodes(data='symbol'):
+            index.setdefault(str(symbol), []).append(node)
+        # res
+        return index
+
+    @staticmethod
+    def ball_graph(G, root, radius):
+        '''
+        Build the k-hop ball around a root node (bfs, induced graph)
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+        root : int
+            root node
+        radius : int
+            number of bonds
+
+        Returns
+        -------
+        H : nx.Graph
+            induced graph of nodes within radius bonds from the root
+        '''
+        # bfs
+        distance = {root: 0}
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            d = distance[node]
+            # check
+            if d >= radius:
+                continue
+            for nbr in G.adj[node]:
+                if nbr not in distance:
+                    distance[nbr] = d + 1
+                    queue.append(nbr)
+
+        # induced graph
+        H = nx.Graph()
+        H.add_nodes_from((n, G.nodes[n]) for n in distance)
+        H.add_edges_from((u, v, d) for u in distance
+                         for v, d in G.adj[u].items() if v in distance)
+        # res
+        return H
+
+    @staticmethod
+    def rooted_matcher(G, node, rooted, node_match, edge_match, node_rank):
+        '''
+        Create a matcher of a rooted pattern anchored at a node
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+        node : int
+            anchor node in the main graph
+        rooted : dict
+            rooted pattern
+        node_match : callable
+            node match function
+        edge_match : callable
+            edge match function
+        node_rank : dict
+            main graph node order
+
+        Returns
+        -------
+        matcher : ChemGraphMatcher
+            matcher, the search is restricted to the k-hop ball for large graphs
+        '''
+        # large graphs: k-hop ball (k: pattern radius from the anchor)
+        if len(G) > PatternLibrary.ball_threshold:
+            G = PatternLibrary.ball_graph(G, node, rooted['radius'])
+
+        # res
+        return ChemGraphMatcher(
+            G, rooted['pattern'], node_match=node_match, edge_match=edge_match,
+            anchor=(node, rooted['anchor']), node_rank=node_rank)
+
+    @staticmethod
+    def anchor_candidates(G, rooted, element_index):
+        '''
+        Nodes of the main graph where a rooted pattern can be anchored
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+        rooted : dict
+            rooted pattern
+        element_index : dict
+            symbol -> node ids
+
+        Returns
+        -------
+        nodes : list
+            candidate anchor nodes
+        '''
+        # dummy anchor or dummy atoms in the main graph
+        if rooted['anchor_symbol'] is None or any(
+                k.startswith(PatternLibrary.dummy_node_pattern) for k in element_index):
+            return list(G)
+        # res
+        return element_index.get(rooted['anchor_symbol'], [])
+
+    @staticmethod
+    def iter_matches(G, pattern, node_match, edge_match, element_index=None, node_rank=None):
+        '''
+        Enumerate the mappings of a pattern seeded from its anchor atoms
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+        pattern : nx.Graph
+            pattern graph
+        node_match : callable
+            node match function
+        edge_match : callable
+            edge match function
+        element_index : dict
+            symbol -> node ids (built if not provided)
+        node_rank : dict
+            main graph node order (built if not provided)
+
+        Yields
+        ------
+        mapping : dict
+            main graph node -> pattern node (the same as subgraph_isomorphisms_iter)
+        '''
+        rooted = PatternLibrary.compile_pattern(None, 0, pattern)
+
+        # disconnected pattern (whole graph)
+        if rooted['radius'] is None:
+            yield from ChemGraphMatcher(
+                G, pattern, node_match=node_match, edge_match=edge_match).subgraph_isomorphisms_iter()
+            return
+
+        # check
+        if element_index is None:
+            element_index = PatternLibrary.element_index(G)
+        if node_rank is None:
+            node_rank = {n: i for i, n in enumerate(G)}
+
+        # anchors
+        for node in PatternLibrary.anchor_candidates(G, rooted, element_index):
+            # check
+            if rooted['anchor_degree'] > G.degree[node]:
+                continue
+            matcher = PatternLibrary.rooted_matcher(
+                G, node, rooted, node_match, edge_match, node_rank)
+            yield from matcher.subgraph_isomorphisms_iter()
+
+    @staticmethod
+    def mapping_key(G, mapping, pattern):
+        '''
+        Unique key of a mapping and the number of explicit occurrences it stands for
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+        mapping : dict
+            main graph node -> pattern node
+        pattern : nx.Graph
+            pattern graph
+
+        Returns
+        -------
+        key : tuple
+            (sorted node ids, sorted (node id, implicit hydrogens))
+        weight : int
+            number of hydrogen choices (1 for explicit patterns)
+
+        Notes
+        -----
+        - a node taking r implicit hydrogens out of h_count gives C(h_count, r)
+          explicit node sets
+        '''
+        hydrogens = []
+        weight = 1
+        for node, patternNode in mapping.items():
+            _n = pattern.nodes[patternNode].get('implicit_h', 0)
+            if _n:
+                hydrogens.append((node, _n))
+                weight *= comb(G.nodes[node]['h_count'], _n)
+        # res
+        return (tuple(sorted(mapping)), tuple(sorted(hydrogens))), weight
+
+    def match(self, G, function_groups, node_match, edge_match, count=False, stats=None,
+              element_index=None, incomplete_groups=None):
+        '''
+        Check/count functional groups in a single traversal of the main graph
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+        function_groups : list[str]
+            functional group names
+        node_match : callable
+            node match function
+        edge_match : callable
+            edge match function
+        count : bool
+            count unique occurrences (default False: stop at the first one)
+        stats : dict
+            matcher stats to update (patterns, matcher calls, skipped)
+        element_index : dict
+            symbol -> node ids (built if not provided)
+        incomplete_groups : dict
+            updated with functional group name -> status ('timed_out' or
+            'cancelled') of groups stopped by the match budget
+
+        Returns
+        -------
+        res : dict
+            functional group name -> number of unique occurrences
+            (1/0 in check mode)
+
+        Notes
+        -----
+        - patterns are matched by levels of the implication DAG (contained
+          patterns first), a pattern containing an absent pattern is skipped
+        - results of incomplete groups are lower bounds (partial counts)
+        '''
+        # single partition
+        partial = self.match_partial(
+            G, function_groups, node_match, edge_match, count=count, stats=stats,
+            element_index=element_index)
+        # res
+        return self.merge_partial(function_groups, [partial], count=count,
+                                  incomplete_groups=incomplete_groups)
+
+    def match_partial(self, G, function_groups, node_match, edge_match, count=False,
+                      stats=None, element_index=None, partition=None):
+        '''
+        Match functional groups anchored at a partition of the main graph atoms
+
+        Parameters
+        ----------
+        G : nx.Graph
+            main graph
+        function_groups : list[str]
+            functional group names
+        node_match : callable
+            node match function
+        edge_match : callable
+            edge match function
+        count : bool
+            count unique occurrences (default False: stop at the first one)
+        stats : dict
+            matcher stats to update (patterns, matcher calls, skipped)
+        element_index : dict
+            symbol -> node ids (built if not provided)
+        partition : tuple
+            (k, n), only anchor atoms with node order % n == k are visited
+            (default None: all atoms)
+
+        Returns
+        -------
+        partial : dict
+            seen (pattern index -> unique keys), found (groups), state
+            (pattern index -> found/absent), timed_out (pattern index) and
+            stopped (budget status), merged by merge_partial
+
+        Notes
+        -----
+        - an absent pattern in a partition can be found in another one, the
+          implication DAG then only skips patterns rejected by invariants
+        '''
+        # main graph invariants
+        invariantG = GraphInvariant.of(G)
+        # dummy atoms in the main graph match any anchor
+        dummyGraph = invariantG.dummy_numbers > 0
+        # node order (symmetry-breaking constraints)
+        nodeRank = {n: i for i, n in enumerate(G)}
+        # anchor atoms (element index)
+        if element_index is None:
+            element_index = PatternLibrary.element_index(G)
+
+        # requested functional groups of each unique pattern (aliases)
+        owners = {}
+        for name in dict.fromkeys(function_groups):
+            for index in self.group_patterns[name]:
+                owners.setdefault(index, []).append(name)
+
+        # unique node sets of each pattern (count mode)
+        seen = {index: {} for index in owners}
+        # found groups (check mode)
+        found = set()
+        # pattern state (True: found, False: absent)
+        state = {}
+        # patterns stopped by the pattern budget
+        timedOut = set()
+        # call stopped by the budget (status)
+        stopped = None
+
+        try:
+            # implication levels
+            for level in self.pattern_levels(owners):
+                # active rooted patterns (each unique pattern is matched once)
+                active = []
+                for index in level:
+                    rooted = self.patterns[index]
+                    # stats
+                    if stats is not None:
+                        stats['patterns'] += 1
+                    # contained patterns and invariants
+                    if any(state.get(k) is False for k in self.implications[index]) or \
+                            not invariantG.contains(GraphInvariant.of(rooted['pattern'])):
+                        state[index] = False
+                        if stats is not None:
+                            stats['skipped'] += 1
+                        continue
+                    active.append(rooted)
+
+                # check
+                if not active:
+                    continue
+
+                # match
+                matched, incomplete = self.__match_patterns(
+                    G, active, owners, node_match, edge_match, count, stats,
+                    element_index, nodeRank, dummyGraph, found, seen, timedOut,
+                    partition)
+
+                # update state (unknown for stopped patterns)
+                for rooted in active:
+                    index = rooted['pattern_index']
+                    if index in timedOut:
+                        continue
+                    if index in matched:
+                        state[index] = True
+                    elif index not in incomplete and partition is None:
+                        state[index] = False
+        except MatchTimeout as e:
+            # call budget exhausted or cancelled (partial results)
+            stopped = e.status
+
+        # res
+        return {
+            'seen': seen,
+            'found': found,
+            'state': state,
+            'timed_out': timedOut,
+            'stopped': stopped
+        }
+
+    def merge_partial(self, function_groups, partials, count=False, incomplete_groups=None):
+        '''
+        Merge partial matches (partitions) and fan out to the functional groups
+
+        Parameters
+        ----------
+        function_groups : list[str]
+            functional group names
+        partials : list[dict]
+            results of match_partial
+        count : bool
+            count unique occurrences (default False)
+        incomplete_groups : dict
+            updated with functional group name -> status of stopped groups
+
+        Returns
+        -------
+        res : dict
+            functional group name -> number of unique occurrences
+            (1/0 in check mode)
+
+        Notes
+        -----
+        - unique keys are merged (an occurrence found in several partitions
+          is counted once), the result does not depend on the partition order
+        '''
+        seen = {}
+        found = set()
+        timedOut = set()
+        stopped = None
+        resolved = None
+        for partial in partials:
+            for index, _seen in partial['seen'].items():
+                seen.setdefault(index, {}).update(_seen)
+            found.update(partial['found'])
+            timedOut.update(partial['timed_out'])
+            stopped = stopped or partial['stopped']
+            # resolved in all partitions
+            _resolved = set(partial['state'])
+            resolved = _resolved if resolved is None else resolved & _resolved
+        resolved = resolved or set()
+
+        # fan out to the functional groups
+        res = {}
+        for name in dict.fromkeys(function_groups):
+            if count:
+                # unique node sets of all patterns of the group
+                _seen = {}
+                for index in self.group_patterns[name]:
+                    _seen.update(seen.get(index, {}))
+                res[name] = sum(_seen.values())
+            else:
+                res[name] = int(name in found)
+
+            # incomplete groups (all patterns must be resolved)
+            if incomplete_groups is not None and not (not count and name in found):
+                _indexes = self.group_patterns[name]
+                if any(k in timedOut for k in _indexes):
+                    incomplete_groups[name] = stopped or 'timed_out'
+                elif stopped is not None and any(k not in resolved for k in _indexes):
+                    incomplete_groups[name] = stopped
+
+        # res
+        return res
+
+    def __match_patterns(self, G, active, owners, node_match, edge_match, count, stats,
+                         element_index, nodeRank, dummyGraph, found, seen, timedOut,
+                         partition=None):
+        '''
+        Match rooted patterns in a single traversal of the anchor atoms
+
+        hint:
+            a pattern exceeding the pattern budget is added to timedOut and
+            skipped at the remaining atoms
+
+        Returns
+        -------
+        matched : set
+            pattern index of found patterns
+        incomplete : set
+            pattern index of patterns skipped at some atoms (check mode, all
+            their groups found by other patterns)
+        '''
+        anchorIndex = {}
+        dummyPatterns = []
+        disconnected = []
+        for rooted in active:
+            # check
+            if rooted['radius'] is None:
+                disconnected.append(rooted)
+            elif rooted['anchor_symbol'] is None or dummyGraph:
+                dummyPatterns.append(rooted)
+            else:
+                anchorIndex.setdefault(
+                    rooted['anchor_symbol'], []).append(rooted)
+
+        matched = set()
+        incomplete = set()
+
+        # anchor atoms
+        if dummyPatterns:
+            anchorNodes = list(G)
+        else:
+            anchorNodes = [
+                n for symbol in anchorIndex for n in element_index.get(symbol, [])]
+        # partition (disconnected patterns in the first one)
+        if partition is not None:
+            k, n = partition
+            anchorNodes = [
+                node for node in anchorNodes if nodeRank[node] % n == k]
+            if k != 0:
+                disconnected = []
+
+        # single traversal of anchor atoms
+        for node in anchorNodes:
+            # rooted patterns of this atom
+            _patterns = anchorIndex.get(str(G.nodes[node]['symbol']), [])
+            if dummyPatterns:
+                _patterns = _patterns + dummyPatterns
+            if not _patterns:
+                continue
+
+            # neighbourhood (walked once for all patterns)
+            _degree = G.degree[node]
+            _neighbours = Counter()
+            _bondTypes = Counter()
+            for nbr, edge in G.adj[node].items():
+                _neighbours[(str(G.nodes[nbr]['symbol']), edge['type'])] += 1
+                _bondTypes[edge['type']] += 1
+
+            for rooted in _patterns:
+                index = rooted['pattern_index']
+                # check
+                if index in timedOut:
+                    continue
+                if not count and found.issuperset(owners[index]):
+                    if index not in matched:
+                        incomplete.add(index)
+                    continue
+                if rooted['anchor_degree'] > _degree:
+                    continue
+                if not dummyGraph and not PatternLibrary.neighbours_feasible(
+                        rooted, _neighbours, _bondTypes):
+                    continue
+
+                # rooted matcher (the search grows from the anchor)
+                if stats is not None:
+                    stats['matcher_calls'] += 1
+                matcher = PatternLibrary.rooted_matcher(
+                    G, node, rooted, node_match, edge_match, nodeRank)
+
+                try:
+                    # check (the result is shared by all aliases)
+                    if not count:
+                        if matcher.subgraph_is_isomorphic():
+                            found.update(owners[index])
+                            matched.add(index)
+                        continue
+
+                    # unique node sets
+                    for subgraph in matcher.subgraph_isomorphisms_iter():
+                        key, weight = PatternLibrary.mapping_key(
+                            G, subgraph, rooted['pattern'])
+                        seen[index][key] = weight
+                        matched.add(index)
+                except MatchTimeout as e:
+                    # pattern budget (other patterns go on)
+                    if e.scope != 'pattern':
+                        raise
+                    timedOut.add(index)
+
+        # disconnected patterns (whole graph)
+        for rooted in disconnected:
+            index = rooted['pattern_index']
+            if not count and found.issuperset(owners[index]):
+                incomplete.add(index)
+                continue
+            if stats is not None:
+                stats['matcher_calls'] += 1
+            matcher = ChemGraphMatcher(
+                G, rooted['pattern'], node_match=node_match, edge_match=edge_match)
+            try:
+                if not count:
+                    if matcher.subgraph_is_isomorphic():
+                        found.update(owners[index])
+                        matched.add(index)
+                    continue
+                for subgraph in matcher.subgraph_isomorphisms_iter():
+                    key, weight = PatternLibrary.mapping_key(
+                        G, subgraph, rooted['pattern'])
+                    seen[index][key] = weight
+                    matched.add(index)
+            except MatchTimeout as e:
+                if e.scope != 'pattern':
+                    raise
+                timedOut.add(index)
+
+        # res
+        return matched, incomplete
@@ -0,0 +1,285 @@
+# SCREEN
+# -------
+
+# import packages/modules
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+# local
+from .molparser import MolParser
+from .compound import Compound
+from .netwrok import Network
+from .customchemgraph import CustomChemGraph
+
+
+class ScreenResult():
+    '''
+    Compounds x functional groups count matrix of a screen
+
+    hint:
+        row ids are stable (source order), rows of compounds which cannot be
+        parsed/matched are kept with zero counts and listed in errors
+    '''
+
+    def __init__(self, counts, row_ids, groups, errors):
+        # count matrix (np.ndarray or scipy csr matrix)
+        self.counts = counts
+        # row ids (file:record or source index)
+        self.row_ids = row_ids
+        # functional group names (columns)
+        self.groups = groups
+        # row id -> error message
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def __str__(self):
+        return f"ScreenResult({len(self.row_ids)} compounds x {len(self.groups)} functional groups, {len(self.errors)} errors)"
+
+    def to_dataframe(self):
+        '''
+        Count matrix as a dataframe (index: row ids, columns: functional groups)
+        '''
+        counts = self.counts.toarray() if sp.issparse(self.counts) else self.counts
+        return pd.DataFrame(counts, index=self.row_ids, columns=self.groups)
+
+
+class Screen():
+    '''
+    Functional group screening of many compounds (compound libraries)
+
+    hint:
+        compounds are streamed in chunks through a process pool, each worker
+        compiles the functional group patterns once and shares them with all
+        its compounds, results are collected in source order
+    '''
+    # file formats (directory sources)
+    file_formats = ('.sdf', '.json', '.gjf', '.com')
+    # chunks in flight per worker (bounded memory)
+    chunks_per_worker = 2
+
+    @staticmethod
+    def iter_source(source):
+        '''
+        Enumerate the compounds of a source
+
+        Parameters
+        ----------
+        source : str | Path | iterable
+            multi-record sdf file, directory (sorted files) or an iterable of
+            compounds, file paths or sdf strings
+
+        Yields
+        ------
+        row_id : str
+            stable row id (file:record or source index)
+        item : Compound | str
+            compound, file path or sdf content
+        '''
+        # file/directory
+        if isinstance(source, (str, Path)) and os.path.exists(source):
+            if os.path.isdir(source):
+                files = sorted(
+                    str(p) for p in Path(source).iterdir()
+                    if p.is_file() and p.suffix.lower() in Screen.file_formats)
+            else:
+                files = [str(source)]
+            for f in files:
+                # multi-record sdf
+                if f.lower().endswith('.sdf'):
+                    for k, record in enumerate(MolParser.sdf_records(f)):
+                        yield f"{f}:{k}", record
+                else:
+                    yield f"{f}:0", f
+            return
+
+        # check
+        if isinstance(source, (str, Path)):
+            raise Exception("source is not a file/directory!")
+
+        # iterable
+        for i, item in enumerate(source):
+            yield str(i), item
+
+    @staticmethod
+    def load(item):
+        '''
+        Create a compound of an item (compound, file path or sdf content)
+        '''
+        # check
+        if isinstance(item, Compound):
+            return item
+        if isinstance(item, (str, Path)) and os.path.exists(item):
+            return Compound(MolParser(item).read_file())
+        if isinstance(item, str):
+            return Compound(MolParser(None).sdf_parser(item))
+        raise Exception("invalid compound!")
+
+    @staticmethod
+    def count(comp, functional_groups, implicit_h=False):
+        '''
+        Count functional groups of a compound (compiled built-in patterns are
+        shared by the compounds of a process)
+
+        Returns
+        -------
+        res : dict
+            functional group name -> count
+        '''
+        res = comp.check_functional_groups(
+            list(functional_groups), count_functional_group=True, implicit_h=implicit_h)
+        return {x['function_group']: x['count'] for x in res}
+
+    @staticmethod
+    def match_chunk(chunk, functional_groups, implicit_h=False):
+        '''
+        Count functional groups of a chunk of compounds
+
+        Parameters
+        ----------
+        chunk : list
+            (row id, item)
+
+        Returns
+        -------
+        res : list
+            (row id, counts, error message)
+        '''
+        res = []
+        for rowId, item in chunk:
+            try:
+                res.append((rowId, Screen.count(
+                    Screen.load(item), functional_groups, implicit_h), None))
+            except Exception as e:
+                res.append((rowId, {}, str(e)))
+        return res
+
+    @staticmethod
+    def chunks(source, chunk_size):
+        '''
+        Split a source into chunks of (row id, item)
+        '''
+        chunk = []
+        for rowId, item in Screen.iter_source(source):
+            chunk.append((rowId, item))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def group_names(functional_groups):
+        '''
+        Names of the functional groups of a screen (columns)
+
+        Parameters
+        ----------
+        functional_groups : list
+            functional group names and CustomChemGraph objects (default all built-in groups)
+
+        Returns
+        -------
+        names : list
+            built-in names (unknown names are skipped) and custom names, in order
+        '''
+        builtin = Network.builtin_function_groups()
+        # check
+        if len(functional_groups) == 0:
+            return list(builtin)
+
+        names = []
+        for item in functional_groups:
+            if isinstance(item, str):
+                if item in builtin:
+                    names.append(item)
+            elif isinstance(item, CustomChemGraph):
+                for custom_functional_group in item.custom_functional_groups:
+                    names.extend(custom_functional_group.keys())
+        # res
+        return list(dict.fromkeys(names))
+
+    @staticmethod
+    def run(source, functional_groups=[], workers=None, chunk_size=64,
+            implicit_h=False, sparse=False):
+        '''
+        Screen compounds against functional groups
+
+        Parameters
+        ----------
+        source : str | Path | iterable
+            multi-record sdf file, directory or an iterable of compounds
+        functional_groups : list
+            functional group names and CustomChemGraph objects (default all built-in groups)
+        workers : int
+            number of worker processes (default None: this process)
+        chunk_size : int
+            compounds per task (default 64)
+        implicit_h : bool
+            match on hydrogen-suppressed graphs (default False)
+        sparse : bool
+            return a scipy csr matrix (default False: np.ndarray)
+
+        Returns
+        -------
+        res : ScreenResult
+            compounds x functional groups count matrix
+        '''
+        # check
+        if chunk_size < 1:
+            raise Exception("chunk_size must be a positive number!")
+
+        rowIds = []
+        errors = {}
+        # columns (requested order)
+        groups = {name: j for j, name in enumerate(
+            Screen.group_names(functional_groups))}
+        rows, cols, vals = [], [], []
+
+        def _collect(results):
+            for rowId, counts, error in results:
+                i = len(rowIds)
+                rowIds.append(rowId)
+                if error is not None:
+                    errors[rowId] = error
+                for name, n in counts.items():
+                    j = groups.setdefault(name, len(groups))
+                    if n:
+                        rows.append(i)
+                        cols.append(j)
+                        vals.append(n)
+
+        chunks = Screen.chunks(source, chunk_size)
+        if workers is None or workers <= 1:
+            # this process
+            for chunk in chunks:
+                _collect(Screen.match_chunk(
+                    chunk, functional_groups, implicit_h))
+        else:
+            # process pool (a bounded window of chunks, source order)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                window = deque()
+                for chunk in chunks:
+                    window.append(pool.submit(
+                        Screen.match_chunk, chunk, functional_groups, implicit_h))
+                    if len(window) >= workers * Screen.chunks_per_worker:
+                        _collect(window.popleft().result())
+                while window:
+                    _collect(window.popleft().result())
+
+        # count matrix
+        shape = (len(rowIds), len(groups))
+        counts = sp.csr_matrix(
+            (np.asarray(vals, dtype=np.int64), (np.asarray(rows, dtype=np.int64),
+                                                np.asarray(cols, dtype=np.int64))),
+            shape=shape, dtype=np.int64)
+        if not sparse:
+            counts = counts.toarray()
+
+        # res
+        return ScreenResult(counts, rowIds, list(groups), errors)
@@ -4,6 +4,9 @@
 # import libs
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.spatial import cKDTree
+# internals
+from ..config import COVALENT_RADII
 
 
 class Structure():
@@ -70,6 +73,33 @@ class Structure():
 
         return objectBaseCoordinate
 
+    @staticmethod
+    def BatchCenterPoints(xyzFrames):
+        '''
+        Find the center coordination of a stack of objects (conformers/frames)
+
+        Parameters
+        ----------
+        xyzFrames : np.ndarray
+            xyz points (n_frames, n_atoms, 3)
+
+        Returns
+        -------
+        objectBaseCoordinates : np.ndarray
+            center coordination of each object (n_frames, 3)
+        '''
+        # set
+        xyzFrames = np.asarray(xyzFrames)
+        # the highest/lowest xyz
+        xyzMax = np.max(xyzFrames, axis=1)
+        xyzMin = np.min(xyzFrames, axis=1)
+        # the same rule as CenterPoints
+        xyzLen = np.abs(xyzMax - xyzMin)
+        objectBaseCoordinates = np.where(
+            np.abs(xyzMax) != np.abs(xyzMin), xyzMin + (xyzLen/2), 0.0)
+
+        return objectBaseCoordinates
+
     @staticmethod
     def CenterObject(xyzList, centerPoint):
         '''
@@ -273,3 +303,50 @@ class Structure():
             return elList
         except Exception as e:
             raise Exception(f"fail to create formula: {e}")
+
+    @staticmethod
+    def perceive_bonds(atom_elements, xyzList, tolerance=0.45):
+        '''
+        find bonds using covalent radii (all bonds are set as single bonds)
+
+        Parameters
+        ----------
+        atom_elements : list
+            atom symbols such as ['C','H','H','H','H']
+        xyzList : list
+            list of xyz points
+        tolerance : float
+            bond length tolerance [angstrom] (default 0.45)
+
+        Returns
+        -------
+        bondMatrix : np.ndarray
+            bond list [atom1 id, atom2 id, bond type], ids start from 1
+        '''
+        # set
+        xyzList = np.array(xyzList, dtype=np.float64)
+        # radii
+        radii = np.array([COVALENT_RADII.get(str(i).strip(), 1.5)
+                         for i in atom_elements])
+        # candidate pairs
+        tree = cKDTree(xyzList)
+        pairs = tree.query_pairs(
+            r=2*radii.max() + tolerance, output_type='ndarray')
+        # check
+        if len(pairs) == 0:
+            return np.zeros((0, 3), dtype='i')
+
+        # bond length
+        lengths = np.linalg.norm(
+            xyzList[pairs[:, 0]] - xyzList[pairs[:, 1]], axis=1)
+        # max bond length
+        maxLengths = radii[pairs[:, 0]] + radii[pairs[:, 1]] + tolerance
+        # filter
+        pairs = pairs[(lengths <= maxLengths) & (lengths > 0.4)]
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+        # bond matrix
+        bondMatrix = np.ones((len(pairs), 3), dtype='i')
+        bondMatrix[:, 0:2] = pairs + 1
+
+        return bondMatrix
@@ -0,0 +1,509 @@
+# SUBSTRUCTURE INDEX
+# -------------------
+
+# import packages/modules
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import networkx as nx
+# local
+from .molparser import MolParser
+from .compactgraph import CompactGraph
+from .customchemgraph import CustomChemGraph
+from .fingerprint import Fingerprint
+from .screen import Screen
+
+
+class SubstructureIndex():
+    '''
+    Feature bitsets of a compound library screening substructure queries
+
+    hint:
+        every feature of a compound is a necessary condition of a pattern
+        (element counts, maximum degree/hydrogens per element, ring flags and
+        element/bond-order paths), a query pattern is reduced to the features
+        it requires and only compounds having all of them are matched exactly,
+        hash collisions only add candidates (no match is lost)
+    '''
+    # dummy node pattern (matches any element)
+    dummy_node_pattern = "XX"
+    # element count thresholds
+    count_thresholds = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32)
+    # ring constraints of pattern nodes
+    ring_keys = ('in_ring', 'ring_count', 'ring_size')
+    # features of functional groups found by ring perception
+    lookup_features = {
+        'arene': ('e|C|1', 'r|aromatic'),
+        'aromatic CH bond (sp2)': ('e|C|1', 'e|H|1', 'r|aromatic')
+    }
+    # rows screened at once
+    chunk_size = 65536
+
+    def __init__(self, n_bits=2048, path_length=5):
+        # check
+        if n_bits < 64 or n_bits % 64 != 0:
+            raise Exception("n_bits must be a positive multiple of 64!")
+        # settings
+        self.n_bits = n_bits
+        self.path_length = path_length
+        # row ids (file:record or source index)
+        self.row_ids = []
+        # row items of iterable sources (None: file record of the row id)
+        self.items = []
+        # row id -> error message
+        self.errors = {}
+        # feature bitsets (appended blocks, joined on search)
+        self.__blocks = []
+        self.__features = np.zeros((0, n_bits // 64), dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def __str__(self):
+        return f"SubstructureIndex({len(self.row_ids)} compounds, {self.n_bits} bits)"
+
+    @property
+    def features(self):
+        '''
+        Feature bitsets (rows x words)
+        '''
+        if self.__blocks:
+            self.__features = np.vstack([self.__features] + self.__blocks)
+            self.__blocks = []
+        return self.__features
+
+    @staticmethod
+    def builtin_groups():
+        '''
+        Built-in functional groups (name -> graphs)
+        '''
+        # local
+        from .netwrok import Network
+
+        return Network.builtin_function_groups()
+
+    @staticmethod
+    def count_features(prefix, counts, thresholds):
+        '''
+        Threshold features of counts (prefix|key|threshold for thresholds <= count)
+        '''
+        return {f"{prefix}|{key}|{t}" for key, n in counts.items()
+                for t in thresholds if t <= n}
+
+    @staticmethod
+    def compound_features(comp, path_length):
+        '''
+        Features of a compound (explicit hydrogens)
+
+        Parameters
+        ----------
+        comp : Compound
+            compound
+        path_length : int
+            maximum path length (bonds)
+
+        Returns
+        -------
+        features : set
+            feature labels, None if the compound has dummy atoms (matches any pattern)
+        '''
+        compact = comp.create_compact_graph(implicit_h=False)
+        symbols = compact.symbols
+        # check
+        if any(s.startswith(SubstructureIndex.dummy_node_pattern) for s in symbols):
+            return None
+        atomEnv = comp.atom_environment
+
+        # element counts
+        features = SubstructureIndex.count_features(
+            'e', Counter(symbols), SubstructureIndex.count_thresholds)
+
+        # maximum degree/hydrogens per element
+        maxDegree = {}
+        maxHydrogens = {}
+        for s, d, h in zip(symbols, compact.degree.tolist(), atomEnv['h_count'].tolist()):
+            maxDegree[s] = max(maxDegree.get(s, 0), d)
+            maxHydrogens[s] = max(maxHydrogens.get(s, 0), h)
+        features |= SubstructureIndex.count_features(
+            'd', maxDegree, range(1, max(maxDegree.values(), default=0) + 1))
+        features |= SubstructureIndex.count_features(
+            'h', maxHydrogens, range(1, max(maxHydrogens.values(), default=0) + 1))
+
+        # ring flags
+        if len(atomEnv['rings']) > 0 or np.any(atomEnv['in_ring']):
+            features.add('r|ring')
+        if len(atomEnv['aromatic_rings']) > 0 or np.any(atomEnv['aromatic']):
+            features.add('r|aromatic')
+
+        # paths
+        features |= {f"p|{label}" for label in Fingerprint.path_features(
+            compact, path_length)}
+
+        # res
+        return features
+
+    @staticmethod
+    def pattern_features(pattern, path_length):
+        '''
+        Features required by a pattern (dummy nodes match any atom)
+
+        Parameters
+        ----------
+        pattern : nx.Graph
+            functional group pattern
+        path_length : int
+            maximum path length (bonds)
+
+        Returns
+        -------
+        features : set
+            feature labels
+        '''
+        nodes = list(pattern.nodes)
+        symbols = [str(pattern.nodes[n]['symbol']).strip() for n in nodes]
+        concrete = [not s.startswith(SubstructureIndex.dummy_node_pattern)
+                    for s in symbols]
+
+        # element counts (the largest threshold)
+        features = set()
+        for s, n in Counter(s for s, c in zip(symbols, concrete) if c).items():
+            features.add(
+                f"e|{s}|{max(t for t in SubstructureIndex.count_thresholds if t <= n)}")
+
+        # degree/hydrogens of pattern nodes (graph and constraints)
+        for n, s, c in zip(nodes, symbols, concrete):
+            # check
+            if not c:
+                continue
+            attrs = pattern.nodes[n]
+            _degree = max(pattern.degree[n], attrs.get('degree', 0) or 0,
+                          attrs.get('degree_min', 0) or 0)
+            _hydrogens = max(sum(1 for m in pattern.adj[n] if str(pattern.nodes[m]['symbol']).strip() == 'H'),
+                             attrs.get('h_count', 0) or 0, attrs.get('h_count_min', 0) or 0)
+            if _degree > 0:
+                features.add(f"d|{s}|{int(_degree)}")
+            if _hydrogens > 0:
+                features.add(f"h|{s}|{int(_hydrogens)}")
+
+        # ring flags (pattern cycles and ring/aromatic constraints)
+        if pattern.number_of_edges() > pattern.number_of_nodes() - nx.number_connected_components(pattern) or \
+                any(pattern.nodes[n].get(k) or pattern.nodes[n].get(k + '_min')
+                    for n in nodes for k in SubstructureIndex.ring_keys):
+            features.add('r|ring')
+        if any(pattern.nodes[n].get('aromatic') for n in nodes):
+            features.add('r|aromatic')
+
+        # paths (concrete nodes only)
+        position = {n: i for i, n in enumerate(nodes)}
+        edges = list(pattern.edges(data='type'))
+        compact = CompactGraph(
+            symbols, [position[u] for u, _, _ in edges], [position[v] for _, v, _ in edges],
+            [int(t) for _, _, t in edges], keep=concrete)
+        features |= {f"p|{label}" for label in Fingerprint.path_features(
+            compact, path_length)}
+
+        # res
+        return features
+
+    def query_features(self, query):
+        '''
+        Feature bitsets required by a query
+
+        Parameters
+        ----------
+        query : str | CustomChemGraph | list
+            built-in functional group names and custom functional groups
+
+        Returns
+        -------
+        res : dict
+            functional group name -> alternative bitsets (a compound is a
+            candidate if it has all bits of one of them)
+        '''
+        items = query if isinstance(query, (list, tuple)) else [query]
+        builtin = SubstructureIndex.builtin_groups()
+
+        res = {}
+        for item in items:
+            if isinstance(item, str):
+                # check
+                if item in SubstructureIndex.lookup_features:
+                    alternatives = [set(SubstructureIndex.lookup_features[item])]
+                elif item in builtin:
+                    alternatives = [SubstructureIndex.pattern_features(
+                        g, self.path_length) for g in builtin[item]]
+                else:
+                    raise Exception(f"functional group {item} is not found!")
+                res[item] = alternatives
+            elif isinstance(item, CustomChemGraph):
+                for custom_functional_group in item.custom_functional_groups:
+                    for key, value in custom_functional_group.items():
+                        if isinstance(value, nx.Graph):
+                            res[key] = [SubstructureIndex.pattern_features(
+                                value, self.path_length)]
+                        else:
+                            # group and subgroup (both are found in the compound)
+                            res[key] = [set().union(*(SubstructureIndex.pattern_features(
+                                g, self.path_length) for g in value))]
+            else:
+                raise Exception("query must be functional group names or CustomChemGraph!")
+
+        # res
+        return {name: [Fingerprint.fold((Fingerprint.feature_hash(f) for f in features), self.n_bits)
+                       for features in alternatives]
+                for name, alternatives in res.items()}
+
+    def add(self, row_id, features, item=None):
+        '''
+        Add the features of a compound
+
+        Parameters
+        ----------
+        row_id : str
+            row id
+        features : np.ndarray
+            feature bitset (n_bits / 64 words)
+        item : str | Compound
+            row item (default None: the file record of the row id)
+        '''
+        features = np.asarray(features, dtype=np.uint64)
+        # check
+        if features.shape != (self.n_bits // 64,):
+            raise Exception("feature bitset size does not match the index!")
+        self.row_ids.append(str(row_id))
+        self.items.append(item)
+        self.__blocks.append(features[None, :])
+
+    def extend(self, source, workers=None, chunk_size=64):
+        '''
+        Add the compounds of a source (see Screen.iter_source)
+
+        Parameters
+        ----------
+        source : str | Path | iterable
+            multi-record sdf file, directory or an iterable of compounds
+        workers : int
+            number of worker processes (default None: this process)
+        chunk_size : int
+            compounds per task (default 64)
+
+        Returns
+        -------
+        self : SubstructureIndex
+            index
+        '''
+        # check
+        if chunk_size < 1:
+            raise Exception("chunk_size must be a positive number!")
+        # file rows (records are read again from the file)
+        fileSource = not isinstance(source, (list, tuple)) and \
+            isinstance(source, (str, os.PathLike)) and os.path.exists(source)
+
+        def _collect(chunk, results):
+            for (rowId, item), (features, error) in zip(chunk, results):
+                if error is not None:
+                    self.errors[rowId] = error
+                    # no features (never a candidate)
+                    features = np.zeros(self.n_bits // 64, dtype=np.uint64)
+                self.add(rowId, features, None if fileSource else item)
+
+        chunks = Screen.chunks(source, chunk_size)
+        settings = (self.n_bits, self.path_length)
+        if workers is None or workers <= 1:
+            # this process
+            for chunk in chunks:
+                _collect(chunk, _feature_chunk(chunk, settings))
+        else:
+            # process pool (a bounded window of chunks, source order)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                window = deque()
+                for chunk in chunks:
+                    window.append((chunk, pool.submit(
+                        _feature_chunk, chunk, settings)))
+                    if len(window) >= workers * Screen.chunks_per_worker:
+                        _chunk, _future = window.popleft()
+                        _collect(_chunk, _future.result())
+                while window:
+                    _chunk, _future = window.popleft()
+                    _collect(_chunk, _future.result())
+
+        # res
+        return self
+
+    def candidates(self, query):
+        '''
+        Screen the index (compounds which can match a query)
+
+        Parameters
+        ----------
+        query : str | CustomChemGraph | list
+            built-in functional group names and custom functional groups
+
+        Returns
+        -------
+        res : dict
+            functional group name -> candidate row indices
+        '''
+        features = self.features
+        res = {}
+        for name, alternatives in self.query_features(query).items():
+            rows = []
+            for start in range(0, len(features), self.chunk_size):
+                _block = features[start:start + self.chunk_size]
+                _mask = np.zeros(len(_block), dtype=bool)
+                for bits in alternatives:
+                    _mask |= ((_block & bits) == bits).all(axis=1)
+                rows.append(np.flatnonzero(_mask) + start)
+            res[name] = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        # res
+        return res
+
+    def load_compounds(self, rows):
+        '''
+        Load the compounds of rows (each file is read once)
+
+        Parameters
+        ----------
+        rows : list[int]
+            row indices
+
+        Yields
+        ------
+        row : int
+            row index
+        compound : Compound
+            compound
+        '''
+        # file records (path -> record -> row)
+        files = {}
+        for row in sorted(rows):
+            item = self.items[row]
+            if item is not None:
+                yield row, Screen.load(item)
+                continue
+            # check
+            path, _, record = self.row_ids[row].rpartition(':')
+            if not path or not os.path.exists(path):
+                raise Exception(
+                    f"compound of row {self.row_ids[row]} is not available!")
+            files.setdefault(path, {})[int(record)] = row
+
+        for path, records in files.items():
+            # check
+            if not path.lower().endswith('.sdf'):
+                for row in records.values():
+                    yield row, Screen.load(path)
+                continue
+            last = max(records)
+            for k, record in enumerate(MolParser.sdf_records(path)):
+                if k in records:
+                    yield records[k], Screen.load(record)
+                if k >= last:
+                    break
+
+    def search(self, query):
+        '''
+        Find compounds containing functional groups (screen, then exact match)
+
+        Parameters
+        ----------
+        query : str | CustomChemGraph | list
+            built-in functional group names and custom functional groups
+
+        Returns
+        -------
+        res : list[dict]
+            function_group, row_ids (matched compounds, row order) and
+            candidates (number of compounds matched exactly)
+        '''
+        candidates = self.candidates(query)
+        items = query if isinstance(query, (list, tuple)) else [query]
+
+        # functional groups of each candidate
+        rowGroups = {}
+        for name, rows in candidates.items():
+            for row in rows.tolist():
+                rowGroups.setdefault(row, set()).add(name)
+
+        # exact match (survivors only)
+        matched = {name: [] for name in candidates}
+        for row, comp in self.load_compounds(list(rowGroups)):
+            _groups = rowGroups[row]
+            _items = [item for item in items if not isinstance(item, str) or item in _groups]
+            for x in comp.check_functional_groups(_items):
+                if x['function_group'] in _groups and x['result']:
+                    matched[x['function_group']].append(row)
+
+        # res
+        return [{'function_group': name,
+                 'row_ids': [self.row_ids[row] for row in sorted(matched[name])],
+                 'candidates': len(candidates[name])}
+                for name in candidates]
+
+    def save(self, file_path):
+        '''
+        Save the index (npz), items of iterable sources are saved if they are
+        file paths or sdf contents
+        '''
+        items = []
+        for item in self.items:
+            # check
+            if item is not None and not isinstance(item, str):
+                raise Exception(
+                    "compound objects cannot be saved, use file paths or sdf contents!")
+            items.append('' if item is None else item)
+        np.savez_compressed(
+            file_path, features=self.features,
+            row_ids=np.asarray(self.row_ids, dtype=str),
+            items=np.asarray(items, dtype=str),
+            error_ids=np.asarray(list(self.errors), dtype=str),
+            error_messages=np.asarray(list(self.errors.values()), dtype=str),
+            settings=np.asarray([self.n_bits, self.path_length], dtype=np.int64))
+
+    @staticmethod
+    def load(file_path):
+        '''
+        Load a saved index (npz)
+
+        Returns
+        -------
+        index : SubstructureIndex
+            index
+        '''
+        with np.load(file_path, allow_pickle=False) as data:
+            n_bits, path_length = data['settings'].tolist()
+            index = SubstructureIndex(n_bits, path_length)
+            index.row_ids = data['row_ids'].tolist()
+            index.items = [item or None for item in data['items'].tolist()]
+            index.errors = dict(
+                zip(data['error_ids'].tolist(), data['error_messages'].tolist()))
+            index.__blocks = [data['features'].astype(np.uint64)]
+        # res
+        return index
+
+
+def _feature_chunk(chunk, settings):
+    '''
+    Feature bitsets of a chunk of compounds
+
+    Returns
+    -------
+    res : list
+        (feature bitset, error message)
+    '''
+    n_bits, path_length = settings
+    res = []
+    for _, item in chunk:
+        try:
+            features = SubstructureIndex.compound_features(
+                Screen.load(item), path_length)
+            # dummy atoms (all bits)
+            if features is None:
+                res.append((np.full(n_bits // 64, np.iinfo(np.uint64).max, dtype=np.uint64), None))
+            else:
+                res.append((Fingerprint.fold(
+                    (Fingerprint.feature_hash(f) for f in features), n_bits), None))
+        except Exception as e:
+            res.append((None, str(e)))
+    return res
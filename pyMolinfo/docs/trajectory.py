@@ -0,0 +1,418 @@
+# TRAJECTORY
+# ------------
+
+# import libs
+import os
+import copy
+from itertools import islice
+from pathlib import Path
+from typing import List, Optional, Union
+import numpy as np
+# internals
+from .structure import Structure
+from .compound import Compound
+
+
+class Trajectory():
+    '''
+    Multi-frame coordinates (md/optimization runs) sharing one topology
+
+    hint:
+        xyz is a (n_frames, n_atoms, 3) array (numpy array or memmap)
+    '''
+    # topology
+    _atom_elements = []
+    _topology = None
+    # frames
+    _xyz = None
+    _frame_ids = []
+    _comments = []
+
+    def __init__(self, atom_elements, xyz, frame_ids=None, comments=None, topology=None):
+        '''
+        Initialize a trajectory
+
+        Parameters
+        ----------
+        atom_elements : list
+            atom symbols such as ['C','H','H','H','H']
+        xyz : np.ndarray
+            coordinates (n_frames, n_atoms, 3)
+        frame_ids : list
+            frame index in the source file (default 0, 1, ...)
+        comments : list
+            comment line of each frame
+        topology : dict
+            parsed compound properties (bond block, name, ...) shared by all frames
+        '''
+        # check
+        if xyz.ndim != 3 or xyz.shape[2] != 3:
+            raise Exception('xyz must be a (n_frames, n_atoms, 3) array.')
+        if xyz.shape[1] != len(atom_elements):
+            raise Exception('atom elements and coordinates are not consistent.')
+
+        self._atom_elements = list(atom_elements)
+        self._xyz = xyz
+        self._frame_ids = list(frame_ids) if frame_ids is not None else list(
+            range(xyz.shape[0]))
+        self._comments = list(comments) if comments is not None else [
+            '']*xyz.shape[0]
+        self.topology = topology
+
+    def __len__(self):
+        return self._xyz.shape[0]
+
+    def __str__(self):
+        return f"Trajectory: {self.frame_numbers} frames, {self.atom_numbers} atoms"
+
+    @property
+    def atom_elements(self):
+        return np.array(self._atom_elements)
+
+    @property
+    def atom_numbers(self):
+        return len(self._atom_elements)
+
+    @property
+    def frame_numbers(self):
+        return self._xyz.shape[0]
+
+    @property
+    def xyz(self):
+        return self._xyz
+
+    @property
+    def frame_ids(self):
+        return self._frame_ids
+
+    @property
+    def comments(self):
+        return self._comments
+
+    @property
+    def topology(self):
+        return self._topology
+
+    @topology.setter
+    def topology(self, value):
+        # check
+        if value is not None:
+            # topology elements
+            _elements = [str(i).strip() for i in value['atom_elements']]
+            if _elements != [str(i).strip() for i in self._atom_elements]:
+                raise Exception(
+                    'topology atom elements do not match trajectory atoms.')
+        self._topology = value
+
+    def frame(self, i):
+        '''
+        Return the coordinates of a frame
+
+        Parameters
+        ----------
+        i : int
+            frame index (position in the trajectory)
+
+        Returns
+        -------
+        xyz : np.ndarray
+            coordinates (n_atoms, 3)
+        '''
+        return np.asarray(self._xyz[i])
+
+    def center_frames(self):
+        '''
+        Move all frames to the center of the origin [0,0,0]
+
+        Returns
+        -------
+        xyz_center : np.ndarray
+            centered coordinates (n_frames, n_atoms, 3)
+        '''
+        # center of each frame
+        centerPoints = Structure.BatchCenterPoints(self._xyz)
+        # move
+        xyzCenter, _ = Structure.CenterObject(
+            self._xyz, centerPoints[:, np.newaxis, :])
+        # res
+        return xyzCenter
+
+    def to_compound_info(self, i):
+        '''
+        Build compound info (the same as MolParser output) for a frame
+
+        Parameters
+        ----------
+        i : int
+            frame index (position in the trajectory)
+
+        Returns
+        -------
+        compound_info : dict
+            parsed compound properties
+        '''
+        # check
+        if self._topology is None:
+            raise Exception(
+                'topology is not defined, load a sdf/json file as topology.')
+
+        # frame
+        xyzList = np.array(self._xyz[i], dtype=np.float64)
+        # object base
+        objectBaseCoordinate = Structure.CenterPoints(xyzList)
+        # move to the center [0,0,0]
+        xyzCenterList, _ = Structure.CenterObject(
+            xyzList, objectBaseCoordinate)
+
+        # atom block
+        atoms = []
+        for j, _name in enumerate(self._atom_elements):
+            _x, _y, _z = [float(v) for v in xyzList[j]]
+            atoms.append({
+                'id': j+1,
+                'symbol': _name,
+                'index': j+1,
+                'x': _x,
+                'y': _y,
+                'z': _z,
+                'position': {
+                    'x': _x,
+                    'y': _y,
+                    'z': _z
+                },
+                'xyz': [_x, _y, _z]
+            })
+
+        # shared topology (bond block is not copied)
+        compound_info = dict(self._topology)
+        compound_info['compound_properties'] = copy.deepcopy(
+            self._topology.get('compound_properties', {}))
+        compound_info['atom_block'] = atoms
+        compound_info['xyz_list'] = xyzList
+        compound_info['xyz_center_list'] = xyzCenterList
+        compound_info['frame_id'] = self._frame_ids[i]
+        compound_info['frame_comment'] = self._comments[i]
+
+        # res
+        return compound_info
+
+    def compound(self, i):
+        '''
+        Create a compound for a frame (shared topology)
+
+        Parameters
+        ----------
+        i : int
+            frame index (position in the trajectory)
+
+        Returns
+        -------
+        compound : Compound
+            compound object
+        '''
+        return Compound(self.to_compound_info(i))
+
+    @staticmethod
+    def count_frames(filepath, atom_numbers=None):
+        '''
+        Count frames of a xyz file without parsing them
+
+        Parameters
+        ----------
+        filepath : str
+            xyz file path
+        atom_numbers : int
+            number of atoms (read from the first line if not provided)
+
+        Returns
+        -------
+        frame_numbers : int
+            number of frames
+        atom_numbers : int
+            number of atoms
+        '''
+        # count lines in binary chunks
+        lineNo = 0
+        lastChar = b'\n'
+        with open(filepath, 'rb') as f:
+            # atom no
+            if atom_numbers is None:
+                atom_numbers = int(f.readline().split()[0])
+                f.seek(0)
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                lineNo += chunk.count(b'\n')
+                lastChar = chunk[-1:]
+        # last line without new line
+        if lastChar != b'\n':
+            lineNo += 1
+
+        # frame size
+        frameSize = atom_numbers + 2
+        # res
+        return lineNo // frameSize, atom_numbers
+
+    @staticmethod
+    def read_xyz(filepath: Union[str, Path], start: int = 0, stop: Optional[int] = None,
+                 step: int = 1, memmap: Optional[Union[str, Path]] = None,
+                 dtype=np.float64):
+        '''
+        Stream a multi-frame xyz file into a preallocated coordinate array
+
+        Parameters
+        ----------
+        filepath : str
+            xyz file path
+        start : int
+            first frame (default 0)
+        stop : int
+            last frame (exclusive, default None: all frames)
+        step : int
+            frame stride (default 1)
+        memmap : str
+            if provided, frames are written into a memory-mapped `.npy` file
+        dtype : np.dtype
+            coordinate type (default float64)
+
+        Returns
+        -------
+        atom_elements : list
+            atom symbols
+        xyz : np.ndarray
+            coordinates (n_frames, n_atoms, 3)
+        frame_ids : list
+            frame index in the file
+        comments : list
+            comment line of each frame
+
+        Notes
+        -----
+        - all frames must have the same number of atoms (one topology)
+        - unselected frames are skipped line by line without being parsed
+        '''
+        # check
+        if not os.path.exists(filepath):
+            raise Exception('file path is not valid.')
+        if step < 1:
+            raise Exception('step must be a positive integer.')
+
+        # frames
+        frameNo, atomNo = Trajectory.count_frames(filepath)
+        frameIds = list(range(frameNo))[start:stop:step]
+        selectedNo = len(frameIds)
+        # check
+        if selectedNo == 0:
+            raise Exception('no frame is selected.')
+
+        # preallocate
+        if memmap is not None:
+            xyz = np.lib.format.open_memmap(
+                str(memmap), mode='w+', dtype=dtype, shape=(selectedNo, atomNo, 3))
+        else:
+            xyz = np.empty((selectedNo, atomNo, 3), dtype=dtype)
+
+        # frame size
+        frameSize = atomNo + 2
+        atomElements = None
+        comments = []
+
+        with open(filepath, 'r') as f:
+            # current frame
+            currentFrame = 0
+            for k, frameId in enumerate(frameIds):
+                # skip frames (lines are not parsed)
+                skipLines = (frameId - currentFrame)*frameSize
+                if skipLines > 0:
+                    next(islice(f, skipLines, skipLines), None)
+
+                # header
+                _header = f.readline().split()
+                if len(_header) == 0 or int(_header[0]) != atomNo:
+                    raise Exception(
+                        f'frame {frameId} does not have {atomNo} atoms.')
+                # comment
+                comments.append(f.readline().strip())
+
+                # atoms
+                _frame = xyz[k]
+                _symbols = []
+                for i, line in enumerate(islice(f, atomNo)):
+                    _row = line.split()
+                    _symbols.append(_row[0])
+                    _frame[i, 0] = float(_row[1])
+                    _frame[i, 1] = float(_row[2])
+                    _frame[i, 2] = float(_row[3])
+
+                # topology
+                if atomElements is None:
+                    atomElements = _symbols
+                elif _symbols != atomElements:
+                    raise Exception(
+                        f'frame {frameId} atoms do not match the first frame.')
+
+                # update
+                currentFrame = frameId + 1
+
+        # flush memmap
+        if memmap is not None:
+            xyz.flush()
+
+        # res
+        return atomElements, xyz, frameIds, comments
+
+    @classmethod
+    def from_xyz(cls, filepath: Union[str, Path], topology: Optional[dict] = None,
+                 start: int = 0, stop: Optional[int] = None, step: int = 1,
+                 memmap: Optional[Union[str, Path]] = None):
+        '''
+        Create a trajectory from a multi-frame xyz file
+
+        Parameters
+        ----------
+        filepath : str
+            xyz file path
+        topology : dict
+            parsed compound properties (MolParser output) shared by all frames
+        start : int
+            first frame (default 0)
+        stop : int
+            last frame (exclusive, default None: all frames)
+        step : int
+            frame stride (default 1)
+        memmap : str
+            if provided, frames are written into a memory-mapped `.npy` file
+
+        Returns
+        -------
+        trajectory : Trajectory
+            trajectory object
+        '''
+        atomElements, xyz, frameIds, comments = Trajectory.read_xyz(
+            filepath, start=start, stop=stop, step=step, memmap=memmap)
+        # res
+        return cls(atomElements, xyz, frame_ids=frameIds, comments=comments, topology=topology)
+
+    @staticmethod
+    def write_xyz(filepath: Union[str, Path], atom_elements: List[str], xyz, comments=None):
+        '''
+        Write frames into a multi-frame xyz file
+
+        Parameters
+        ----------
+        filepath : str
+            xyz file path
+        atom_elements : list
+            atom symbols
+        xyz : np.ndarray
+            coordinates (n_frames, n_atoms, 3)
+        comments : list
+            comment line of each frame
+        '''
+        atomNo = len(atom_elements)
+        with open(filepath, 'w') as f:
+            for k in range(xyz.shape[0]):
+                f.write(f"{atomNo}\n")
+                f.write(f"{comments[k] if comments is not None else ''}\n")
+                for i in range(atomNo):
+                    _x, _y, _z = xyz[k, i]
+                    f.write(
+                        f"{atom_elements[i]} {_x:.8f} {_y:.8f} {_z:.8f}\n")
@@ -106,6 +106,9 @@ class Utility():
                 elif _contentFormat == 'json-string':
                     # json convert to dict
                     fileContent = json.loads(_contentSource)
+                elif _contentFormat in ('gjf', 'com'):
+                    # gaussian input (string)
+                    fileContent = _contentSource
 
                 # res
                 return fileContent, _contentFormat
@@ -148,6 +151,12 @@ class Utility():
                         fileContent = f.read()
                     elif fileFormat == 'json':
                         fileContent = json.load(f)
+                    elif fileFormat in ('gjf', 'com'):
+                        # gaussian input
+                        fileContent = f.read()
+                    else:
+                        raise Exception(
+                            f"file format `{fileFormat}` is not supported.")
 
                 # res
                 return fileContent, fileDir, fileName, fileFormat
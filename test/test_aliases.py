@@ -0,0 +1,37 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+from pyMolinfo.docs import Network
+from pyMolinfo.docs.patternlibrary import PatternLibrary
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_shared_patterns():
+    builtin = Network.builtin_function_groups()
+    library = PatternLibrary(builtin)
+    # equal graphs of different groups are compiled once
+    assert len(library.patterns) < sum(len(graphs) for graphs in builtin.values())
+    primary = library.group_patterns['primary-alcohol']
+    assert set(primary) <= set(library.group_patterns['pst-alcohols'])
+    for index in primary:
+        assert {'primary-alcohol', 'pst-alcohols'} <= set(
+            library.patterns[index]['function_groups'])
+
+
+def test_alias_counts():
+    # 2-(2-methoxyethoxy)ethanol, Methanol
+    for cid in (8134, 887):
+        comp = mi.compound(os.path.join(
+            test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf'))
+        names = ['primary-alcohol', 'secondary-alcohol', 'tertiary-alcohol', 'pst-alcohols']
+        # all groups at once (fan out) and each group alone
+        res = {x['function_group']: x['count']
+               for x in comp.check_functional_groups(names, count_functional_group=True)}
+        for name in names:
+            _comp = mi.compound(os.path.join(
+                test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf'))
+            _res = _comp.check_functional_groups([name], count_functional_group=True)
+            assert _res[0]['count'] == res[name]
+        assert res['pst-alcohols'] >= res['primary-alcohol']
@@ -0,0 +1,50 @@
+# import packages/modules
+import numpy as np
+from pyMolinfo.docs import ConformerEnsemble
+from pyMolinfo.docs.compute import Compute
+
+
+def rotation(angle):
+    '''
+    Rotation matrix around the z axis
+    '''
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+
+
+def test_kabsch():
+    rng = np.random.default_rng(1)
+    xyzRef = rng.normal(size=(8, 3))
+    # rotated and translated copies
+    xyzFrames = np.stack([xyzRef @ rotation(a).T + t for a, t in
+                          [(0.3, 1.0), (1.2, -2.0), (2.5, 0.5)]])
+    xyzAligned, R, rmsd = Compute.batch_kabsch(xyzFrames, xyzRef)
+    assert np.allclose(rmsd, 0.0, atol=1e-8)
+    assert np.allclose(xyzAligned, xyzRef[None], atol=1e-8)
+    # proper rotations
+    assert np.allclose(np.linalg.det(R), 1.0)
+
+    # rmsd without alignment
+    assert np.all(Compute.batch_rmsd(xyzFrames, xyzRef, align=False) > 0.1)
+
+
+def test_pairwise_rmsd_prune():
+    rng = np.random.default_rng(2)
+    xyzA = rng.normal(size=(6, 3))
+    xyzB = rng.normal(size=(6, 3))
+    # A, B, rotated A, rotated B
+    xyzFrames = np.stack([xyzA, xyzB, xyzA @ rotation(0.7).T + 3.0,
+                          xyzB @ rotation(-1.1).T])
+
+    matrix = Compute.pairwise_rmsd(xyzFrames)
+    assert np.allclose(matrix, matrix.T)
+    assert np.isclose(matrix[0, 2], 0.0, atol=1e-8)
+    assert np.isclose(matrix[1, 3], 0.0, atol=1e-8)
+    assert matrix[0, 1] > 0.1
+
+    keep, _ = Compute.prune_conformers(xyzFrames, 0.01)
+    assert list(keep) == [0, 1]
+
+    # ensemble
+    ens = ConformerEnsemble(['C'] * 6, xyzFrames, {'atom_elements': ['C'] * 6})
+    assert ens.prune(0.01).conformer_numbers == 2
@@ -0,0 +1,50 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+from pyMolinfo.docs.graphmatcher import ChemGraphMatcher
+from pyMolinfo.docs.patternlibrary import PatternLibrary
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def node_match(n1, n2):
+    return n1['symbol'] == n2['symbol']
+
+
+def edge_match(e1, e2):
+    return e1['type'] == e2['type']
+
+
+def test_anchor_seeded_matches():
+    # Ethylbenzene
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_7500.sdf'))
+    G = comp.create_graph()
+    custom_fg = mi.create_custom_functional_groups({
+        'C-C-H': ["C1-C2", "C2-H3"],
+        'C=C-C': ["C1=C2", "C2-C3"]})
+    for group in custom_fg.custom_functional_groups:
+        pattern = list(group.values())[0]
+        # whole graph search
+        expected = {tuple(sorted(m.items())) for m in ChemGraphMatcher(
+            G, pattern, node_match=node_match, edge_match=edge_match).subgraph_isomorphisms_iter()}
+        assert expected
+
+        # seeded from the anchor atoms (whole graph and ball graphs)
+        threshold = PatternLibrary.ball_threshold
+        try:
+            for PatternLibrary.ball_threshold in (threshold, 0):
+                res = [tuple(sorted(m.items())) for m in PatternLibrary.iter_matches(
+                    G, pattern, node_match, edge_match, element_index=comp.element_index)]
+                assert len(res) == len(set(res))
+                assert set(res) == expected
+        finally:
+            PatternLibrary.ball_threshold = threshold
+
+
+def test_element_index():
+    # Methanol
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    G = comp.create_graph()
+    assert comp.element_index == {'O': [1], 'C': [2], 'H': [3, 4, 5, 6]}
+    assert PatternLibrary.element_index(G) == comp.element_index
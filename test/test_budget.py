@@ -0,0 +1,43 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+from pyMolinfo.docs import MatchBudget, MatchCache
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Ethylbenzene
+f = os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_7500.sdf')
+
+
+def count(budget=None):
+    # no results of other compounds
+    MatchCache.clear()
+    comp = mi.compound(f)
+    return comp.check_functional_groups(count_functional_group=True, budget=budget)
+
+
+def test_large_budget():
+    expected = {x['function_group']: x['count'] for x in count()}
+    res = count(MatchBudget(time_limit=60, max_states=10**7))
+    assert all(x['status'] == 'ok' for x in res)
+    assert {x['function_group']: x['count'] for x in res} == expected
+
+
+def test_state_limit():
+    expected = {x['function_group']: x['count'] for x in count()}
+    res = count(MatchBudget(max_states=1))
+    assert any(x['status'] == 'timed_out' for x in res)
+    # lower bounds
+    for x in res:
+        assert x['count'] <= expected[x['function_group']]
+        if x['status'] == 'ok':
+            assert x['count'] == expected[x['function_group']]
+
+
+def test_cancel():
+    budget = MatchBudget()
+    budget.cancel()
+    res = count(budget)
+    assert any(x['status'] == 'cancelled' for x in res)
+    assert all(x['status'] in ('ok', 'cancelled') for x in res)
@@ -0,0 +1,33 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+from pyMolinfo.docs import Network
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_patterns_shared():
+    comp1 = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_7500.sdf'))
+    comp2 = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+
+    # pattern graphs and compiled libraries are built once
+    builtin = Network.builtin_function_groups()
+    assert builtin is Network.builtin_function_groups()
+    for name, graphs in builtin.items():
+        assert comp1.function_group_list[name][0] is graphs[0]
+        assert comp2.function_group_list[name][0] is graphs[0]
+    assert comp1.pattern_library is comp2.pattern_library
+    assert comp1.implicit_pattern_library is comp2.implicit_pattern_library
+
+
+def test_shared_results():
+    # Methanol (results do not depend on the compounds matched before)
+    f = os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf')
+    mi.count_functional_group(os.path.join(
+        test_dir, 'Conformer3D_COMPOUND_CID_7500.sdf'))
+    res = {x['function_group']: x['count'] for x in mi.compound(
+        f).check_functional_groups(count_functional_group=True)}
+    assert res['hydroxyl'] == 1
+    assert res['methyl-group'] == 1
+    assert res['carbonyl'] == 0
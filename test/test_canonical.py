@@ -0,0 +1,143 @@
+# import packages/modules
+import os
+import random
+import pytest
+import pyMolinfo as mi
+from pyMolinfo.docs.canonical import CanonicalGraph
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def molfile(elements, bonds, seed=0):
+    '''
+    Sdf content of atoms and bonds (random coordinates)
+    '''
+    rnd = random.Random(seed)
+    lines = ['mol', '  test', '',
+             f"{len(elements):3d}{len(bonds):3d}  0     0  0  0  0  0  0999 V2000"]
+    for e in elements:
+        x, y, z = (rnd.uniform(-5, 5) for _ in range(3))
+        lines.append(
+            f"{x:10.4f}{y:10.4f}{z:10.4f} {e:<3} 0  0  0  0  0  0  0  0  0  0  0  0")
+    for i, j, o in bonds:
+        lines.append(f"{i:3d}{j:3d}{o:3d}  0  0  0  0")
+    lines += ['M  END', '$$$$']
+    return '\n'.join(lines) + '\n'
+
+
+def permute(elements, bonds, seed):
+    '''
+    Shuffle the atom and bond order
+    '''
+    rnd = random.Random(seed)
+    perm = list(range(len(elements)))
+    rnd.shuffle(perm)
+    position = {old: new for new, old in enumerate(perm)}
+    _bonds = [(position[i - 1] + 1, position[j - 1] + 1, o) for i, j, o in bonds]
+    rnd.shuffle(_bonds)
+    return [elements[old] for old in perm], _bonds
+
+
+def structure(comp):
+    elements = [str(e).strip() for e in comp.atomElements]
+    bonds = [(int(b['id1']), int(b['id2']), int(b['bond_type']))
+             for b in comp.atomBonds1d]
+    return elements, bonds
+
+
+def tetra_tert_butylmethane():
+    elements, bonds = ['C'], []
+
+    def _add(e, to):
+        elements.append(e)
+        bonds.append((to, len(elements), 1))
+        return len(elements)
+
+    for _ in range(4):
+        q = _add('C', 1)
+        for _ in range(3):
+            m = _add('C', q)
+            for _ in range(3):
+                _add('H', m)
+    return elements, bonds
+
+
+def branched_tree(arity, depth):
+    elements, bonds = ['C'], []
+    frontier = [1]
+    for _ in range(depth):
+        _frontier = []
+        for atom in frontier:
+            for _ in range(arity):
+                elements.append('C')
+                bonds.append((atom, len(elements), 1))
+                _frontier.append(len(elements))
+        frontier = _frontier
+    return elements, bonds
+
+
+def substituted_center(count):
+    # center atom with identical -C-O substituents
+    elements, bonds = ['C'], []
+    for _ in range(count):
+        elements += ['C', 'O']
+        bonds += [(1, len(elements) - 1, 1), (len(elements) - 1, len(elements), 1)]
+    return elements, bonds
+
+
+def test_permutation_invariance():
+    for cid in (241, 7500, 887, 6228):
+        comp = mi.compound(os.path.join(
+            test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf'))
+        elements, bonds = structure(comp)
+        for seed in range(4):
+            _comp = mi.compound(molfile(*permute(elements, bonds, seed)))
+            assert _comp.canonical_hash == comp.canonical_hash
+            assert _comp.is_same_structure(comp)
+
+
+def test_symmetric_structure():
+    # many symmetric atoms (automorphism pruning)
+    elements, bonds = tetra_tert_butylmethane()
+    h = mi.compound(molfile(elements, bonds)).canonical_hash
+    for seed in range(3):
+        assert mi.compound(molfile(
+            *permute(elements, bonds, seed))).canonical_hash == h
+
+
+def test_highly_symmetric_structures():
+    # 4-ary tree of depth 3 (85 atoms) and 30 identical substituents, the
+    # search tree stays small (first path and orbit pruning)
+    maxNodes = CanonicalGraph.max_nodes
+    CanonicalGraph.max_nodes = 1000
+    try:
+        for elements, bonds in (branched_tree(4, 3), substituted_center(30)):
+            h = mi.compound(molfile(elements, bonds)).canonical_hash
+            for seed in range(3):
+                assert mi.compound(molfile(
+                    *permute(elements, bonds, seed))).canonical_hash == h
+    finally:
+        CanonicalGraph.max_nodes = maxNodes
+
+
+def test_search_limit():
+    maxNodes = CanonicalGraph.max_nodes
+    CanonicalGraph.max_nodes = 10
+    try:
+        with pytest.raises(Exception):
+            mi.compound(molfile(*substituted_center(30))).canonical_hash
+    finally:
+        CanonicalGraph.max_nodes = maxNodes
+
+
+def test_deduplicate():
+    benzene = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_241.sdf'))
+    methanol = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    elements, bonds = structure(benzene)
+    res = mi.deduplicate([benzene, methanol, molfile(*permute(elements, bonds, 1)),
+                          'garbage'])
+    assert res['groups'] == [['0', '2'], ['1']]
+    assert res['unique'] == ['0', '1']
+    assert list(res['errors']) == ['3']
+    assert benzene.canonical_hash != methanol.canonical_hash
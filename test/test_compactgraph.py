@@ -0,0 +1,55 @@
+# import packages/modules
+import os
+import numpy as np
+import pyMolinfo as mi
+from pyMolinfo.docs.compute import Compute
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_csr_matches_graph():
+    # Methanol
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    compact = comp.compact_graph
+    G = comp.compound_graph
+
+    # nodes and edges
+    assert compact.node_ids.tolist() == sorted(G.nodes)
+    assert compact.number_of_edges() == G.number_of_edges()
+    assert compact.symbols == [G.nodes[n]['symbol'] for n in sorted(G.nodes)]
+    # csr neighbours
+    nodeIds = compact.node_ids.tolist()
+    for i, n in enumerate(nodeIds):
+        nbrs = compact.indices[compact.indptr[i]:compact.indptr[i + 1]].tolist()
+        assert sorted(nodeIds[k] for k in nbrs) == sorted(G.neighbors(n))
+
+
+def test_implicit_h():
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_241.sdf'))
+    compact = comp.create_compact_graph(implicit_h=True)
+    assert compact.implicit_h
+    assert compact.symbols == ['C'] * 6
+    assert compact.degree.tolist() == [2] * 6
+
+
+def test_topological_distance():
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_7500.sdf'))
+    bondI, bondJ, _ = Compute.bond_arrays(comp.parse_prop['bond_block'])
+    expected = Compute.topological_distance_matrix(
+        int(comp.parse_prop['atom_numbers']), bondI, bondJ)
+    assert np.array_equal(comp.topological_distance_matrix(), expected)
+
+
+def test_matching_graph_without_xyz():
+    # Methanol
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    comp.check_functional_groups()
+    # matching graph, no coordinates
+    G = comp.explicit_graph
+    assert all('xyz' not in data for _, data in G.nodes(data=True))
+    assert comp._compound_graph is None
+    # compound graph (the same graph, coordinates added)
+    G = comp.compound_graph
+    assert G is comp.explicit_graph
+    assert np.allclose([G.nodes[n]['xyz'] for n in sorted(G.nodes)], comp.xyzList)
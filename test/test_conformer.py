@@ -0,0 +1,53 @@
+# import packages/modules
+import os
+import numpy as np
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_conformers(f, src, xyzFrames):
+    '''
+    Write a multi-record sdf file (the same atoms and bonds)
+    '''
+    with open(src) as _f:
+        lines = _f.read().split('\n')
+    # record (without $$$$)
+    end = next(i for i, line in enumerate(lines) if line.startswith('$$$$'))
+    atomNo = int(lines[3][:3])
+    records = []
+    for xyz in xyzFrames:
+        record = list(lines[:end])
+        for i in range(atomNo):
+            x, y, z = xyz[i]
+            record[4 + i] = f"{x:10.4f}{y:10.4f}{z:10.4f}" + record[4 + i][30:]
+        records.append('\n'.join(record) + '\n$$$$\n')
+    with open(f, 'w') as _f:
+        _f.write(''.join(records))
+
+
+def test_conformers(tmp_path):
+    # Methanol
+    src = os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf')
+    comp = mi.compound(src)
+    xyz = np.asarray(comp.xyzList)
+    # stretched C-O bond in the second conformer
+    _xyz = xyz.copy()
+    _xyz[0] += (xyz[0] - xyz[1]) * 0.1
+    f = tmp_path / 'conformers.sdf'
+    write_conformers(f, src, [xyz, _xyz, xyz + 1.0])
+
+    ens = mi.conformers(str(f))
+    assert ens.conformer_numbers == 3
+    assert ens.atom_numbers == comp.atom_numbers
+    assert np.allclose(ens.xyz[2], xyz + 1.0, atol=1e-4)
+
+    # one topology
+    assert len(ens.topology_compound.atom_bond_block_1d) == len(comp.atom_bond_block_1d)
+
+    # distance of all conformers
+    d = ens.distance_atoms(['O1', 'C2'])
+    assert d.shape == (3,)
+    assert np.isclose(d[0], d[2]) and d[1] > d[0]
+    assert ens.distance_matrix().shape == (3, comp.atom_numbers, comp.atom_numbers)
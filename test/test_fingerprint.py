@@ -0,0 +1,41 @@
+# import packages/modules
+import os
+import numpy as np
+import pyMolinfo as mi
+from pyMolinfo.docs import FingerprintLibrary
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_search_self_first():
+    files = [os.path.join(test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf')
+             for cid in (241, 887, 7500, 931)]
+    library = mi.fingerprints(files)
+    assert len(library) == 4
+
+    res = library.search(files[2], k=2)
+    assert res[0]['index'] == 2
+    assert res[0]['similarity'] == 1.0
+    assert res[1]['similarity'] < 1.0
+
+
+def test_search_ties():
+    # about half of the rows are equal to the query
+    rng = np.random.default_rng(0)
+    library = FingerprintLibrary(n_bits=64)
+    query = np.array([0xFF], dtype=np.uint64)
+    rows = []
+    for i in range(5000):
+        fp = query if rng.random() < 0.5 else np.array(
+            [rng.integers(1, 2**16)], dtype=np.uint64)
+        library.add(i, fp)
+        rows.append(i)
+    tied = [i for i in rows if library.fingerprints[i, 0] == 0xFF]
+
+    # ties in row order for any chunk size
+    for chunk_size in (7, 64, 65536):
+        library.chunk_size = chunk_size
+        res = library.search(query, k=5)
+        assert [r['index'] for r in res] == tied[:5]
+        assert all(r['similarity'] == 1.0 for r in res)
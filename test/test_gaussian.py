@@ -0,0 +1,59 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+from pyMolinfo.docs import MolParser
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def geometry(xyzList):
+    '''
+    Standard orientation block of a gaussian output
+    '''
+    lines = [' Standard orientation:',
+             ' ' + '-' * 69,
+             ' Center     Atomic      Atomic             Coordinates (Angstroms)',
+             ' Number     Number       Type             X           Y           Z',
+             ' ' + '-' * 69]
+    for i, (n, x, y, z) in enumerate(xyzList):
+        lines.append(f" {i + 1:6d} {n:10d} {0:11d} {x:14.6f}{y:12.6f}{z:12.6f}")
+    lines.append(' ' + '-' * 69)
+    return lines
+
+
+def test_gjf():
+    # Benzene (connectivity)
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_241.gjf'))
+    assert comp.atom_numbers == 12
+    assert len(comp.atom_bond_block_1d) == 12
+    assert [b['bond_type'] for b in comp.atom_bond_block_1d].count(2) == 3
+    assert len(comp.aromatic_rings) == 1
+
+
+def test_opt_log(tmp_path):
+    # water (2 steps, geometry printed again after optimization completed)
+    step1 = [(8, 0.0, 0.0, 0.12), (1, 0.0, 0.76, -0.47), (1, 0.0, -0.76, -0.47)]
+    step2 = [(8, 0.0, 0.0, 0.11), (1, 0.0, 0.75, -0.46), (1, 0.0, -0.75, -0.46)]
+    lines = geometry(step1) + [' SCF Done:  E(RHF) =  -75.5859  A.U. after 10 cycles'] + \
+        geometry(step2) + [' SCF Done:  E(RHF) =  -75.5860  A.U. after 6 cycles',
+                           ' Optimization completed.'] + geometry(step2)
+    f = tmp_path / 'water.log'
+    f.write_text('\n'.join(lines) + '\n')
+
+    steps = list(mi.gaussian_steps(str(f)))
+    assert len(steps) == 2
+    props = [comp.parse_prop['compound_properties'] for comp in steps]
+    assert [p['energy'] for p in props] == [-75.5859, -75.5860]
+    assert [p['final'] for p in props] == [False, True]
+    assert props[1]['converged']
+    # bonds (covalent radii)
+    assert len(steps[0].atom_bond_block_1d) == 2
+
+
+def test_compound_properties():
+    parser = MolParser(None)
+    res1 = parser.build_compound_info(['O', 'H'], [[0, 0, 0], [0, 0, 0.96]], [[1, 2, 1]])
+    res1['compound_properties']['energy'] = -1.0
+    res2 = parser.build_compound_info(['O', 'H'], [[0, 0, 0], [0, 0, 0.96]], [[1, 2, 1]])
+    assert res2['compound_properties'] == {}
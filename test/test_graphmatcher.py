@@ -0,0 +1,52 @@
+# import packages/modules
+import os
+import networkx as nx
+from networkx.algorithms import isomorphism
+import pyMolinfo as mi
+from pyMolinfo.docs.graphmatcher import ChemGraphMatcher
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def node_match(n1, n2):
+    return n1['symbol'] == n2['symbol']
+
+
+def edge_match(e1, e2):
+    return e1['type'] == e2['type']
+
+
+def methyl():
+    G = nx.Graph()
+    G.add_node('1', symbol='C')
+    for i in ('2', '3', '4'):
+        G.add_node(i, symbol='H')
+        G.add_edge('1', i, type=1)
+    return G
+
+
+def test_symmetry_breaking():
+    # Methanol, N,N-dimethylformamide
+    for cid, count in ((887, 1), (6228, 2)):
+        G = mi.compound(os.path.join(
+            test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf')).create_graph()
+        pattern = methyl()
+
+        # all mappings (3! per methyl group)
+        mappings = list(isomorphism.GraphMatcher(
+            G, pattern, node_match=node_match, edge_match=edge_match).subgraph_isomorphisms_iter())
+        # one mapping per occurrence
+        _mappings = list(ChemGraphMatcher(
+            G, pattern, node_match=node_match, edge_match=edge_match).subgraph_isomorphisms_iter())
+
+        assert len(_mappings) == count
+        assert len(mappings) == 6 * count
+        assert {frozenset(m) for m in mappings} == {frozenset(m) for m in _mappings}
+
+
+def test_automorphisms():
+    pattern = methyl()
+    assert len(ChemGraphMatcher.automorphisms(pattern)) == 6
+    # H2 < H3 < H4 (fixed order of the hydrogens)
+    assert len(ChemGraphMatcher.symmetry_constraints(pattern)) == 3
@@ -0,0 +1,26 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_group_subgroup():
+    custom_fg = mi.create_custom_functional_groups(
+        os.path.join(test_dir, 'custom-functional-group-2.yml'))
+    # Benzene, Ethylbenzene
+    expected = {
+        241: {'Chain-in-Benzene': 1, 'Chain-in-Benzene2': 1},
+        7500: {'Chain-in-Benzene': 1, 'Chain-in-Benzene2': 0}
+    }
+    for cid, counts in expected.items():
+        f = os.path.join(test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf')
+        for implicit_h in (False, True):
+            res, _ = mi.count_functional_group(f, [custom_fg], implicit_h=implicit_h)
+            res = {x['function_group']: x['count'] for x in res}
+            assert {k: res[k] for k in counts} == counts
+
+            res, _ = mi.check_functional_group(f, [custom_fg], implicit_h=implicit_h)
+            res = {x['function_group']: x['result'] for x in res}
+            assert {k: res[k] for k in counts} == {k: v > 0 for k, v in counts.items()}
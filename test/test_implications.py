@@ -0,0 +1,48 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+from pyMolinfo.docs import Network
+from pyMolinfo.docs.patternlibrary import PatternLibrary
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def stats():
+    return {'patterns': 0, 'matcher_calls': 0, 'skipped': 0}
+
+
+def test_implication_dag():
+    library = PatternLibrary(Network.builtin_function_groups())
+    hydroxyl = library.group_patterns['hydroxyl'][0]
+    primary = library.group_patterns['primary-alcohol'][0]
+    # primary alcohol contains hydroxyl (not the other way)
+    assert hydroxyl in library.implications[primary]
+    assert primary not in library.implications[hydroxyl]
+    # contained patterns first
+    levels = library.pattern_levels([primary, hydroxyl])
+    assert levels == [[hydroxyl], [primary]]
+
+
+def test_skip_contained_absent():
+    # N,N-dimethylformamide
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_6228.sdf'))
+    G = comp.create_graph()
+    names = [name for name in comp.function_group_list
+             if name not in comp.function_group_lookup]
+
+    # implication dag
+    library = PatternLibrary(comp.function_group_list)
+    _stats = stats()
+    res = library.match(G, names, comp.node_match, comp.edge_match, count=True, stats=_stats)
+
+    # no implications
+    _library = PatternLibrary(comp.function_group_list)
+    _library.implications = [[] for _ in _library.patterns]
+    _stats_all = stats()
+    _res = _library.match(G, names, comp.node_match, comp.edge_match, count=True,
+                          stats=_stats_all)
+
+    # the same results with fewer matcher calls
+    assert res == _res
+    assert _stats['matcher_calls'] < _stats_all['matcher_calls']
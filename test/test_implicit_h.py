@@ -0,0 +1,41 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Methanol, Benzene, Ethylbenzene, N,N-dimethylformamide, Naphthalene
+cids = (887, 241, 7500, 6228, 931)
+
+
+def counts(f, functional_groups=[], implicit_h=False):
+    res, _ = mi.count_functional_group(f, functional_groups, implicit_h=implicit_h)
+    return {x['function_group']: x['count'] for x in res}
+
+
+def test_builtin_groups():
+    for cid in cids:
+        f = os.path.join(test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf')
+        assert counts(f, implicit_h=True) == counts(f), cid
+
+
+def test_custom_groups():
+    custom_fg = mi.create_custom_functional_groups({
+        'C-H': ["C1-H2"],
+        'O-H': ["O1-H2"],
+        'C-N(-C)-C': ["N1-C2", "N1-C3", "N1-C4"],
+        'H-C=O': ["H1-C2", "C2=O3"]})
+    for cid in cids:
+        f = os.path.join(test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf')
+        assert counts(f, [custom_fg], implicit_h=True) == counts(f, [custom_fg]), cid
+
+
+def test_hydrogen_suppressed_graph():
+    # Methanol
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    G = comp.create_graph(implicit_h=True)
+    assert G.graph['implicit_h']
+    assert sorted(G.nodes(data='symbol')) == [(1, 'O'), (2, 'C')]
+    assert G.nodes[1]['h_count'] == 1
+    assert G.nodes[2]['h_count'] == 3
@@ -0,0 +1,49 @@
+# import packages/modules
+import os
+import networkx as nx
+import pyMolinfo as mi
+from pyMolinfo.docs.invariant import GraphInvariant
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def pattern(symbols, bonds):
+    G = nx.Graph()
+    for i, s in enumerate(symbols):
+        G.add_node(str(i + 1), symbol=s)
+    for i, j, t in bonds:
+        G.add_edge(str(i), str(j), type=t)
+    return G
+
+
+def test_contains():
+    # Methanol
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    G = comp.compound_graph
+    invariant = GraphInvariant.of(G)
+    assert invariant.elements == {'C': 1, 'O': 1, 'H': 4}
+    # the same as the compact graph
+    _invariant = GraphInvariant.from_compact(comp.compact_graph)
+    assert _invariant.elements == invariant.elements
+    assert _invariant.max_degree == invariant.max_degree
+
+    # C-O (single bond)
+    assert invariant.contains(GraphInvariant(pattern(['C', 'O'], [(1, 2, 1)])))
+    # C=O (no double bond)
+    assert not invariant.contains(GraphInvariant(pattern(['C', 'O'], [(1, 2, 2)])))
+    # two oxygens
+    assert not invariant.contains(GraphInvariant(pattern(
+        ['O', 'C', 'O'], [(1, 2, 1), (2, 3, 1)])))
+    # oxygen of degree 3
+    assert not invariant.contains(GraphInvariant(pattern(
+        ['O', 'H', 'H', 'C'], [(1, 2, 1), (1, 3, 1), (1, 4, 1)])))
+
+
+def test_skipped_patterns():
+    # Methanol (no nitrogen)
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    custom_fg = mi.create_custom_functional_groups({'C-N': ["C1-N2"], 'C-O': ["C1-O2"]})
+    res = comp.check_functional_groups([custom_fg])
+    assert [x['result'] for x in res] == [False, True]
+    assert comp.matcher_stats['skipped'] >= 1
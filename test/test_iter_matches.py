@@ -0,0 +1,45 @@
+# import packages/modules
+import os
+import networkx as nx
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_unique_matches():
+    # N,N-dimethylformamide, Ethylbenzene
+    for cid in (6228, 7500):
+        comp = mi.compound(os.path.join(
+            test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf'))
+        counts = {x['function_group']: x['count'] for x in comp.check_functional_groups(
+            count_functional_group=True)}
+        # unique matches are the same as the counts (ring lookups included)
+        for name, n in counts.items():
+            matches = list(comp.iter_matches(name))
+            assert len(matches) == n, name
+            assert len({frozenset(m['atoms']) for m in matches}) == n
+
+
+def test_match_content():
+    # Methanol
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    match = next(comp.iter_matches('hydroxyl', subgraph=True))
+    assert match['function_group'] == 'hydroxyl'
+    assert sorted(match['atoms']) == [1, 6]
+    assert len(match['bonds']) == 1
+    assert isinstance(match['subgraph'], nx.Graph)
+    assert sorted(match['subgraph'].nodes) == [1, 6]
+
+
+def test_limit_and_mappings():
+    # Methanol (one methyl group, 3! mappings)
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    G = nx.Graph()
+    G.add_node('1', symbol='C')
+    for i in ('2', '3', '4'):
+        G.add_node(i, symbol='H')
+        G.add_edge('1', i, type=1)
+    assert len(list(comp.iter_matches(G))) == 1
+    assert len(list(comp.iter_matches(G, unique=False))) == 6
+    assert len(list(comp.iter_matches(G, unique=False, limit=2))) == 2
@@ -0,0 +1,40 @@
+# import packages/modules
+import os
+import shutil
+import pyMolinfo as mi
+from pyMolinfo.docs import PatternCache
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_memory_cache(tmp_path):
+    # no artifacts (default)
+    assert PatternCache.cache_dir is None
+    f = tmp_path / 'custom.yml'
+    shutil.copy(os.path.join(test_dir, 'custom-functional-group.yml'), f)
+    custom_fg1 = mi.create_custom_functional_groups(str(f))
+    custom_fg2 = mi.create_custom_functional_groups(str(f))
+    assert custom_fg1.custom_functional_groups == custom_fg2.custom_functional_groups
+    assert os.listdir(tmp_path) == ['custom.yml']
+
+
+def test_artifact(tmp_path):
+    f = os.path.join(test_dir, 'custom-functional-group.yml')
+    PatternCache.cache_dir = str(tmp_path / 'cache')
+    try:
+        PatternCache.clear()
+        custom_fg = mi.create_custom_functional_groups(f)
+        files = os.listdir(PatternCache.cache_dir)
+        # content hash and package version
+        assert len(files) == 1
+        assert f"-{mi.__version__}-" in files[0]
+
+        # compiled artifact
+        PatternCache.clear()
+        _custom_fg = mi.create_custom_functional_groups(f)
+        assert [list(x) for x in _custom_fg.custom_functional_groups] == \
+            [list(x) for x in custom_fg.custom_functional_groups]
+    finally:
+        PatternCache.cache_dir = None
+        PatternCache.clear()
@@ -0,0 +1,49 @@
+# import packages/modules
+import os
+from networkx.algorithms import isomorphism
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Methanol, Ethylbenzene, N,N-dimethylformamide, Naphthalene
+cids = (887, 7500, 6228, 931)
+
+
+def vf2_count(comp, G, graphs):
+    '''
+    Unique node sets of all patterns of a functional group (plain VF2)
+    '''
+    nodeSets = set()
+    for pattern in graphs:
+        matcher = isomorphism.GraphMatcher(
+            G, pattern, node_match=comp.node_match, edge_match=comp.edge_match)
+        for mapping in matcher.subgraph_isomorphisms_iter():
+            nodeSets.add(frozenset(mapping))
+    return len(nodeSets)
+
+
+def test_single_traversal():
+    for cid in cids:
+        comp = mi.compound(os.path.join(
+            test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf'))
+        G = comp.create_graph()
+        res = comp.check_functional_groups(count_functional_group=True)
+        for x in res:
+            name = x['function_group']
+            # check
+            if name in comp.function_group_lookup:
+                continue
+            assert x['count'] == vf2_count(comp, G, comp.function_group_list[name]), name
+            assert x['result'] == (x['count'] > 0)
+
+
+def test_check_and_count():
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_6228.sdf'))
+    counts = {x['function_group']: x['count'] for x in comp.check_functional_groups(
+        count_functional_group=True)}
+    checks = {x['function_group']: x['result'] for x in mi.compound(os.path.join(
+        test_dir, 'Conformer3D_COMPOUND_CID_6228.sdf')).check_functional_groups()}
+    assert checks == {k: v > 0 for k, v in counts.items()}
+    assert counts['methyl-group'] == 2
+    assert counts['carbonyl'] == 1
@@ -0,0 +1,42 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+# ring of six carbons (custom functional group)
+ring6 = {'ring6': ["C1-C2", "C2-C3", "C3-C4", "C4-C5", "C5-C6", "C6-C1"]}
+
+
+def test_benzene_rings():
+    # Benzene
+    comp = mi.compound(os.path.join(
+        test_dir, 'Conformer3D_COMPOUND_CID_241.sdf'))
+    assert len(comp.rings) == 1
+    assert len(comp.aromatic_rings) == 1
+
+
+def test_bridged_rings():
+    # bicyclo[2.2.2]octane: 2 rings in the sssr, 3 six-membered rings
+    f = os.path.join(test_dir, 'bicyclo222octane.sdf')
+    comp = mi.compound(f)
+    assert len(comp.rings) == 2
+    assert comp.aromatic_rings == []
+
+    custom_fg = mi.create_custom_functional_groups(ring6)
+    for implicit_h in (False, True):
+        res, _ = mi.count_functional_group(
+            f, [custom_fg], implicit_h=implicit_h)
+        assert res[0]['count'] == 3
+
+
+def test_fused_rings():
+    # decalin: 2 rings in the sssr, 2 six-membered rings
+    f = os.path.join(test_dir, 'decalin.sdf')
+    comp = mi.compound(f)
+    assert sorted(len(ring) for ring in comp.rings) == [6, 6]
+
+    custom_fg = mi.create_custom_functional_groups(ring6)
+    res, _ = mi.count_functional_group(f, [custom_fg])
+    assert res[0]['count'] == 2
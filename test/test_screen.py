@@ -0,0 +1,45 @@
+# import packages/modules
+import os
+import numpy as np
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Methanol, Benzene
+files = [os.path.join(test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf')
+         for cid in (887, 241)]
+
+
+def test_screen_counts():
+    res = mi.screen(files + ['garbage'], ['hydroxyl', 'arene', 'carbonyl'])
+    assert res.groups == ['hydroxyl', 'arene', 'carbonyl']
+    assert res.row_ids == ['0', '1', '2']
+    assert res.counts.tolist() == [[1, 0, 0], [0, 1, 0], [0, 0, 0]]
+    assert list(res.errors) == ['2']
+
+
+def test_screen_columns():
+    # columns do not depend on the compounds
+    res = mi.screen(['garbage'], ['hydroxyl'])
+    assert res.counts.shape == (1, 1)
+    assert res.groups == ['hydroxyl']
+
+    # built-in functional groups (default)
+    res = mi.screen([], [])
+    assert res.counts.shape[1] == len(res.groups) > 0
+    assert res.groups[0] == 'hydroxyl'
+
+    # custom functional groups
+    custom_fg = mi.create_custom_functional_groups(
+        {'C-O-H': ["C1-O2", "O2-H3"]})
+    res = mi.screen(files[:1], ['carbonyl', custom_fg])
+    assert res.groups == ['carbonyl', 'C-O-H']
+    assert res.counts.tolist() == [[0, 1]]
+
+
+def test_screen_workers():
+    res1 = mi.screen(files, [], chunk_size=1)
+    res2 = mi.screen(files, [], workers=2, chunk_size=1, sparse=True)
+    assert res1.groups == res2.groups
+    assert np.array_equal(res1.counts, res2.counts.toarray())
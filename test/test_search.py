@@ -0,0 +1,22 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_search_within_main_graph():
+    # Methanol
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    res = comp.search_within_main_graph('hydroxyl')
+    assert len(res) == 1
+    assert sorted(res[0]['subgraph']) == [1, 6]
+
+    # the cached matches are not changed by the caller
+    res.clear()
+    res = comp.search_within_main_graph('hydroxyl')
+    assert len(res) == 1
+    res[0]['count'] = 10
+    assert comp.search_within_main_graph('hydroxyl')[0]['count'] == 1
+
@@ -0,0 +1,51 @@
+# import packages/modules
+import os
+import glob
+import pyMolinfo as mi
+from pyMolinfo.docs import SubstructureIndex
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+files = sorted(glob.glob(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_*.sdf')))[:12]
+groups = ['hydroxyl', 'carbonyl', 'arene', 'ether', 'C-N']
+
+
+def expected_rows(functional_groups):
+    '''
+    Compounds containing each functional group (exact match of all compounds)
+    '''
+    res = {}
+    for i, f in enumerate(files):
+        for x in mi.compound(f).check_functional_groups(functional_groups):
+            if x['result']:
+                res.setdefault(x['function_group'], []).append(str(i))
+    return res
+
+
+def test_search():
+    index = mi.substructure_index(files)
+    assert len(index) == len(files)
+
+    custom_fg = mi.create_custom_functional_groups({'C=C-C': ["C1=C2", "C2-C3"]})
+    expected = expected_rows(groups)
+    expected.update(expected_rows([custom_fg]))
+
+    res = index.search(groups + [custom_fg])
+    assert [x['function_group'] for x in res] == groups + ['C=C-C']
+    for x in res:
+        # no false negatives, screened candidates only
+        assert x['row_ids'] == expected.get(x['function_group'], [])
+        assert len(x['row_ids']) <= x['candidates'] <= len(files)
+    # the screen rejects compounds
+    assert any(x['candidates'] < len(files) for x in res)
+
+
+def test_save_load(tmp_path):
+    index = mi.substructure_index(files[:4])
+    f = str(tmp_path / 'index.npz')
+    index.save(f)
+    _index = SubstructureIndex.load(f)
+    assert _index.row_ids == index.row_ids
+    assert (_index.features == index.features).all()
+    assert _index.search('hydroxyl') == index.search('hydroxyl')
@@ -0,0 +1,48 @@
+# import packages/modules
+import os
+import networkx as nx
+import numpy as np
+import pyMolinfo as mi
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_methanol_descriptors():
+    f = os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf')
+    res = mi.topological_descriptors([f], res_format='original')[0]
+    assert res['atom_numbers'] == 6
+    assert res['path_counts'] == {1: 5, 2: 7, 3: 3}
+    assert res['wiener_index'] == 28
+    assert res['radius'] == 2
+    assert res['diameter'] == 3
+
+
+def test_distance_matrix():
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_7500.sdf'))
+    matrix = comp.topological_distance_matrix()
+    # shortest paths of the compound graph
+    G = comp.create_graph()
+    for i, lengths in nx.all_pairs_shortest_path_length(G):
+        for j, d in lengths.items():
+            assert matrix[i - 1, j - 1] == d
+
+    # the same as the batch descriptors
+    res = mi.topological_descriptors([os.path.join(
+        test_dir, 'Conformer3D_COMPOUND_CID_7500.sdf')], res_format='original')[0]
+    assert res['wiener_index'] == int(np.triu(matrix, k=1).sum())
+
+
+def test_distance_matrix_cache():
+    # Methanol
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    matrix = comp.topological_distance_matrix()
+    assert matrix[0, 5] == 1
+
+    # the cached matrix is not changed by the caller
+    matrix[0, 5] = 10
+    assert comp.topological_distance_matrix()[0, 5] == 1
+
+    # remove the O-H bond
+    comp.atomBonds[0]['bonds'] = [b for b in comp.atomBonds[0]['bonds'] if b[0] != 6]
+    assert np.isinf(comp.topological_distance_matrix()[0, 5])
@@ -0,0 +1,46 @@
+# import packages/modules
+import os
+import numpy as np
+import pyMolinfo as mi
+from pyMolinfo.docs import Trajectory
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_frames(f, frameNo=10):
+    # Methanol frames (shifted coordinates)
+    comp = mi.compound(os.path.join(test_dir, 'Conformer3D_COMPOUND_CID_887.sdf'))
+    xyz = np.stack([comp.xyzList + 0.1 * k for k in range(frameNo)])
+    Trajectory.write_xyz(str(f), comp.atom_elements, xyz,
+                         comments=[f"frame {k}" for k in range(frameNo)])
+    return comp, xyz
+
+
+def test_read_frames(tmp_path):
+    f = tmp_path / 'md.xyz'
+    comp, xyz = write_frames(f)
+
+    traj = mi.trajectory(str(f))
+    assert len(traj) == 10
+    assert traj.atom_numbers == comp.atom_numbers
+    assert np.allclose(traj.xyz, xyz)
+
+    # frame selection
+    traj = mi.trajectory(str(f), start=1, stop=8, step=3)
+    assert len(traj) == 3
+    assert np.allclose(traj.frame(1), xyz[4])
+
+
+def test_memmap_topology(tmp_path):
+    f = tmp_path / 'md.xyz'
+    comp, xyz = write_frames(f)
+
+    traj = mi.trajectory(str(f), topology=comp, memmap=str(tmp_path / 'md.npy'))
+    assert os.path.exists(tmp_path / 'md.npy')
+    assert np.allclose(traj.xyz, xyz)
+
+    # bonds of the topology
+    _comp = traj.compound(2)
+    assert len(_comp.atom_bond_block_1d) == len(comp.atom_bond_block_1d)
+    assert np.allclose(_comp.xyzList, xyz[2])
@@ -0,0 +1,43 @@
+# import packages/modules
+import os
+import pyMolinfo as mi
+from pyMolinfo.docs import MatchCache, SharedGraph
+
+# test directory
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_shared_graph():
+    # N,N-dimethylformamide
+    G = mi.compound(os.path.join(
+        test_dir, 'Conformer3D_COMPOUND_CID_6228.sdf')).create_graph()
+    shared = SharedGraph(G)
+    try:
+        _G = SharedGraph.attach(shared.meta)
+    finally:
+        shared.close()
+
+    # the same node order and attributes (coordinates are not shared)
+    assert list(_G.nodes) == list(G.nodes)
+    for n in G:
+        assert _G.nodes[n] == {k: v for k, v in G.nodes[n].items() if k != 'xyz'}
+    assert {frozenset(e) for e in _G.edges} == {frozenset(e) for e in G.edges}
+    for u, v, d in G.edges(data=True):
+        assert _G.edges[u, v] == d
+
+
+def test_worker_counts():
+    for cid in (6228, 7500):
+        f = os.path.join(test_dir, f'Conformer3D_COMPOUND_CID_{cid}.sdf')
+        MatchCache.clear()
+        res = mi.compound(f).check_functional_groups(count_functional_group=True)
+        MatchCache.clear()
+        _res = mi.compound(f).check_functional_groups(
+            count_functional_group=True, workers=2)
+        assert _res == res
+
+        MatchCache.clear()
+        res = mi.compound(f).check_functional_groups()
+        MatchCache.clear()
+        _res = mi.compound(f).check_functional_groups(workers=2)
+        assert _res == res